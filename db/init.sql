@@ -21,12 +21,12 @@ CREATE TABLE IF NOT EXISTS patients (
   id                SERIAL PRIMARY KEY,
   nombre            VARCHAR(80)  NOT NULL,
   apellido          VARCHAR(80)  NOT NULL,
-  dni               VARCHAR(20)  NOT NULL UNIQUE,
+  dni               VARCHAR(20)  NOT NULL,
   fecha_nacimiento  DATE         NOT NULL,
   genero            VARCHAR(20),
   direccion         VARCHAR(120),
   telefono          VARCHAR(30),
-  email             VARCHAR(120) UNIQUE,
+  email             VARCHAR(120),
   obra_social       VARCHAR(120),
   nro_afiliado      VARCHAR(50),
   activo            BOOLEAN      NOT NULL DEFAULT TRUE,
@@ -34,7 +34,15 @@ CREATE TABLE IF NOT EXISTS patients (
   updated_at        TIMESTAMP    NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE INDEX IF NOT EXISTS ix_patients_apellido ON patients (apellido, nombre);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_patients_dni ON patients (dni);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_patients_email ON patients (email);
+CREATE INDEX IF NOT EXISTS ix_patients_apellido_nombre_id ON patients (apellido, nombre, id);
+CREATE INDEX IF NOT EXISTS ix_patients_activo_apellido ON patients (activo, apellido, nombre, id);
+
+-- Búsqueda por subcadena de apellido/nombre/DNI (GET /pacientes/buscar)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS ix_patients_busqueda_trgm ON patients
+  USING gin ((apellido || ' ' || nombre || ' ' || dni) gin_trgm_ops);
 
 -- =======
 -- Médicos
@@ -43,16 +51,18 @@ CREATE TABLE IF NOT EXISTS doctors (
   id         SERIAL PRIMARY KEY,
   nombre     VARCHAR(80)  NOT NULL,
   apellido   VARCHAR(80)  NOT NULL,
-  dni        VARCHAR(20)  NOT NULL UNIQUE,
+  dni        VARCHAR(20)  NOT NULL,
   genero     VARCHAR(20),
-  email      VARCHAR(120) UNIQUE,
+  email      VARCHAR(120),
   telefono   VARCHAR(30),
   direccion  VARCHAR(120),
   matricula  VARCHAR(40)  NOT NULL UNIQUE,
   activo     BOOLEAN      NOT NULL DEFAULT TRUE
 );
 
-CREATE INDEX IF NOT EXISTS ix_doctors_apellido ON doctors (apellido, nombre);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_doctors_dni ON doctors (dni);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_doctors_email ON doctors (email);
+CREATE INDEX IF NOT EXISTS ix_doctors_apellido_nombre_id ON doctors (apellido, nombre, id);
 
 -- =============
 -- Especialidades
@@ -70,6 +80,9 @@ CREATE TABLE IF NOT EXISTS doctor_specialties (
   PRIMARY KEY (doctor_id, specialty_id)
 );
 
+CREATE INDEX IF NOT EXISTS ix_doctor_specialties_specialty
+  ON doctor_specialties (specialty_id, doctor_id);
+
 CREATE TABLE IF NOT EXISTS doctor_availability (
   id            SERIAL PRIMARY KEY,
   doctor_id     INTEGER NOT NULL REFERENCES doctors(id) ON DELETE CASCADE,
@@ -79,9 +92,25 @@ CREATE TABLE IF NOT EXISTS doctor_availability (
   slot_minutes  INTEGER   NOT NULL DEFAULT 30
 );
 
+CREATE INDEX IF NOT EXISTS ix_doctor_availability_doctor_id
+  ON doctor_availability (doctor_id);
+
 -- ==========
 -- Turnos/HC
 -- ==========
+CREATE TABLE IF NOT EXISTS appointment_series (
+  id               SERIAL PRIMARY KEY,
+  paciente_id      INTEGER NOT NULL REFERENCES patients(id)    ON DELETE RESTRICT,
+  medico_id        INTEGER NOT NULL REFERENCES doctors(id)     ON DELETE RESTRICT,
+  especialidad_id  INTEGER NOT NULL REFERENCES specialties(id) ON DELETE RESTRICT,
+  dias_semana      VARCHAR(20) NOT NULL,
+  hora             TIME       NOT NULL,
+  duracion_min     INTEGER    NOT NULL DEFAULT 30,
+  desde            DATE       NOT NULL,
+  semanas          INTEGER    NOT NULL,
+  created_at       TIMESTAMP  NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Estados permitidos: Reservado | Cancelado | Reprogramado | Atendido
 CREATE TABLE IF NOT EXISTS appointments (
   id               SERIAL PRIMARY KEY,
@@ -92,13 +121,81 @@ CREATE TABLE IF NOT EXISTS appointments (
   duracion_min     INTEGER    NOT NULL DEFAULT 30,
   estado           VARCHAR(20) NOT NULL DEFAULT 'Reservado'
     CHECK (estado IN ('Reservado','Cancelado','Reprogramado','Atendido')),
-  receta_url       VARCHAR(255)
+  receta_url       VARCHAR(255),
+  serie_id         INTEGER REFERENCES appointment_series(id) ON DELETE SET NULL,
+  reprogramado_de_id INTEGER REFERENCES appointments(id) ON DELETE SET NULL
 );
 
 CREATE INDEX IF NOT EXISTS ix_appointments_medico_fecha
   ON appointments (medico_id, fecha);
 CREATE INDEX IF NOT EXISTS ix_appointments_paciente_fecha
   ON appointments (paciente_id, fecha);
+CREATE INDEX IF NOT EXISTS ix_appointments_serie_id
+  ON appointments (serie_id);
+CREATE INDEX IF NOT EXISTS ix_appointments_fecha_id
+  ON appointments (fecha, id);
+CREATE INDEX IF NOT EXISTS ix_appointments_especialidad_fecha
+  ON appointments (especialidad_id, fecha);
+CREATE INDEX IF NOT EXISTS ix_appointments_estado_fecha
+  ON appointments (estado, fecha);
+CREATE INDEX IF NOT EXISTS ix_appointments_reservados_medico_fecha
+  ON appointments (medico_id, fecha) WHERE estado = 'Reservado';
+
+-- Reservas temporales de horarios (se borran al vencer expira_en)
+CREATE TABLE IF NOT EXISTS slot_holds (
+  id               SERIAL PRIMARY KEY,
+  medico_id        INTEGER NOT NULL REFERENCES doctors(id) ON DELETE CASCADE,
+  fecha            TIMESTAMP  NOT NULL,
+  duracion_min     INTEGER    NOT NULL DEFAULT 30,
+  expira_en        TIMESTAMP  NOT NULL,
+  usuario_id       INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS ix_slot_holds_medico_fecha
+  ON slot_holds (medico_id, fecha);
+CREATE INDEX IF NOT EXISTS ix_slot_holds_expira_en
+  ON slot_holds (expira_en);
+
+-- Slots precalculados (opcional, SLOTS_MATERIALIZED_ENABLED)
+CREATE TABLE IF NOT EXISTS slots (
+  id               SERIAL PRIMARY KEY,
+  medico_id        INTEGER NOT NULL REFERENCES doctors(id) ON DELETE CASCADE,
+  inicio           TIMESTAMP  NOT NULL,
+  fin              TIMESTAMP  NOT NULL,
+  ocupados         INTEGER    NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS ix_slots_medico_inicio
+  ON slots (medico_id, inicio);
+
+CREATE TABLE IF NOT EXISTS slot_horizons (
+  medico_id        INTEGER PRIMARY KEY REFERENCES doctors(id) ON DELETE CASCADE,
+  desde            DATE       NOT NULL,
+  hasta            DATE       NOT NULL
+);
+
+-- Lista de espera (PENDIENTE | OFRECIDO | ASIGNADO | CANCELADO)
+CREATE TABLE IF NOT EXISTS waitlist (
+  id               SERIAL PRIMARY KEY,
+  paciente_id      INTEGER NOT NULL REFERENCES patients(id)    ON DELETE CASCADE,
+  especialidad_id  INTEGER NOT NULL REFERENCES specialties(id) ON DELETE RESTRICT,
+  medico_id        INTEGER REFERENCES doctors(id) ON DELETE CASCADE,
+  desde            TIMESTAMP  NOT NULL,
+  hasta            TIMESTAMP  NOT NULL,
+  duracion_min     INTEGER    NOT NULL DEFAULT 30,
+  auto_reservar    BOOLEAN    NOT NULL DEFAULT FALSE,
+  estado           VARCHAR(20) NOT NULL DEFAULT 'PENDIENTE',
+  hold_id          INTEGER,
+  oferta_expira    TIMESTAMP,
+  turno_id         INTEGER REFERENCES appointments(id) ON DELETE SET NULL,
+  usuario_id       INTEGER,
+  created_at       TIMESTAMP  NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_waitlist_medico_estado_id
+  ON waitlist (medico_id, estado, id, desde, hasta, duracion_min);
+CREATE INDEX IF NOT EXISTS ix_waitlist_especialidad_estado_id
+  ON waitlist (especialidad_id, medico_id, estado, id, desde, hasta, duracion_min);
 
 -- ============
 -- Consultas HC
@@ -124,6 +221,9 @@ CREATE TABLE IF NOT EXISTS prescriptions (
   firma_digital   VARCHAR(200)
 );
 
+CREATE INDEX IF NOT EXISTS ix_prescriptions_consultation_id
+  ON prescriptions (consultation_id);
+
 CREATE TABLE IF NOT EXISTS prescription_items (
   id              SERIAL PRIMARY KEY,
   prescription_id INTEGER NOT NULL REFERENCES prescriptions(id) ON DELETE CASCADE,
@@ -134,6 +234,9 @@ CREATE TABLE IF NOT EXISTS prescription_items (
   indicaciones    TEXT
 );
 
+CREATE INDEX IF NOT EXISTS ix_prescription_items_prescription_id
+  ON prescription_items (prescription_id);
+
 -- ============
 -- Recordatorios
 -- ============
@@ -146,3 +249,84 @@ CREATE TABLE IF NOT EXISTS reminders (
   estado           VARCHAR(20) NOT NULL,
   error_msg        VARCHAR(200)
 );
+
+CREATE INDEX IF NOT EXISTS ix_reminders_appointment_programado
+  ON reminders (appointment_id, programado_para);
+CREATE INDEX IF NOT EXISTS ix_reminders_pendientes
+  ON reminders (programado_para) WHERE estado = 'PENDIENTE';
+
+-- ==================================
+-- Archivo de turnos históricos (sin FKs)
+-- ==================================
+CREATE TABLE IF NOT EXISTS appointments_archive (
+  id                 INTEGER PRIMARY KEY,
+  paciente_id        INTEGER    NOT NULL,
+  medico_id          INTEGER    NOT NULL,
+  especialidad_id    INTEGER    NOT NULL,
+  fecha              TIMESTAMP  NOT NULL,
+  duracion_min       INTEGER    NOT NULL,
+  estado             VARCHAR(20) NOT NULL,
+  receta_url         VARCHAR(255),
+  serie_id           INTEGER,
+  reprogramado_de_id INTEGER,
+  archivado_en       TIMESTAMP  NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_appointments_archive_medico_fecha
+  ON appointments_archive (medico_id, fecha);
+CREATE INDEX IF NOT EXISTS ix_appointments_archive_paciente_fecha
+  ON appointments_archive (paciente_id, fecha);
+CREATE INDEX IF NOT EXISTS ix_appointments_archive_especialidad_fecha
+  ON appointments_archive (especialidad_id, fecha);
+CREATE INDEX IF NOT EXISTS ix_appointments_archive_fecha
+  ON appointments_archive (fecha);
+
+CREATE TABLE IF NOT EXISTS consultations_archive (
+  id             INTEGER PRIMARY KEY,
+  appointment_id INTEGER   NOT NULL,
+  motivo         TEXT,
+  observaciones  TEXT,
+  diagnostico    TEXT,
+  indicaciones   TEXT,
+  created_at     TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_consultations_archive_appointment_id
+  ON consultations_archive (appointment_id);
+
+CREATE TABLE IF NOT EXISTS prescriptions_archive (
+  id              INTEGER PRIMARY KEY,
+  consultation_id INTEGER  NOT NULL,
+  fecha_emision   DATE     NOT NULL,
+  estado          VARCHAR(20) NOT NULL,
+  firma_digital   VARCHAR(200)
+);
+
+CREATE INDEX IF NOT EXISTS ix_prescriptions_archive_consultation_id
+  ON prescriptions_archive (consultation_id);
+
+CREATE TABLE IF NOT EXISTS prescription_items_archive (
+  id              INTEGER PRIMARY KEY,
+  prescription_id INTEGER NOT NULL,
+  medicamento     VARCHAR(200) NOT NULL,
+  dosis           VARCHAR(160),
+  frecuencia      VARCHAR(160),
+  duracion        VARCHAR(160),
+  indicaciones    TEXT
+);
+
+CREATE INDEX IF NOT EXISTS ix_prescription_items_archive_prescription_id
+  ON prescription_items_archive (prescription_id);
+
+CREATE TABLE IF NOT EXISTS reminders_archive (
+  id               INTEGER PRIMARY KEY,
+  appointment_id   INTEGER    NOT NULL,
+  canal            VARCHAR(20) NOT NULL,
+  programado_para  TIMESTAMP  NOT NULL,
+  enviado_en       TIMESTAMP,
+  estado           VARCHAR(20) NOT NULL,
+  error_msg        VARCHAR(200)
+);
+
+CREATE INDEX IF NOT EXISTS ix_reminders_archive_appointment_id
+  ON reminders_archive (appointment_id);
@@ -1,8 +1,12 @@
+from contextlib import asynccontextmanager
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
+from app.db.async_session import AsyncReadSessionLocal, AsyncSessionLocal, DbRunner
+from app.db.session import ReadSessionLocal, SessionLocal
 from app.core.security import decode_token
+from app.models.user import User
 
 bearer = HTTPBearer(auto_error=False)
 
@@ -13,6 +17,35 @@ def get_db():
     finally:
         db.close()
 
+def get_read_db():
+    # Consultas que toleran la demora de la réplica (reportes, listados)
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@asynccontextmanager
+async def _runner(async_factory, factory):
+    # Rutas `async def`: AsyncSession si DB_ASYNC, si no una Session en el threadpool
+    if async_factory is not None:
+        async with async_factory() as session:
+            yield DbRunner(session=session)
+        return
+    db = factory()
+    try:
+        yield DbRunner(db)
+    finally:
+        db.close()
+
+async def get_db_runner():
+    async with _runner(AsyncSessionLocal, SessionLocal) as runner:
+        yield runner
+
+async def get_read_db_runner():
+    async with _runner(AsyncReadSessionLocal, ReadSessionLocal) as runner:
+        yield runner
+
 def get_current_user(creds: HTTPAuthorizationCredentials = Depends(bearer)):
     if not creds:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="No autenticado")
@@ -21,3 +54,9 @@ def get_current_user(creds: HTTPAuthorizationCredentials = Depends(bearer)):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
     # Para endpoints simples no cargamos entidad usuario completa
     return {"id": int(sub)}
+
+def require_admin(user=Depends(get_current_user), db: Session = Depends(get_db)):
+    account = db.get(User, user["id"])
+    if not account or account.role != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Requiere rol admin")
+    return user
@@ -0,0 +1,42 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db, require_admin
+from app.db import slow_queries
+from app.services.archive_service import ArchiveService
+from app.services.slot_service import SlotService
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/consultas-lentas", response_model=List[dict])
+def consultas_lentas(limit: Optional[int] = Query(None, ge=1), _=Depends(require_admin)):
+    # Vacío si SLOW_QUERY_MS no está configurado
+    return slow_queries.recent(limit)
+
+
+@router.delete("/consultas-lentas")
+def limpiar_consultas_lentas(_=Depends(require_admin)):
+    slow_queries.clear()
+    return {"ok": True}
+
+
+@router.post("/archivar")
+def archivar_turnos(
+    dias: Optional[int] = Query(None, description="Antigüedad mínima; por defecto ARCHIVE_AFTER_DAYS"),
+    lote: Optional[int] = Query(None, ge=1, le=5000),
+    db: Session = Depends(get_db),
+    _=Depends(require_admin),
+):
+    try:
+        return ArchiveService.archivar(db, dias, lote)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/slots")
+def materializar_slots(db: Session = Depends(get_db), _=Depends(require_admin)):
+    # Tarea diaria: corre el horizonte de la tabla `slots` (no hace nada si está desactivada)
+    return {"medicos": SlotService.materializar(db)}
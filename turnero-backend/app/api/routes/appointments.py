@@ -1,33 +1,175 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List, Optional
-
-from app.api.deps import get_current_user, get_db
-from app.schemas.appointment import AppointmentCreate, AppointmentOut, AppointmentUpdate
+from typing import List, Literal, Optional
+
+from app.api.deps import get_current_user, get_db, get_db_runner, get_read_db_runner
+from app.db.async_session import DbRunner
+from app.repositories.pagination import MAX_LIMIT
+from app.schemas.appointment import (
+    AppointmentAgendaOut,
+    AppointmentBulkCreate,
+    AppointmentBulkResult,
+    AppointmentCreate,
+    AppointmentDayReschedule,
+    AppointmentDayRescheduleOut,
+    AppointmentNamedOut,
+    AppointmentOut,
+    AppointmentReschedule,
+    AppointmentUpdate,
+    TurnoEstado,
+)
 from app.schemas.consultation import ConsultationCreate, ConsultationOut
+from app.schemas.hold import HoldCreate, HoldOut
 from app.schemas.reminder import ReminderCreate, ReminderOut
+from app.schemas.series import SeriesCreate, SeriesOut, SeriesReschedule
 from app.services.appointment_service import AppointmentService
 from app.services.consultation_service import ConsultationService
+from app.services.hold_service import HoldService
 from app.services.reminder_service import ReminderService
+from app.services.series_service import SeriesService
 
 router = APIRouter(prefix="/turnos", tags=["turnos"])
 
-@router.get("", response_model=List[AppointmentOut])
-def list_turnos(medico_id: Optional[int] = None, desde: Optional[str] = None, hasta: Optional[str] = None,
-                db: Session = Depends(get_db), _=Depends(get_current_user)):
-    return AppointmentService.list(db, medico_id, desde, hasta)
+@router.get("", response_model=List[AppointmentNamedOut], response_model_exclude_unset=True)
+async def list_turnos(response: Response,
+                      medico_id: Optional[int] = None, desde: Optional[str] = None, hasta: Optional[str] = None,
+                      paciente_id: Optional[int] = None, especialidad_id: Optional[int] = None,
+                      estado: Optional[TurnoEstado] = None,
+                      limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT), cursor: Optional[str] = None,
+                      expand: Optional[Literal["nombres"]] = None,
+                      db: DbRunner = Depends(get_read_db_runner), _=Depends(get_current_user)):
+    # expand=nombres agrega paciente_nombre, medico_nombre y especialidad_nombre (un solo JOIN)
+    try:
+        if not limit:
+            return await db(AppointmentService.list, medico_id, desde, hasta, paciente_id, especialidad_id, estado, expand)
+        items, next_cursor = await db(
+            AppointmentService.page, limit, cursor, medico_id, desde, hasta, paciente_id, especialidad_id, estado, expand
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
+
+@router.get("/agenda", response_model=List[AppointmentAgendaOut])
+async def agenda_turnos(response: Response,
+                        medico_id: Optional[int] = None, desde: Optional[str] = None, hasta: Optional[str] = None,
+                        paciente_id: Optional[int] = None, especialidad_id: Optional[int] = None,
+                        estado: Optional[TurnoEstado] = None,
+                        limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT), cursor: Optional[str] = None,
+                        db: DbRunner = Depends(get_read_db_runner), _=Depends(get_current_user)):
+    # Solo las columnas de la tabla de turnos, con los nombres ya resueltos
+    try:
+        items, next_cursor = await db(
+            AppointmentService.agenda, limit, cursor, medico_id, desde, hasta, paciente_id, especialidad_id, estado
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
+
+@router.get("/disponibles")
+async def turnos_disponibles(medico_id: int, fecha: str,
+                       duracion_min: int = 30, inicio: str = "09:00", fin: str = "17:00",
+                       db: DbRunner = Depends(get_db_runner), _=Depends(get_current_user)):
+    # fecha = "YYYY-MM-DD"
+    try:
+        return await db(AppointmentService.disponibles, medico_id, fecha, duracion_min, inicio, fin)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/disponibles/grilla")
+async def grilla_disponibles(desde: str, hasta: str,
+                       especialidad_id: Optional[int] = None, medico_ids: Optional[List[int]] = Query(None),
+                       duracion_min: int = 30, inicio: Optional[str] = None, fin: Optional[str] = None,
+                       db: DbRunner = Depends(get_db_runner), _=Depends(get_current_user)):
+    # desde/hasta = "YYYY-MM-DD", ambos inclusive
+    try:
+        return await db(AppointmentService.grilla, desde, hasta, especialidad_id, medico_ids, duracion_min, inicio, fin)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/proximo-disponible")
+async def proximo_disponible(especialidad_id: int, duracion_min: int = 30, desde: Optional[str] = None, cantidad: int = 5,
+                       db: DbRunner = Depends(get_db_runner), _=Depends(get_current_user)):
+    # desde = "YYYY-MM-DDTHH:MM" (por defecto, ahora)
+    try:
+        return await db(AppointmentService.proximo_disponible, especialidad_id, duracion_min, desde, cantidad)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/{tid}", response_model=AppointmentOut)
-def get_turno(tid: int, db: Session = Depends(get_db), _=Depends(get_current_user)):
+async def get_turno(tid: int, db: DbRunner = Depends(get_db_runner), _=Depends(get_current_user)):
     try:
-        return AppointmentService.get(db, tid)
+        return await db(AppointmentService.get, tid)
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc))
 
 @router.post("", response_model=AppointmentOut)
-def create_turno(payload: AppointmentCreate, db: Session = Depends(get_db), _=Depends(get_current_user)):
+def create_turno(payload: AppointmentCreate, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    try:
+        return AppointmentService.create(db, payload.model_dump(), user["id"])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/hold", response_model=HoldOut)
+def hold_turno(payload: HoldCreate, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    try:
+        return HoldService.reservar(db, payload.medico_id, payload.fecha, payload.duracion_min, payload.ttl_segundos, user["id"])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.delete("/hold/{hid}")
+def liberar_hold(hid: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    try:
+        HoldService.liberar(db, hid, user["id"])
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    return {"ok": True}
+
+@router.post("/bulk", response_model=List[AppointmentBulkResult])
+def create_turnos_bulk(payload: AppointmentBulkCreate, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    try:
+        return AppointmentService.create_bulk(db, [item.model_dump() for item in payload.items], user["id"])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/reprogramar-dia", response_model=AppointmentDayRescheduleOut)
+def reprogramar_dia(payload: AppointmentDayReschedule, db: Session = Depends(get_db), _=Depends(get_current_user)):
     try:
-        return AppointmentService.create(db, payload.model_dump())
+        return AppointmentService.reprogramar_dia(
+            db,
+            payload.medico_id,
+            payload.fecha,
+            payload.nueva_fecha,
+            payload.medico_destino_id,
+            payload.omitir_conflictos,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/series", response_model=SeriesOut)
+def create_serie(payload: SeriesCreate, db: Session = Depends(get_db), _=Depends(get_current_user)):
+    try:
+        return SeriesService.crear(db, payload.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/series/{sid}/cancelar")
+def cancelar_serie(sid: int, db: Session = Depends(get_db), _=Depends(get_current_user)):
+    try:
+        cancelados, entries = SeriesService.cancelar(db, sid)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    # Horarios liberados que se ofrecieron (o asignaron) a la lista de espera
+    lista_espera = [{"id": e.id, "estado": e.estado, "turno_id": e.turno_id} for e in entries]
+    return {"ok": True, "cancelados": cancelados, "lista_espera": lista_espera}
+
+@router.post("/series/{sid}/reprogramar", response_model=SeriesOut)
+def reprogramar_serie(sid: int, payload: SeriesReschedule, db: Session = Depends(get_db), _=Depends(get_current_user)):
+    try:
+        return SeriesService.reprogramar(db, sid, payload.hora, payload.duracion_min)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -38,12 +180,22 @@ def update_turno(tid: int, payload: AppointmentUpdate, db: Session = Depends(get
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/{tid}/reprogramar", response_model=AppointmentOut)
+def reprogramar_turno(tid: int, payload: AppointmentReschedule, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    try:
+        return AppointmentService.reprogramar(db, tid, payload.fecha, payload.duracion_min, payload.hold_id, user["id"])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.post("/{tid}/cancelar")
 def cancelar_turno(tid: int, db: Session = Depends(get_db), _=Depends(get_current_user)):
     try:
-        AppointmentService.cancelar(db, tid)
+        entry = AppointmentService.cancelar(db, tid)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
+    if entry:
+        # El horario liberado se ofreció (o se asignó) a la lista de espera
+        return {"ok": True, "lista_espera": {"id": entry.id, "estado": entry.estado, "turno_id": entry.turno_id}}
     return {"ok": True}
 
 @router.post("/{tid}/atender")
@@ -54,16 +206,6 @@ def atender_turno(tid: int, receta_url: str | None = None, db: Session = Depends
         raise HTTPException(status_code=400, detail=str(exc))
     return {"ok": True}
 
-@router.get("/disponibles")
-def turnos_disponibles(medico_id: int, fecha: str,
-                       duracion_min: int = 30, inicio: str = "09:00", fin: str = "17:00",
-                       db: Session = Depends(get_db), _=Depends(get_current_user)):
-    # fecha = "YYYY-MM-DD"
-    try:
-        return AppointmentService.disponibles(db, medico_id, fecha, duracion_min, inicio, fin)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
 
 @router.post("/{tid}/consulta", response_model=ConsultationOut)
 def registrar_consulta(tid: int, payload: ConsultationCreate, db: Session = Depends(get_db), _=Depends(get_current_user)):
@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import Optional
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_user, get_db, get_db_runner, get_read_db_runner
+from app.db.async_session import DbRunner
+from app.repositories.pagination import MAX_LIMIT
 from app.schemas.doctor import DoctorCreate, DoctorOut, DoctorUpdate
 from app.services.doctor_service import DoctorService
 
@@ -12,14 +15,30 @@ router = APIRouter(prefix="/medicos", tags=["medicos"])
 
 
 @router.get("", response_model=List[DoctorOut])
-def list_doctors(db: Session = Depends(get_db), _=Depends(get_current_user)):
-    return DoctorService.list(db)
+async def list_doctors(
+    response: Response,
+    activo: Optional[bool] = None,
+    especialidad_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    db: DbRunner = Depends(get_read_db_runner),
+    _=Depends(get_current_user),
+):
+    if not limit:
+        return await db(DoctorService.list, activo, especialidad_id)
+    try:
+        items, next_cursor = await db(DoctorService.page, limit, cursor, activo, especialidad_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
 
 
 @router.get("/{did}", response_model=DoctorOut)
-def get_doctor(did: int, db: Session = Depends(get_db), _=Depends(get_current_user)):
+async def get_doctor(did: int, db: DbRunner = Depends(get_db_runner), _=Depends(get_current_user)):
     try:
-        return DoctorService.get(db, did)
+        return await db(DoctorService.get, did)
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc))
 
@@ -1,25 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+import io
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, get_db
-from app.schemas.patient import PatientCreate, PatientOut, PatientUpdate
+from app.api.deps import get_current_user, get_db, get_db_runner, get_read_db_runner
+from app.db.async_session import DbRunner
+from app.repositories.pagination import MAX_LIMIT
+from app.schemas.patient import PatientCreate, PatientImportResult, PatientOut, PatientUpdate
 from app.services.patient_service import PatientService
 
 router = APIRouter(prefix="/pacientes", tags=["pacientes"])
 
 
 @router.get("", response_model=List[PatientOut])
-def list_pacientes(db: Session = Depends(get_db), _=Depends(get_current_user)):
-    return PatientService.list(db)
+async def list_pacientes(
+    response: Response,
+    activo: Optional[bool] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    db: DbRunner = Depends(get_read_db_runner),
+    _=Depends(get_current_user),
+):
+    # Sin `limit` se mantiene el listado completo; con `limit` el cursor siguiente va en X-Next-Cursor
+    if not limit:
+        return await db(PatientService.list, activo)
+    try:
+        items, next_cursor = await db(PatientService.page, limit, cursor, activo)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
+
+
+@router.get("/buscar", response_model=List[PatientOut])
+async def buscar_pacientes(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    activo: Optional[bool] = None,
+    db: DbRunner = Depends(get_db_runner),
+    _=Depends(get_current_user),
+):
+    return await db(PatientService.buscar, q, limit, activo)
 
 
 @router.get("/{pid}", response_model=PatientOut)
-def get_paciente(pid: int, db: Session = Depends(get_db), _=Depends(get_current_user)):
+async def get_paciente(pid: int, db: DbRunner = Depends(get_db_runner), _=Depends(get_current_user)):
     try:
-        return PatientService.get(db, pid)
+        return await db(PatientService.get, pid)
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc))
 
@@ -32,6 +61,18 @@ def create_paciente(payload: PatientCreate, db: Session = Depends(get_db), _=Dep
         raise HTTPException(status_code=400, detail=str(exc))
 
 
+@router.post("/import", response_model=PatientImportResult)
+def importar_pacientes(archivo: UploadFile = File(...), db: Session = Depends(get_db), _=Depends(get_current_user)):
+    # El upload ya está en un archivo temporal (en disco si supera 1 MB): se lee por líneas
+    stream = io.TextIOWrapper(archivo.file, encoding="utf-8-sig", newline="")
+    try:
+        return PatientService.importar_csv(db, stream)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    finally:
+        stream.detach()
+
+
 @router.put("/{pid}", response_model=PatientOut)
 def update_paciente(pid: int, payload: PatientUpdate, db: Session = Depends(get_db), _=Depends(get_current_user)):
     try:
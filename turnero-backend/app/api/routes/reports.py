@@ -5,50 +5,51 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_user, get_read_db_runner
+from app.db.async_session import DbRunner
 from app.services.appointment_service import AppointmentService
 
 router = APIRouter(prefix="/reportes", tags=["reportes"])
 
 
 @router.get("/turnos-medico")
-def rpt_turnos_medico(
+async def rpt_turnos_medico(
     desde: Optional[str] = None,
     hasta: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: DbRunner = Depends(get_read_db_runner),
     _=Depends(get_current_user),
 ):
-    return AppointmentService.reportes_por_medico(db, desde, hasta)
+    return await db(AppointmentService.reportes_por_medico, desde, hasta)
 
 
 @router.get("/turnos-especialidad")
-def rpt_turnos_especialidad(db: Session = Depends(get_db), _=Depends(get_current_user)):
-    return AppointmentService.reportes_por_especialidad(db)
+async def rpt_turnos_especialidad(db: DbRunner = Depends(get_read_db_runner), _=Depends(get_current_user)):
+    return await db(AppointmentService.reportes_por_especialidad)
 
 
 @router.get("/pacientes-atendidos")
-def rpt_pacientes_atendidos(
+async def rpt_pacientes_atendidos(
     desde: str,
     hasta: str,
     medico_id: Optional[int] = None,
     especialidad_id: Optional[int] = None,
-    db: Session = Depends(get_db),
+    db: DbRunner = Depends(get_read_db_runner),
     _=Depends(get_current_user),
 ):
     try:
-        return AppointmentService.pacientes_atendidos(db, desde, hasta, medico_id, especialidad_id)
+        return await db(AppointmentService.pacientes_atendidos, desde, hasta, medico_id, especialidad_id)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
 
 @router.get("/asistencia")
-def rpt_asistencia(desde: str, hasta: str, db: Session = Depends(get_db), _=Depends(get_current_user)):
+async def rpt_asistencia(desde: str, hasta: str, db: DbRunner = Depends(get_read_db_runner), _=Depends(get_current_user)):
     try:
-        return AppointmentService.asistencia_vs_inasistencia(db, desde, hasta)
+        return await db(AppointmentService.asistencia_vs_inasistencia, desde, hasta)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
 
 @router.get("/resumen")
-def resumen(db: Session = Depends(get_db), _=Depends(get_current_user)):
-    return AppointmentService.resumen(db)
+async def resumen(db: DbRunner = Depends(get_read_db_runner), _=Depends(get_current_user)):
+    return await db(AppointmentService.resumen)
@@ -3,13 +3,14 @@ from sqlalchemy.orm import Session
 from typing import List
 from app.schemas.specialty import SpecialtyCreate, SpecialtyUpdate, SpecialtyOut
 from app.services.specialty_service import SpecialtyService
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_db, get_read_db_runner, get_current_user
+from app.db.async_session import DbRunner
 
 router = APIRouter(prefix="/especialidades", tags=["especialidades"])
 
 @router.get("", response_model=List[SpecialtyOut])
-def list_specialties(db: Session = Depends(get_db), _=Depends(get_current_user)):
-    return SpecialtyService.list(db)
+async def list_specialties(db: DbRunner = Depends(get_read_db_runner), _=Depends(get_current_user)):
+    return await db(SpecialtyService.list)
 
 @router.post("", response_model=SpecialtyOut)
 def create_specialty(payload: SpecialtyCreate, db: Session = Depends(get_db), _=Depends(get_current_user)):
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.api.deps import get_current_user, get_db
+from app.schemas.waitlist import WaitlistCreate, WaitlistOut
+from app.services.waitlist_service import WaitlistService
+
+router = APIRouter(prefix="/lista-espera", tags=["lista-espera"])
+
+@router.get("", response_model=List[WaitlistOut])
+def list_waitlist(medico_id: Optional[int] = None, especialidad_id: Optional[int] = None,
+                  paciente_id: Optional[int] = None, estado: Optional[str] = None,
+                  db: Session = Depends(get_db), _=Depends(get_current_user)):
+    return WaitlistService.list(db, medico_id, especialidad_id, paciente_id, estado)
+
+@router.post("", response_model=WaitlistOut)
+def create_waitlist(payload: WaitlistCreate, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    try:
+        return WaitlistService.crear(db, payload.model_dump(), user["id"])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/{eid}/cancelar")
+def cancelar_waitlist(eid: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    try:
+        WaitlistService.cancelar(db, eid, user["id"])
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"ok": True}
+
+@router.post("/{eid}/aceptar")
+def aceptar_waitlist(eid: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    try:
+        turno = WaitlistService.aceptar(db, eid, user["id"])
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"ok": True, "turno_id": turno.id}
@@ -1,13 +1,57 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List
+from typing import List, Optional
 
 class Settings(BaseSettings):
     APP_NAME: str = "Turnero Backend"
     BACKEND_CORS_ORIGINS: List[str] = ["http://127.0.0.1:5173", "http://localhost:5173"]
     DATABASE_URL: str = "sqlite:///./turnero.db"
+    # Pool de conexiones (no aplica a SQLite en memoria)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    # Camino async para las lecturas (requiere aiosqlite o asyncpg). Sin ASYNC_DATABASE_URL
+    # se usa DATABASE_URL con el driver async del mismo motor
+    DB_ASYNC: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Réplica de lectura para reportes y listados (otro archivo SQLite o una réplica de
+    # PostgreSQL). Si la demora medida en la réplica (cada REPLICA_LAG_CHECK_SECONDS)
+    # supera REPLICA_MAX_LAG_SECONDS esas lecturas van al primario
+    DATABASE_REPLICA_URL: Optional[str] = None
+    REPLICA_MAX_LAG_SECONDS: float = 2.0
+    REPLICA_LAG_CHECK_SECONDS: float = 1.0
+    # Perfil de SQLite, aplicado como PRAGMAs al abrir cada conexión
+    SQLITE_WAL: bool = True
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KIB: int = 64 * 1024
+    # Header Server-Timing con consultas/tiempo de base por request y aviso de N+1
+    QUERY_STATS_ENABLED: bool = False
+    QUERY_N1_THRESHOLD: int = 5
+    # Registro de consultas lentas con su plan (GET /admin/consultas-lentas); None lo desactiva
+    SLOW_QUERY_MS: Optional[float] = None
+    SLOW_QUERY_BUFFER: int = 200
+    # Archivo NDJSON donde además se agrega cada consulta lenta
+    SLOW_QUERY_LOG: Optional[str] = None
     JWT_SECRET: str = "change-me"
     JWT_ALG: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 480
+    # Índice en memoria de turnos por médico/paciente (solo para un único worker)
+    APPOINTMENT_INDEX_ENABLED: bool = False
+    # Reservas temporales de horarios (POST /turnos/hold)
+    SLOT_HOLD_TTL_SECONDS: int = 300
+    SLOT_HOLD_MAX_TTL_SECONDS: int = 1800
+    # Cada cuánto se barren los holds vencidos que no creó este proceso
+    SLOT_HOLD_SWEEP_SECONDS: int = 300
+    # Archivo de turnos históricos (POST /admin/archivar): turnos con más de
+    # ARCHIVE_AFTER_DAYS días, movidos de a ARCHIVE_BATCH_SIZE por transacción
+    ARCHIVE_AFTER_DAYS: int = 730
+    ARCHIVE_BATCH_SIZE: int = 500
+    # Tabla `slots` precalculada para /turnos/disponibles; POST /admin/slots corre el horizonte (diario)
+    SLOTS_MATERIALIZED_ENABLED: bool = False
+    SLOTS_DIAS_ADELANTE: int = 60
+    # Tiempo que se reserva un horario ofrecido a la lista de espera
+    WAITLIST_OFERTA_TTL_SECONDS: int = 1800
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
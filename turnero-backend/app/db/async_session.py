@@ -0,0 +1,87 @@
+"""Sesiones async para las rutas de lectura (DB_ASYNC=true).
+
+Los repositorios y servicios siguen siendo sync: `DbRunner` los ejecuta sobre un
+AsyncSession con `run_sync`, así el I/O lo hace el driver async (aiosqlite, asyncpg) en
+el event loop y la consulta no ocupa un thread del threadpool. Con DB_ASYNC=false el
+runner usa una Session común en el threadpool, igual que una ruta `def`.
+"""
+from typing import Any, Callable, Optional, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db import slow_queries
+from app.db.session import RoutingSession, _sqlite_pragmas, engine_options
+
+T = TypeVar("T")
+
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_url(url: str) -> URL:
+    """DATABASE_URL con el driver async equivalente (sqlite+aiosqlite, postgresql+asyncpg)."""
+    database = make_url(url)
+    backend = database.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise RuntimeError(f"DB_ASYNC no soporta el motor {backend}; definir ASYNC_DATABASE_URL")
+    return database.set(drivername=_ASYNC_DRIVERS[backend])
+
+
+def _create_async_engine(url: URL):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # Cada engine tendría su propia base en memoria, distinta de la de las escrituras
+        raise RuntimeError("DB_ASYNC no se puede usar con SQLite en memoria")
+    options = engine_options(url)
+    if url.get_backend_name() == "sqlite":
+        # aiosqlite usa NullPool por defecto; se mantiene el pool configurado
+        options["poolclass"] = AsyncAdaptedQueuePool
+    try:
+        created = create_async_engine(url, **options)
+    except ModuleNotFoundError as exc:
+        raise RuntimeError(f"DB_ASYNC requiere el driver {url.drivername} ({exc.name} no está instalado)") from exc
+    if created.dialect.name == "sqlite":
+        event.listen(created.sync_engine, "connect", _sqlite_pragmas)
+    if settings.SLOW_QUERY_MS is not None:
+        slow_queries.attach(created.sync_engine)
+    return created
+
+
+async_engine = None
+AsyncSessionLocal = None
+AsyncReadSessionLocal = None
+if settings.DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    async_engine = _create_async_engine(
+        make_url(settings.ASYNC_DATABASE_URL) if settings.ASYNC_DATABASE_URL else async_url(settings.DATABASE_URL)
+    )
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    AsyncReadSessionLocal = AsyncSessionLocal
+    if settings.DATABASE_REPLICA_URL:
+        async_replica_engine = _create_async_engine(async_url(settings.DATABASE_REPLICA_URL))
+        AsyncReadSessionLocal = async_sessionmaker(
+            sync_session_class=RoutingSession,
+            primary=async_engine.sync_engine,
+            replica=async_replica_engine.sync_engine,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+
+
+class DbRunner:
+    """Ejecuta `fn(db, *args, **kwargs)` sin bloquear el event loop."""
+
+    def __init__(self, db: Optional[Session] = None, session=None):
+        self.db = db
+        self.session = session
+
+    async def __call__(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if self.session is not None:
+            return await self.session.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, self.db, *args, **kwargs)
@@ -0,0 +1,267 @@
+"""Migraciones de esquema versionadas.
+
+`create_all` solo crea las tablas que faltan (con sus índices); las bases ya creadas se
+ponen al día con las migraciones de `MIGRACIONES`, en orden, y cada versión aplicada
+queda registrada en `schema_version`. Las migraciones son idempotentes: sobre una base
+recién creada por `create_all` no tienen nada que hacer y solo se registran.
+
+Cada migración lleva su DDL escrito acá (tablas, columnas e índices con nombre literal)
+y no lee los modelos: así aplica siempre lo mismo, aunque después los modelos cambien.
+Para cambiar el esquema se modifica el modelo y se agrega una migración con el número
+siguiente; nunca se edita una que ya se publicó.
+"""
+from datetime import datetime
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, insert, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+
+_meta = MetaData()
+schema_version = Table(
+    "schema_version",
+    _meta,
+    Column("version", Integer, primary_key=True),
+    Column("descripcion", String(200)),
+    Column("aplicada_en", DateTime),
+)
+
+# Clave del advisory lock que serializa las migraciones entre workers (PostgreSQL)
+_LOCK_KEY = 726_001
+
+
+class Migracion(NamedTuple):
+    version: int
+    descripcion: str
+    aplicar: Callable[[Connection], None]
+
+
+# Columnas nullable que se sumaron a `appointments` después de crear la tabla
+_COLUMNAS_AGREGADAS = [
+    ("appointments", "serie_id", "INTEGER"),
+    ("appointments", "reprogramado_de_id", "INTEGER"),
+]
+
+
+def _add_missing_columns(conn: Connection) -> None:
+    insp = inspect(conn)
+    for table_name, column_name, col_type in _COLUMNAS_AGREGADAS:
+        if not insp.has_table(table_name):
+            continue
+        if column_name in {c["name"] for c in insp.get_columns(table_name)}:
+            continue
+        conn.exec_driver_sql(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {col_type}")
+
+
+# Índices de las consultas frecuentes (los parciales valen igual en SQLite y PostgreSQL)
+_INDICES = [
+    ("appointments", "CREATE INDEX IF NOT EXISTS ix_appointments_especialidad_fecha ON appointments (especialidad_id, fecha)"),
+    ("appointments", "CREATE INDEX IF NOT EXISTS ix_appointments_estado_fecha ON appointments (estado, fecha)"),
+    ("appointments", "CREATE INDEX IF NOT EXISTS ix_appointments_fecha_id ON appointments (fecha, id)"),
+    ("appointments", "CREATE INDEX IF NOT EXISTS ix_appointments_medico_fecha ON appointments (medico_id, fecha)"),
+    ("appointments", "CREATE INDEX IF NOT EXISTS ix_appointments_paciente_fecha ON appointments (paciente_id, fecha)"),
+    (
+        "appointments",
+        "CREATE INDEX IF NOT EXISTS ix_appointments_reservados_medico_fecha ON appointments (medico_id, fecha) "
+        "WHERE estado = 'Reservado'",
+    ),
+    ("appointments", "CREATE INDEX IF NOT EXISTS ix_appointments_serie_id ON appointments (serie_id)"),
+    ("doctor_availability", "CREATE INDEX IF NOT EXISTS ix_doctor_availability_doctor_id ON doctor_availability (doctor_id)"),
+    (
+        "doctor_specialties",
+        "CREATE INDEX IF NOT EXISTS ix_doctor_specialties_specialty ON doctor_specialties (specialty_id, doctor_id)",
+    ),
+    ("doctors", "CREATE INDEX IF NOT EXISTS ix_doctors_apellido_nombre_id ON doctors (apellido, nombre, id)"),
+    ("patients", "CREATE INDEX IF NOT EXISTS ix_patients_activo_apellido ON patients (activo, apellido, nombre, id)"),
+    ("patients", "CREATE INDEX IF NOT EXISTS ix_patients_apellido_nombre_id ON patients (apellido, nombre, id)"),
+    (
+        "prescription_items",
+        "CREATE INDEX IF NOT EXISTS ix_prescription_items_prescription_id ON prescription_items (prescription_id)",
+    ),
+    ("prescriptions", "CREATE INDEX IF NOT EXISTS ix_prescriptions_consultation_id ON prescriptions (consultation_id)"),
+    (
+        "reminders",
+        "CREATE INDEX IF NOT EXISTS ix_reminders_appointment_programado ON reminders (appointment_id, programado_para)",
+    ),
+    (
+        "reminders",
+        "CREATE INDEX IF NOT EXISTS ix_reminders_pendientes ON reminders (programado_para) WHERE estado = 'PENDIENTE'",
+    ),
+    ("slot_holds", "CREATE INDEX IF NOT EXISTS ix_slot_holds_expira_en ON slot_holds (expira_en)"),
+    ("slot_holds", "CREATE INDEX IF NOT EXISTS ix_slot_holds_medico_fecha ON slot_holds (medico_id, fecha)"),
+    ("slots", "CREATE INDEX IF NOT EXISTS ix_slots_medico_inicio ON slots (medico_id, inicio)"),
+    (
+        "waitlist",
+        "CREATE INDEX IF NOT EXISTS ix_waitlist_especialidad_estado_desde "
+        "ON waitlist (especialidad_id, medico_id, estado, desde, hasta, duracion_min)",
+    ),
+    (
+        "waitlist",
+        "CREATE INDEX IF NOT EXISTS ix_waitlist_medico_estado_desde "
+        "ON waitlist (medico_id, estado, desde, hasta, duracion_min)",
+    ),
+]
+
+
+def _create_indexes(conn: Connection) -> None:
+    insp = inspect(conn)
+    for table_name, stmt in _INDICES:
+        if insp.has_table(table_name):
+            conn.exec_driver_sql(stmt)
+    # Sin estadísticas SQLite elige por heurística y prefiere (estado, fecha) al índice
+    # parcial de reservados por médico
+    conn.exec_driver_sql("ANALYZE")
+
+
+# Índice de búsqueda de pacientes (GET /pacientes/buscar). En SQLite es una tabla FTS5
+# con tokenizer trigram (subcadenas de 3+ caracteres) sincronizada por triggers; en
+# PostgreSQL un índice GIN pg_trgm sobre la misma expresión que usa PatientRepo.search.
+_SQLITE_PATIENT_SEARCH = [
+    """CREATE VIRTUAL TABLE patients_fts USING fts5(
+        apellido, nombre, dni, content='patients', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS patients_fts_ai AFTER INSERT ON patients BEGIN
+        INSERT INTO patients_fts(rowid, apellido, nombre, dni) VALUES (new.id, new.apellido, new.nombre, new.dni);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS patients_fts_ad AFTER DELETE ON patients BEGIN
+        INSERT INTO patients_fts(patients_fts, rowid, apellido, nombre, dni)
+        VALUES ('delete', old.id, old.apellido, old.nombre, old.dni);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS patients_fts_au AFTER UPDATE OF apellido, nombre, dni ON patients BEGIN
+        INSERT INTO patients_fts(patients_fts, rowid, apellido, nombre, dni)
+        VALUES ('delete', old.id, old.apellido, old.nombre, old.dni);
+        INSERT INTO patients_fts(rowid, apellido, nombre, dni) VALUES (new.id, new.apellido, new.nombre, new.dni);
+    END""",
+    "INSERT INTO patients_fts(patients_fts) VALUES ('rebuild')",
+]
+
+_POSTGRES_PATIENT_SEARCH = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """CREATE INDEX IF NOT EXISTS ix_patients_busqueda_trgm ON patients
+        USING gin ((apellido || ' ' || nombre || ' ' || dni) gin_trgm_ops)""",
+]
+
+
+def _install_patient_search(conn: Connection) -> None:
+    """Crea el índice de búsqueda; si el motor no lo soporta PatientRepo.search usa LIKE."""
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        if conn.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE name = 'patients_fts'").first():
+            return
+        try:
+            for stmt in _SQLITE_PATIENT_SEARCH:
+                conn.exec_driver_sql(stmt)
+        except OperationalError:
+            # SQLite sin FTS5/trigram (< 3.34)
+            pass
+    elif dialect == "postgresql":
+        try:
+            with conn.begin_nested():
+                for stmt in _POSTGRES_PATIENT_SEARCH:
+                    conn.exec_driver_sql(stmt)
+        except (OperationalError, ProgrammingError):
+            # Usuario sin permiso para CREATE EXTENSION
+            pass
+
+
+# Antes solo lo controlaba la aplicación, con un SELECT previo a cada alta
+_IDENTIDAD_UNICA = [("patients", "dni"), ("patients", "email"), ("doctors", "dni"), ("doctors", "email")]
+
+
+def _unique_identity(conn: Connection) -> None:
+    """DNI y email únicos en pacientes y médicos (índices ix_<tabla>_<columna>)."""
+    insp = inspect(conn)
+    for table_name, column_name in _IDENTIDAD_UNICA:
+        if not insp.has_table(table_name):
+            continue
+        index_name = f"ix_{table_name}_{column_name}"
+        existing = {i["name"]: i for i in insp.get_indexes(table_name)}
+        if existing.get(index_name, {}).get("unique"):
+            continue
+        repeated = conn.exec_driver_sql(
+            f"SELECT {column_name} FROM {table_name} WHERE {column_name} IS NOT NULL "
+            f"GROUP BY {column_name} HAVING count(*) > 1 LIMIT 1"
+        ).scalar()
+        if repeated is not None:
+            raise RuntimeError(f"No se puede crear {index_name}: {table_name}.{column_name} repetido ({repeated})")
+        if index_name in existing:
+            conn.exec_driver_sql(f"DROP INDEX {index_name}")
+        conn.exec_driver_sql(f"CREATE UNIQUE INDEX {index_name} ON {table_name} ({column_name})")
+
+
+def _waitlist_owner(conn: Connection) -> None:
+    """Usuario que anotó cada entrada de la lista de espera (las anteriores quedan sin dueño)."""
+    insp = inspect(conn)
+    if insp.has_table("waitlist") and "usuario_id" not in {c["name"] for c in insp.get_columns("waitlist")}:
+        conn.exec_driver_sql("ALTER TABLE waitlist ADD COLUMN usuario_id INTEGER")
+
+
+# Los índices de la migración 3 empiezan por (estado, desde): el ORDER BY id LIMIT de
+# WaitlistRepo.candidates tenía que leer y ordenar todas las entradas anteriores al horario
+_WAITLIST_INDICES = [
+    "DROP INDEX IF EXISTS ix_waitlist_medico_estado_desde",
+    "DROP INDEX IF EXISTS ix_waitlist_especialidad_estado_desde",
+    "CREATE INDEX IF NOT EXISTS ix_waitlist_medico_estado_id "
+    "ON waitlist (medico_id, estado, id, desde, hasta, duracion_min)",
+    "CREATE INDEX IF NOT EXISTS ix_waitlist_especialidad_estado_id "
+    "ON waitlist (especialidad_id, medico_id, estado, id, desde, hasta, duracion_min)",
+]
+
+
+def _waitlist_fifo_indexes(conn: Connection) -> None:
+    """Índices de la lista de espera ordenados por llegada dentro de cada (médico, estado)."""
+    if not inspect(conn).has_table("waitlist"):
+        return
+    for stmt in _WAITLIST_INDICES:
+        conn.exec_driver_sql(stmt)
+    conn.exec_driver_sql("ANALYZE")
+
+
+MIGRACIONES: List[Migracion] = [
+    Migracion(1, "Columnas nullable agregadas a los modelos", _add_missing_columns),
+    Migracion(2, "Búsqueda de pacientes (FTS5 trigram / pg_trgm)", _install_patient_search),
+    Migracion(3, "Índices de consultas frecuentes y parciales", _create_indexes),
+    Migracion(4, "DNI y email únicos en pacientes y médicos", _unique_identity),
+    Migracion(5, "Usuario dueño de cada entrada de la lista de espera", _waitlist_owner),
+    Migracion(6, "Índices de la lista de espera por orden de llegada", _waitlist_fifo_indexes),
+]
+
+
+def _lock(conn: Connection) -> None:
+    """Serializa las migraciones si varios workers arrancan a la vez."""
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        # Sin esto pysqlite ejecuta el DDL fuera de la transacción
+        if not conn.connection.dbapi_connection.in_transaction:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+    elif dialect == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+
+
+def _applied(conn: Connection) -> set:
+    return set(conn.execute(select(schema_version.c.version)).scalars())
+
+
+def upgrade(engine: Engine) -> List[int]:
+    """Aplica las migraciones pendientes, cada una en su transacción; devuelve las versiones aplicadas."""
+    _meta.create_all(engine)
+    with engine.connect() as conn:
+        pending = [m for m in MIGRACIONES if m.version not in _applied(conn)]
+    applied = []
+    for migration in pending:
+        with engine.begin() as conn:
+            _lock(conn)
+            if migration.version in _applied(conn):
+                continue
+            migration.aplicar(conn)
+            conn.execute(
+                insert(schema_version).values(
+                    version=migration.version,
+                    descripcion=migration.descripcion,
+                    aplicada_en=datetime.utcnow(),
+                )
+            )
+        applied.append(migration.version)
+    return applied
+
@@ -0,0 +1,126 @@
+"""Conteo de consultas SQL por request.
+
+Con QUERY_STATS_ENABLED cada respuesta lleva un header `Server-Timing` con la cantidad
+de sentencias y el tiempo en la base (visible en la pestaña Network del navegador), y
+se avisa en el log cuando una misma sentencia se repite QUERY_N1_THRESHOLD veces o más
+en un request: el patrón N+1 típico de un lazy load dentro de un loop.
+
+`count_queries` / `assert_max_queries` cuentan lo que pasa dentro de un bloque y sirven
+para fijar el presupuesto de consultas de un endpoint:
+
+    with assert_max_queries(3):
+        client.get("/turnos/agenda", headers=H)
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|\$\d+)\s*,)+\s*(?:\?|%\(\w+\)s|\$\d+)\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(statement: str) -> str:
+    """Sentencia sin espacios extra y con las listas IN (?, ?, ...) colapsadas."""
+    return _IN_LIST.sub("(?)", _SPACES.sub(" ", statement).strip())
+
+
+class QueryStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.elapsed_ms = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.elapsed_ms += elapsed_ms
+        self.statements[normalize(statement)] += 1
+
+    def repeated(self, threshold: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Sentencias ejecutadas `threshold` veces o más (candidatas a N+1)."""
+        threshold = threshold or settings.QUERY_N1_THRESHOLD
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+    def server_timing(self) -> str:
+        value = f'db;dur={self.elapsed_ms:.2f};desc="{self.count} consultas"'
+        repeated = self.repeated()
+        if repeated:
+            value += f', db-n1;desc="{len(repeated)} sentencias repetidas"'
+        return value
+
+
+# Estadísticas del request en curso (las copia el threadpool y run_sync)
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+# Contadores de count_queries() activos, sin importar el hilo o el request
+_blocks: List[QueryStats] = []
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._query_stats_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    if stats is None and not _blocks:
+        return
+    elapsed_ms = (time.perf_counter() - context._query_stats_start) * 1000
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+    for block in _blocks:
+        block.record(statement, elapsed_ms)
+
+
+def install() -> None:
+    """Escucha las sentencias de todos los engines (primario, réplica y async)."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        stats = QueryStats()
+        token = _current.set(stats)
+        try:
+            response = await call_next(request)
+        finally:
+            _current.reset(token)
+        response.headers["Server-Timing"] = stats.server_timing()
+        for sql, n in stats.repeated():
+            logger.warning("Posible N+1 en %s %s: %d veces %s", request.method, request.url.path, n, sql)
+        return response
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """Cuenta las sentencias ejecutadas dentro del bloque (para tests y scripts)."""
+    install()
+    stats = QueryStats()
+    _blocks.append(stats)
+    try:
+        yield stats
+    finally:
+        _blocks.remove(stats)
+
+
+@contextmanager
+def assert_max_queries(limit: int, allow_repeated: bool = False) -> Iterator[QueryStats]:
+    """Falla si el bloque ejecuta más de `limit` sentencias (o alguna N+1, salvo `allow_repeated`)."""
+    with count_queries() as stats:
+        yield stats
+    detail = "\n".join(f"  {n}x {sql}" for sql, n in stats.statements.most_common())
+    if stats.count > limit:
+        raise AssertionError(f"Se esperaban como máximo {limit} consultas y hubo {stats.count}:\n{detail}")
+    if not allow_repeated and stats.repeated():
+        raise AssertionError(f"Consultas repetidas (posible N+1):\n{detail}")
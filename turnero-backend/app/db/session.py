@@ -1,10 +1,131 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import time
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.pool import StaticPool
 from app.core.config import settings
+from app.db import slow_queries
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {},
-    future=True,
-)
+
+def _sqlite_pragmas(dbapi_connection, _record) -> None:
+    """Perfil de SQLite para escrituras concurrentes.
+
+    WAL deja leer mientras otro escribe y con synchronous=NORMAL el commit no espera
+    un fsync (solo el checkpoint); busy_timeout hace que un escritor espere el lock en
+    lugar de fallar con "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    if settings.SQLITE_WAL:
+        cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KIB)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def engine_options(url) -> dict:
+    database = make_url(url)
+    if database.get_backend_name() != "sqlite":
+        return {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+            "pool_pre_ping": True,
+        }
+    options = {"connect_args": {"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000}}
+    if database.database in (None, "", ":memory:"):
+        # Una base en memoria existe solo dentro de su conexión: se comparte una sola
+        options["poolclass"] = StaticPool
+    else:
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        )
+    return options
+
+
+def _create_engine(url: str) -> Engine:
+    created = create_engine(url, future=True, **engine_options(url))
+    if created.dialect.name == "sqlite":
+        event.listen(created, "connect", _sqlite_pragmas)
+    if settings.SLOW_QUERY_MS is not None:
+        slow_queries.attach(created)
+    return created
+
+
+engine = _create_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False, future=True)
+
+# Demora de cada réplica: engine -> (time.monotonic de la medición, segundos)
+_replica_lag: dict = {}
+_REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+def replica_lag(replica: Engine) -> float:
+    """Segundos que la réplica lleva atrasada respecto del primario, medidos en la réplica.
+
+    PostgreSQL: 0 si ya aplicó todo el WAL recibido; si no, la antigüedad de la última
+    transacción aplicada. Una copia SQLite no informa su demora (0). La medición se
+    reutiliza durante REPLICA_LAG_CHECK_SECONDS; si la réplica no responde cuenta como
+    atrasada.
+    """
+    now = time.monotonic()
+    checked = _replica_lag.get(replica)
+    if checked and now - checked[0] < settings.REPLICA_LAG_CHECK_SECONDS:
+        return checked[1]
+    lag = 0.0
+    if replica.dialect.name == "postgresql":
+        try:
+            with replica.connect() as conn:
+                lag = float(conn.scalar(_REPLICA_LAG_SQL) or 0)
+        except DBAPIError:
+            lag = float("inf")
+    _replica_lag[replica] = (now, lag)
+    return lag
+
+
+class RoutingSession(Session):
+    """Session que lee de la réplica y escribe en el primario.
+
+    Va al primario todo lo que no es una lectura ORM: INSERT/UPDATE/DELETE, el flush,
+    `connection()` explícito (locks, SQL crudo) y, una vez que la sesión escribió algo,
+    todas las lecturas que siguen (read-after-write en el mismo request). También se
+    lee del primario mientras la demora medida de la réplica supera REPLICA_MAX_LAG_SECONDS.
+    """
+
+    def __init__(self, *args, primary: Engine, replica: Engine, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.primary = primary
+        self.replica = replica
+        self.wrote = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.wrote = True
+        if self.wrote or (mapper is None and clause is None):
+            return self.primary
+        if replica_lag(self.replica) > settings.REPLICA_MAX_LAG_SECONDS:
+            return self.primary
+        return self.replica
+
+
+replica_engine = _create_engine(settings.DATABASE_REPLICA_URL) if settings.DATABASE_REPLICA_URL else None
+if replica_engine is not None:
+    ReadSessionLocal = sessionmaker(
+        class_=RoutingSession,
+        primary=engine,
+        replica=replica_engine,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+else:
+    ReadSessionLocal = SessionLocal
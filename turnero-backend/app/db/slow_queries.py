@@ -0,0 +1,122 @@
+"""Registro de consultas lentas (SLOW_QUERY_MS).
+
+Cada sentencia que tarda SLOW_QUERY_MS o más queda en un buffer circular (GET
+/admin/consultas-lentas) y, si hay SLOW_QUERY_LOG, como una línea JSON en ese archivo.
+Se guarda la sentencia, la forma de los parámetros (tipos, nunca valores: pueden ser
+datos de pacientes), la ruta que la ejecutó y el plan de ejecución, obtenido con
+EXPLAIN QUERY PLAN (SQLite) o EXPLAIN (PostgreSQL) sobre el cursor DBAPI de la misma
+conexión.
+"""
+import json
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Deque, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.config import settings
+
+_EXPLAIN = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN "}
+# Sentencias a las que se les pide el plan (EXPLAIN sin ANALYZE no las ejecuta)
+_EXPLICABLES = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")
+
+_buffer: Deque[dict] = deque(maxlen=settings.SLOW_QUERY_BUFFER)
+_lock = threading.Lock()
+# Scope ASGI del request en curso; FastAPI le agrega la ruta al resolverla
+_scope: ContextVar[Optional[dict]] = ContextVar("slow_query_scope", default=None)
+
+
+def _shape(parameters: Any) -> Any:
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def _route() -> Optional[str]:
+    scope = _scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+
+
+def _explain(conn, statement: str, parameters: Any) -> List[str]:
+    prefix = _EXPLAIN.get(conn.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith(_EXPLICABLES):
+        return []
+    # En PostgreSQL un error aborta la transacción entera: el EXPLAIN va en un savepoint
+    savepoint = conn.dialect.name == "postgresql"
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        if savepoint:
+            cursor.execute("SAVEPOINT explain_consulta_lenta")
+        cursor.execute(prefix + statement, parameters)
+        # SQLite devuelve (id, parent, notused, detail); PostgreSQL una columna por línea
+        plan = [str(row[-1]) for row in cursor.fetchall()]
+        if savepoint:
+            cursor.execute("RELEASE SAVEPOINT explain_consulta_lenta")
+        return plan
+    except Exception as exc:  # el plan es informativo: nunca debe romper la consulta
+        if savepoint:
+            cursor.execute("ROLLBACK TO SAVEPOINT explain_consulta_lenta")
+        return [f"EXPLAIN falló: {exc}"]
+    finally:
+        cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._slow_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed_ms = (time.perf_counter() - context._slow_query_start) * 1000
+    if elapsed_ms < settings.SLOW_QUERY_MS:
+        return
+    entry = {
+        "at": datetime.now().isoformat(timespec="milliseconds"),
+        "ms": round(elapsed_ms, 2),
+        "route": _route(),
+        "statement": statement,
+        "parameters": [_shape(p) for p in parameters[:1]] if executemany else _shape(parameters),
+        "executemany": len(parameters) if executemany else None,
+        "plan": [] if executemany else _explain(conn, statement, parameters),
+    }
+    with _lock:
+        _buffer.append(entry)
+        if settings.SLOW_QUERY_LOG:
+            with open(settings.SLOW_QUERY_LOG, "a", encoding="utf-8") as log:
+                log.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def attach(engine: Engine) -> None:
+    if not event.contains(engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def recent(limit: Optional[int] = None) -> List[dict]:
+    """Consultas lentas registradas, la más reciente primero."""
+    with _lock:
+        entries = list(reversed(_buffer))
+    return entries[:limit] if limit else entries
+
+
+def clear() -> None:
+    with _lock:
+        _buffer.clear()
+
+
+class SlowQueryMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        token = _scope.set(request.scope)
+        try:
+            return await call_next(request)
+        finally:
+            _scope.reset(token)
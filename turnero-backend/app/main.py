@@ -3,11 +3,20 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.db.session import engine, SessionLocal
 from app.db.base import Base
+from app.db import query_stats, slow_queries
+from app.db.migrations import upgrade
 from app.db.seed import seed
+from app.repositories.appointment_repo import appointment_index
+from app.repositories.hold_repo import HoldRepo
+from app.services.slot_service import SlotService
 
-from app.api.routes import auth, patients, doctors, specialties, appointments, reports
+from app.api.routes import admin, auth, patients, doctors, specialties, appointments, reports, waitlist
 
 def create_app() -> FastAPI:
+    if settings.APPOINTMENT_INDEX_ENABLED and not appointment_index.claim(engine):
+        # Otro worker (uvicorn --workers, gunicorn -w u otro servidor) ya usa el índice
+        # sobre esta base: cada uno vería solo sus propias altas y cancelaciones
+        raise RuntimeError("APPOINTMENT_INDEX_ENABLED requiere un único proceso por base de datos")
     app = FastAPI(title=settings.APP_NAME)
 
     app.add_middleware(
@@ -16,12 +25,22 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "Server-Timing"],
     )
+    if settings.QUERY_STATS_ENABLED:
+        query_stats.install()
+        app.add_middleware(query_stats.QueryStatsMiddleware)
+    if settings.SLOW_QUERY_MS is not None:
+        app.add_middleware(slow_queries.SlowQueryMiddleware)
 
     # DB init
     Base.metadata.create_all(bind=engine)
+    upgrade(engine)
     with SessionLocal() as db:
         seed(db)
+        SlotService.materializar(db)
+        # Holds vencidos de procesos anteriores: el heap de vencimientos arranca vacío
+        HoldRepo.sweep(db, force=True)
 
     # Routers
     app.include_router(auth.router)
@@ -30,6 +49,8 @@ def create_app() -> FastAPI:
     app.include_router(specialties.router)
     app.include_router(appointments.router)
     app.include_router(reports.router)
+    app.include_router(waitlist.router)
+    app.include_router(admin.router)
 
     @app.get("/health")
     def health():
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Integer, ForeignKey, Enum, DateTime, String
+from sqlalchemy import Integer, ForeignKey, Enum, DateTime, String, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
 import enum
@@ -10,8 +10,27 @@ class TurnoEstado(str, enum.Enum):
     Reprogramado = "Reprogramado"
     Atendido = "Atendido"
 
+# Estados que ya no ocupan el horario del médico ni del paciente
+ESTADOS_LIBRES = (TurnoEstado.Cancelado, TurnoEstado.Reprogramado)
+
 class Appointment(Base):
     __tablename__ = "appointments"
+    __table_args__ = (
+        Index("ix_appointments_medico_fecha", "medico_id", "fecha"),
+        Index("ix_appointments_paciente_fecha", "paciente_id", "fecha"),
+        # Listado paginado por (fecha, id) y sus filtros
+        Index("ix_appointments_fecha_id", "fecha", "id"),
+        Index("ix_appointments_especialidad_fecha", "especialidad_id", "fecha"),
+        Index("ix_appointments_estado_fecha", "estado", "fecha"),
+        # Solo turnos vigentes: agenda del día, reprogramación y recordatorios
+        Index(
+            "ix_appointments_reservados_medico_fecha",
+            "medico_id",
+            "fecha",
+            sqlite_where=text("estado = 'Reservado'"),
+            postgresql_where=text("estado = 'Reservado'"),
+        ),
+    )
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     paciente_id: Mapped[int] = mapped_column(ForeignKey("patients.id", ondelete="RESTRICT"))
     medico_id: Mapped[int] = mapped_column(ForeignKey("doctors.id", ondelete="RESTRICT"))
@@ -20,6 +39,13 @@ class Appointment(Base):
     duracion_min: Mapped[int] = mapped_column(Integer, default=30)
     estado: Mapped[TurnoEstado] = mapped_column(Enum(TurnoEstado), default=TurnoEstado.Reservado)
     receta_url: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    serie_id: Mapped[int | None] = mapped_column(
+        ForeignKey("appointment_series.id", ondelete="SET NULL"), nullable=True, index=True
+    )
+    # Turno original cuando este surge de una reprogramación (el original queda Reprogramado)
+    reprogramado_de_id: Mapped[int | None] = mapped_column(
+        ForeignKey("appointments.id", ondelete="SET NULL"), nullable=True
+    )
 
     # opcional: relaciones (no requeridas por endpoints)
     paciente = relationship("Patient")
@@ -0,0 +1,20 @@
+from datetime import date, datetime, time
+from sqlalchemy import ForeignKey, String, Integer, Date, DateTime, Time
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class AppointmentSeries(Base):
+    __tablename__ = "appointment_series"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    paciente_id: Mapped[int] = mapped_column(ForeignKey("patients.id", ondelete="RESTRICT"))
+    medico_id: Mapped[int] = mapped_column(ForeignKey("doctors.id", ondelete="RESTRICT"))
+    especialidad_id: Mapped[int] = mapped_column(ForeignKey("specialties.id", ondelete="RESTRICT"))
+    dias_semana: Mapped[str] = mapped_column(String(20))  # "1,3" (0=Monday)
+    hora: Mapped[time] = mapped_column(Time)
+    duracion_min: Mapped[int] = mapped_column(Integer, default=30)
+    desde: Mapped[date] = mapped_column(Date)
+    semanas: Mapped[int] = mapped_column(Integer)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,82 @@
+"""Tablas de archivo de turnos históricos (ver ArchiveService).
+
+Mismas columnas e ids que las tablas vivas, sin claves foráneas: un turno archivado
+puede referir a un paciente o médico que después se dé de baja, y las filas se copian
+tal cual desde `appointments`, `consultations`, `prescriptions`, `prescription_items` y
+`reminders`.
+"""
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, Enum, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+from app.models.appointment import TurnoEstado
+
+
+class ArchivedAppointment(Base):
+    __tablename__ = "appointments_archive"
+    __table_args__ = (
+        Index("ix_appointments_archive_medico_fecha", "medico_id", "fecha"),
+        Index("ix_appointments_archive_paciente_fecha", "paciente_id", "fecha"),
+        Index("ix_appointments_archive_especialidad_fecha", "especialidad_id", "fecha"),
+        Index("ix_appointments_archive_fecha", "fecha"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    paciente_id: Mapped[int] = mapped_column(Integer)
+    medico_id: Mapped[int] = mapped_column(Integer)
+    especialidad_id: Mapped[int] = mapped_column(Integer)
+    fecha: Mapped[datetime] = mapped_column(DateTime)
+    duracion_min: Mapped[int] = mapped_column(Integer)
+    estado: Mapped[TurnoEstado] = mapped_column(Enum(TurnoEstado))
+    receta_url: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    serie_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    reprogramado_de_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    archivado_en: Mapped[datetime] = mapped_column(DateTime)
+
+
+class ArchivedConsultation(Base):
+    __tablename__ = "consultations_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    appointment_id: Mapped[int] = mapped_column(Integer, index=True)
+    motivo: Mapped[str | None] = mapped_column(Text, nullable=True)
+    observaciones: Mapped[str | None] = mapped_column(Text, nullable=True)
+    diagnostico: Mapped[str | None] = mapped_column(Text, nullable=True)
+    indicaciones: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime)
+
+
+class ArchivedPrescription(Base):
+    __tablename__ = "prescriptions_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    consultation_id: Mapped[int] = mapped_column(Integer, index=True)
+    fecha_emision: Mapped[date] = mapped_column(Date)
+    estado: Mapped[str] = mapped_column(String(20))
+    firma_digital: Mapped[str | None] = mapped_column(String(200), nullable=True)
+
+
+class ArchivedPrescriptionItem(Base):
+    __tablename__ = "prescription_items_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    prescription_id: Mapped[int] = mapped_column(Integer, index=True)
+    medicamento: Mapped[str] = mapped_column(String(200))
+    dosis: Mapped[str | None] = mapped_column(String(160), nullable=True)
+    frecuencia: Mapped[str | None] = mapped_column(String(160), nullable=True)
+    duracion: Mapped[str | None] = mapped_column(String(160), nullable=True)
+    indicaciones: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+
+class ArchivedReminder(Base):
+    __tablename__ = "reminders_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    appointment_id: Mapped[int] = mapped_column(Integer, index=True)
+    canal: Mapped[str] = mapped_column(String(20))
+    programado_para: Mapped[datetime] = mapped_column(DateTime)
+    enviado_en: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    estado: Mapped[str] = mapped_column(String(20))
+    error_msg: Mapped[str | None] = mapped_column(String(200), nullable=True)
@@ -18,3 +18,8 @@ class Consultation(Base):
 
     appointment = relationship("Appointment", back_populates="consultation")
     prescriptions = relationship("Prescription", cascade="all, delete-orphan", back_populates="consultation")
+
+    @property
+    def receta(self):
+        """Receta emitida en la consulta (ConsultationOut.receta); se registra a lo sumo una."""
+        return self.prescriptions[0] if self.prescriptions else None
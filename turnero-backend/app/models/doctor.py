@@ -1,7 +1,7 @@
 from datetime import time
 from datetime import time
 
-from sqlalchemy import String, Boolean, Table, Column, ForeignKey, Integer, Time, SmallInteger
+from sqlalchemy import String, Boolean, Table, Column, ForeignKey, Index, Integer, Time, SmallInteger
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
 
@@ -11,17 +11,20 @@ doctor_specialty = Table(
     Base.metadata,
     Column("doctor_id", Integer, ForeignKey("doctors.id", ondelete="CASCADE"), primary_key=True),
     Column("specialty_id", Integer, ForeignKey("specialties.id", ondelete="RESTRICT"), primary_key=True),
+    # La PK cubre doctor -> especialidades; este cubre especialidad -> médicos
+    Index("ix_doctor_specialties_specialty", "specialty_id", "doctor_id"),
 )
 
 
 class Doctor(Base):
     __tablename__ = "doctors"
+    __table_args__ = (Index("ix_doctors_apellido_nombre_id", "apellido", "nombre", "id"),)
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     nombre: Mapped[str] = mapped_column(String(80))
     apellido: Mapped[str] = mapped_column(String(80))
-    dni: Mapped[str] = mapped_column(String(20), index=True)
+    dni: Mapped[str] = mapped_column(String(20), unique=True, index=True)
     genero: Mapped[str | None] = mapped_column(String(20), nullable=True)
-    email: Mapped[str | None] = mapped_column(String(120), nullable=True)
+    email: Mapped[str | None] = mapped_column(String(120), nullable=True, unique=True, index=True)
     telefono: Mapped[str | None] = mapped_column(String(30), nullable=True)
     direccion: Mapped[str | None] = mapped_column(String(120), nullable=True)
     matricula: Mapped[str] = mapped_column(String(40), unique=True)
@@ -39,7 +42,7 @@ class Doctor(Base):
 class DoctorAvailability(Base):
     __tablename__ = "doctor_availability"
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    doctor_id: Mapped[int] = mapped_column(ForeignKey("doctors.id", ondelete="CASCADE"))
+    doctor_id: Mapped[int] = mapped_column(ForeignKey("doctors.id", ondelete="CASCADE"), index=True)
     day_of_week: Mapped[int] = mapped_column(SmallInteger)  # 0=Monday
     start_time: Mapped[time] = mapped_column(Time)
     end_time: Mapped[time] = mapped_column(Time)
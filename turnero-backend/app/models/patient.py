@@ -1,19 +1,24 @@
 from datetime import datetime, date
-from sqlalchemy import String, Boolean, Date, DateTime
+from sqlalchemy import String, Boolean, Date, DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db.base import Base
 
 class Patient(Base):
     __tablename__ = "patients"
+    __table_args__ = (
+        # Orden de los listados paginados (keyset sobre apellido, nombre, id)
+        Index("ix_patients_apellido_nombre_id", "apellido", "nombre", "id"),
+        Index("ix_patients_activo_apellido", "activo", "apellido", "nombre", "id"),
+    )
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     nombre: Mapped[str] = mapped_column(String(80))
     apellido: Mapped[str] = mapped_column(String(80))
-    dni: Mapped[str] = mapped_column(String(20), index=True)
+    dni: Mapped[str] = mapped_column(String(20), unique=True, index=True)
     fecha_nacimiento: Mapped[date] = mapped_column(Date)
     genero: Mapped[str | None] = mapped_column(String(20), nullable=True)
     direccion: Mapped[str | None] = mapped_column(String(120), nullable=True)
     telefono: Mapped[str | None] = mapped_column(String(30), nullable=True)
-    email: Mapped[str | None] = mapped_column(String(120), nullable=True)
+    email: Mapped[str | None] = mapped_column(String(120), nullable=True, unique=True, index=True)
     obra_social: Mapped[str | None] = mapped_column(String(120), nullable=True)
     nro_afiliado: Mapped[str | None] = mapped_column(String(50), nullable=True)
     activo: Mapped[bool] = mapped_column(Boolean, default=True)
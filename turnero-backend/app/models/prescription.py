@@ -9,7 +9,7 @@ class Prescription(Base):
     __tablename__ = "prescriptions"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    consultation_id: Mapped[int] = mapped_column(ForeignKey("consultations.id", ondelete="CASCADE"))
+    consultation_id: Mapped[int] = mapped_column(ForeignKey("consultations.id", ondelete="CASCADE"), index=True)
     fecha_emision: Mapped[date] = mapped_column(Date)
     estado: Mapped[str] = mapped_column(String(20), default="ACTIVA")
     firma_digital: Mapped[str | None] = mapped_column(String(200), nullable=True)
@@ -22,7 +22,7 @@ class PrescriptionItem(Base):
     __tablename__ = "prescription_items"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    prescription_id: Mapped[int] = mapped_column(ForeignKey("prescriptions.id", ondelete="CASCADE"))
+    prescription_id: Mapped[int] = mapped_column(ForeignKey("prescriptions.id", ondelete="CASCADE"), index=True)
     medicamento: Mapped[str] = mapped_column(String(200))
     dosis: Mapped[str | None] = mapped_column(String(160), nullable=True)
     frecuencia: Mapped[str | None] = mapped_column(String(160), nullable=True)
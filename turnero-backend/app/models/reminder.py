@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import ForeignKey, String, DateTime
+from sqlalchemy import ForeignKey, String, DateTime, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -7,6 +7,16 @@ from app.db.base import Base
 
 class Reminder(Base):
     __tablename__ = "reminders"
+    __table_args__ = (
+        Index("ix_reminders_appointment_programado", "appointment_id", "programado_para"),
+        # Cola de envío: solo los que faltan mandar
+        Index(
+            "ix_reminders_pendientes",
+            "programado_para",
+            sqlite_where=text("estado = 'PENDIENTE'"),
+            postgresql_where=text("estado = 'PENDIENTE'"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     appointment_id: Mapped[int] = mapped_column(ForeignKey("appointments.id", ondelete="CASCADE"))
@@ -0,0 +1,28 @@
+from datetime import date, datetime
+from sqlalchemy import ForeignKey, Integer, Date, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class DoctorSlot(Base):
+    """Slot precalculado de la agenda de un médico; `ocupados` cuenta los turnos que lo pisan."""
+
+    __tablename__ = "slots"
+    __table_args__ = (Index("ix_slots_medico_inicio", "medico_id", "inicio"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    medico_id: Mapped[int] = mapped_column(ForeignKey("doctors.id", ondelete="CASCADE"))
+    inicio: Mapped[datetime] = mapped_column(DateTime)
+    fin: Mapped[datetime] = mapped_column(DateTime)
+    ocupados: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class SlotHorizon(Base):
+    """Rango de días [desde, hasta] ya materializado en `slots` para cada médico."""
+
+    __tablename__ = "slot_horizons"
+
+    medico_id: Mapped[int] = mapped_column(ForeignKey("doctors.id", ondelete="CASCADE"), primary_key=True)
+    desde: Mapped[date] = mapped_column(Date)
+    hasta: Mapped[date] = mapped_column(Date)
@@ -0,0 +1,19 @@
+from datetime import datetime
+from sqlalchemy import ForeignKey, Integer, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class SlotHold(Base):
+    """Reserva temporal de un horario mientras se completa el alta del turno."""
+
+    __tablename__ = "slot_holds"
+    __table_args__ = (Index("ix_slot_holds_medico_fecha", "medico_id", "fecha"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    medico_id: Mapped[int] = mapped_column(ForeignKey("doctors.id", ondelete="CASCADE"))
+    fecha: Mapped[datetime] = mapped_column(DateTime)
+    duracion_min: Mapped[int] = mapped_column(Integer, default=30)
+    expira_en: Mapped[datetime] = mapped_column(DateTime, index=True)
+    usuario_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
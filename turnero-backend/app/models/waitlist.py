@@ -0,0 +1,42 @@
+from datetime import datetime
+from sqlalchemy import Boolean, ForeignKey, Integer, DateTime, String, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class WaitlistEntry(Base):
+    """Paciente en lista de espera para un médico (o cualquier médico de una especialidad)."""
+
+    __tablename__ = "waitlist"
+    __table_args__ = (
+        # WaitlistRepo.candidates: una búsqueda por igualdad hasta `estado` que ya devuelve las
+        # entradas por orden de llegada (id); la ventana y la duración se filtran en el índice
+        Index("ix_waitlist_medico_estado_id", "medico_id", "estado", "id", "desde", "hasta", "duracion_min"),
+        Index(
+            "ix_waitlist_especialidad_estado_id",
+            "especialidad_id",
+            "medico_id",
+            "estado",
+            "id",
+            "desde",
+            "hasta",
+            "duracion_min",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    paciente_id: Mapped[int] = mapped_column(ForeignKey("patients.id", ondelete="CASCADE"))
+    especialidad_id: Mapped[int] = mapped_column(ForeignKey("specialties.id", ondelete="RESTRICT"))
+    medico_id: Mapped[int | None] = mapped_column(ForeignKey("doctors.id", ondelete="CASCADE"), nullable=True)
+    desde: Mapped[datetime] = mapped_column(DateTime)
+    hasta: Mapped[datetime] = mapped_column(DateTime)
+    duracion_min: Mapped[int] = mapped_column(Integer, default=30)
+    auto_reservar: Mapped[bool] = mapped_column(Boolean, default=False)
+    estado: Mapped[str] = mapped_column(String(20), default="PENDIENTE")
+    hold_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    oferta_expira: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    turno_id: Mapped[int | None] = mapped_column(ForeignKey("appointments.id", ondelete="SET NULL"), nullable=True)
+    # Usuario que anotó al paciente: solo él puede aceptar o cancelar la entrada
+    usuario_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,254 @@
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from threading import RLock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+try:
+    import fcntl
+except ImportError:  # Windows: no hay flock
+    fcntl = None
+
+from app.models.appointment import ESTADOS_LIBRES, Appointment
+
+# (inicio, fin, id) ordenado por inicio
+Interval = Tuple[datetime, datetime, int]
+Key = Tuple[str, int]
+
+# session.info: claves con escrituras sin commit en esa sesión -> recargar al terminar
+_PENDING = "appointment_index.pending"
+
+
+class AppointmentIndex:
+    """Índice en memoria de turnos ocupados por médico y por paciente.
+
+    Cada clave ("medico", id) / ("paciente", id) se carga la primera vez que se
+    consulta, con los turnos que ocupan horario desde ese momento en adelante, y luego
+    se mantiene con add/discard desde AppointmentRepo. Las consultas que caen
+    antes del horizonte cargado devuelven None para que el llamador use la DB.
+
+    Dentro de AppointmentService.reserva un "no se solapa" del índice reemplaza a la
+    consulta SQL. Para eso cada alta o movimiento marca sus claves con `touch` antes
+    del commit: mientras una clave tiene escrituras sin confirmar el índice no responde
+    por ella (devuelve None) y no la carga, y al terminar la transacción (eventos de
+    Session) vuelve a quedar limpia, o se descarta si hubo rollback. Un "se solapa" se
+    confirma siempre con la DB: las bajas se aplican recién después del commit.
+
+    Es un índice por proceso: con varios workers cada uno vería solo sus propias
+    escrituras. Por eso viene desactivado por defecto y la app no arranca con
+    APPOINTMENT_INDEX_ENABLED si no obtiene `claim`, el lock exclusivo de la base.
+    """
+
+    def __init__(self, lookback: timedelta, enabled: bool = False):
+        self.enabled = enabled
+        self._lookback = lookback
+        self._lock = RLock()
+        self._items: Dict[Key, List[Interval]] = {}
+        self._horizon: Dict[Key, datetime] = {}
+        self._by_id: Dict[int, Tuple[datetime, datetime, int, int]] = {}
+        # Escrituras sin commit por clave, de cualquier sesión
+        self._dirty: Dict[Key, int] = {}
+        self._claim = None
+
+    # --- único proceso ---
+    def claim(self, engine: Engine) -> bool:
+        """Toma un lock exclusivo que dura lo que el proceso; False si otro proceso ya lo tiene.
+
+        SQLite: flock sobre `<base>.index.lock` (otros workers u otros servidores en el
+        mismo host). PostgreSQL: advisory lock de sesión en una conexión propia.
+        """
+        if self._claim is not None:
+            return True
+        if engine.dialect.name == "postgresql":
+            conn = engine.connect()
+            if not conn.scalar(text("SELECT pg_try_advisory_lock(0, 0)")):
+                conn.close()
+                return False
+            conn.commit()
+            self._claim = conn
+            return True
+        database = engine.url.database
+        if database in (None, "", ":memory:"):
+            # Una base en memoria solo existe dentro de este proceso
+            self._claim = True
+            return True
+        if fcntl is None:
+            return False
+        lock_file = open(f"{database}.index.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._claim = lock_file
+        return True
+
+    def release_claim(self) -> None:
+        if self._claim is not None and self._claim is not True:
+            self._claim.close()
+        self._claim = None
+
+    # --- escrituras en curso ---
+    def touch(self, db: Session, keys: Iterable[Key], reload: bool = False) -> None:
+        """Marca claves con escrituras sin commit en `db` hasta que termine su transacción.
+
+        Con `reload` (cambios que no pasan por `write`, como un INSERT o UPDATE masivo)
+        las claves se descartan al terminar y se recargan en la próxima consulta.
+        """
+        if not self.enabled:
+            return
+        pending = db.info.setdefault(_PENDING, {})
+        with self._lock:
+            for key in keys:
+                if key not in pending:
+                    self._dirty[key] = self._dirty.get(key, 0) + 1
+                pending[key] = pending.get(key, False) or reload
+
+    def settle(self, db: Session, committed: bool) -> None:
+        """Fin de la transacción de `db`: limpia sus claves; con rollback además las descarta."""
+        pending = db.info.pop(_PENDING, None)
+        if not pending:
+            return
+        with self._lock:
+            for key, reload in pending.items():
+                count = self._dirty.pop(key, 0) - 1
+                if count > 0:
+                    self._dirty[key] = count
+                if reload or not committed:
+                    self._items.pop(key, None)
+                    self._horizon.pop(key, None)
+
+    # --- carga ---
+    def _ensure(self, db: Session, key: Key) -> Optional[List[Interval]]:
+        """Intervalos de la clave, cargándola si hace falta; None si tiene escrituras sin commit."""
+        if key in self._dirty:
+            return None
+        items = self._items.get(key)
+        if items is not None:
+            return items
+        kind, key_id = key
+        column = Appointment.medico_id if kind == "medico" else Appointment.paciente_id
+        horizon = datetime.now() - self._lookback
+        stmt = select(
+            Appointment.id,
+            Appointment.fecha,
+            Appointment.duracion_min,
+            Appointment.medico_id,
+            Appointment.paciente_id,
+        ).where(
+            column == key_id,
+            Appointment.fecha >= horizon,
+            Appointment.estado.not_in(ESTADOS_LIBRES),
+        )
+        items = []
+        for ap_id, fecha, duracion, medico_id, paciente_id in db.execute(stmt):
+            fin = fecha + timedelta(minutes=duracion)
+            items.append((fecha, fin, ap_id))
+            self._by_id[ap_id] = (fecha, fin, medico_id, paciente_id)
+        items.sort()
+        self._items[key] = items
+        self._horizon[key] = horizon
+        return items
+
+    def _covers(self, key: Key, items: Optional[List[Interval]], desde: datetime) -> bool:
+        return items is not None and desde - self._lookback >= self._horizon[key]
+
+    # --- consultas ---
+    def _scan(self, items: List[Interval], inicio: datetime, fin: datetime, exclude_id: Optional[int] = None):
+        lo = bisect_left(items, (inicio - self._lookback,))
+        hi = bisect_left(items, (fin,))
+        for start, end, ap_id in items[lo:hi]:
+            if end > inicio and ap_id != exclude_id:
+                yield start, end
+
+    def overlaps(
+        self,
+        db: Session,
+        doctor_id: int,
+        patient_id: int,
+        inicio: datetime,
+        duracion: int,
+        exclude_id: Optional[int] = None,
+    ) -> Optional[bool]:
+        fin = inicio + timedelta(minutes=duracion)
+        with self._lock:
+            for key in (("medico", doctor_id), ("paciente", patient_id)):
+                items = self._ensure(db, key)
+                if not self._covers(key, items, inicio):
+                    return None
+                if next(self._scan(items, inicio, fin, exclude_id), None):
+                    return True
+        return False
+
+    def between(self, db: Session, medico_id: int, desde: datetime, hasta: datetime) -> Optional[List[Tuple[datetime, datetime]]]:
+        key = ("medico", medico_id)
+        with self._lock:
+            items = self._ensure(db, key)
+            if not self._covers(key, items, desde):
+                return None
+            return list(self._scan(items, desde, hasta))
+
+    # --- mantenimiento ---
+    def write(self, db: Session, ap: Appointment) -> None:
+        """Alta o movimiento de `ap` en la transacción de `db`, antes del commit (ya con id)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            keys = [("medico", ap.medico_id), ("paciente", ap.paciente_id)]
+            previous = self._by_id.get(ap.id)
+            if previous:
+                keys += [("medico", previous[2]), ("paciente", previous[3])]
+            self.touch(db, keys)
+            self.add(ap)
+
+    def add(self, ap: Appointment) -> None:
+        with self._lock:
+            self.discard(ap.id)
+            if ap.estado in ESTADOS_LIBRES:
+                return
+            fin = ap.fecha + timedelta(minutes=ap.duracion_min)
+            self._by_id[ap.id] = (ap.fecha, fin, ap.medico_id, ap.paciente_id)
+            for key in (("medico", ap.medico_id), ("paciente", ap.paciente_id)):
+                if key in self._items and ap.fecha >= self._horizon[key]:
+                    insort(self._items[key], (ap.fecha, fin, ap.id))
+
+    def discard(self, ap_id: int) -> None:
+        with self._lock:
+            entry = self._by_id.pop(ap_id, None)
+            if not entry:
+                return
+            fecha, fin, medico_id, paciente_id = entry
+            for key in (("medico", medico_id), ("paciente", paciente_id)):
+                items = self._items.get(key)
+                if items is None:
+                    continue
+                pos = bisect_left(items, (fecha, fin, ap_id))
+                if pos < len(items) and items[pos][2] == ap_id:
+                    del items[pos]
+
+    def invalidate(self, medico_id: Optional[int] = None, paciente_id: Optional[int] = None) -> None:
+        """Descarta las claves indicadas; se recargan en la próxima consulta."""
+        with self._lock:
+            for key in (("medico", medico_id), ("paciente", paciente_id)):
+                if key[1] is None:
+                    continue
+                self._items.pop(key, None)
+                self._horizon.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._horizon.clear()
+            self._by_id.clear()
+
+    # --- eventos de Session ---
+    def after_commit(self, session: Session) -> None:
+        self.settle(session, committed=True)
+
+    def after_transaction_end(self, session: Session, transaction) -> None:
+        # Rollback, o close() con la transacción abierta: after_commit ya limpió las confirmadas
+        if transaction.parent is None:
+            self.settle(session, committed=False)
@@ -1,56 +1,281 @@
 from datetime import datetime, timedelta
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Iterable, List, Optional, Sequence, Tuple
 
-from sqlalchemy import select, or_
+from sqlalchemy import String, cast, event, exists, func, insert, select, or_, text, update
 from sqlalchemy.orm import Session
 
-from app.models.appointment import Appointment, TurnoEstado
+from app.core.config import settings
+from app.models.appointment import ESTADOS_LIBRES, Appointment, TurnoEstado
+from app.models.doctor import Doctor
+from app.models.patient import Patient
+from app.models.specialty import Specialty
+from app.repositories.appointment_index import AppointmentIndex
+from app.repositories.pagination import keyset_page
+
+# Duración máxima que puede tener un turno; acota la ventana de búsqueda de solapamientos.
+MAX_DURACION = timedelta(hours=12)
+
+# Columnas de GET /turnos?expand=nombres (todas) y de la agenda (lo que muestra la tabla)
+COLUMNAS_TURNO = tuple(Appointment.__table__.columns)
+COLUMNAS_AGENDA = (
+    Appointment.id,
+    Appointment.fecha,
+    Appointment.duracion_min,
+    Appointment.estado,
+    Appointment.paciente_id,
+)
+_NOMBRES = (
+    (Patient.apellido + ", " + Patient.nombre).label("paciente_nombre"),
+    (Doctor.apellido + ", " + Doctor.nombre).label("medico_nombre"),
+    Specialty.nombre.label("especialidad_nombre"),
+)
+
+appointment_index = AppointmentIndex(lookback=MAX_DURACION, enabled=settings.APPOINTMENT_INDEX_ENABLED)
+event.listen(Session, "after_commit", appointment_index.after_commit)
+event.listen(Session, "after_transaction_end", appointment_index.after_transaction_end)
 
 class AppointmentRepo:
     @staticmethod
-    def list(
-        db: Session,
+    def _filtered(
         medico_id: int | None = None,
         desde: datetime | None = None,
         hasta: datetime | None = None,
-    ) -> List[Appointment]:
-        stmt = select(Appointment)
+        paciente_id: int | None = None,
+        especialidad_id: int | None = None,
+        estado: TurnoEstado | None = None,
+        columns: Optional[Sequence] = None,
+    ):
+        stmt = select(*columns) if columns else select(Appointment)
         if medico_id:
             stmt = stmt.where(Appointment.medico_id == medico_id)
+        if paciente_id:
+            stmt = stmt.where(Appointment.paciente_id == paciente_id)
+        if especialidad_id:
+            stmt = stmt.where(Appointment.especialidad_id == especialidad_id)
+        if estado:
+            stmt = stmt.where(Appointment.estado == estado)
         if desde:
             stmt = stmt.where(Appointment.fecha >= desde)
         if hasta:
             stmt = stmt.where(Appointment.fecha <= hasta)
-        stmt = stmt.order_by(Appointment.fecha)
+        return stmt
+
+    @staticmethod
+    def list(
+        db: Session,
+        medico_id: int | None = None,
+        desde: datetime | None = None,
+        hasta: datetime | None = None,
+        **filters,
+    ) -> List[Appointment]:
+        stmt = AppointmentRepo._filtered(medico_id, desde, hasta, **filters).order_by(Appointment.fecha, Appointment.id)
         return list(db.execute(stmt).scalars().all())
 
     @staticmethod
-    def create(db: Session, **data) -> Appointment:
+    def page(
+        db: Session,
+        limit: int,
+        cursor: Optional[str] = None,
+        **filters,
+    ) -> Tuple[List[Appointment], Optional[str]]:
+        stmt = AppointmentRepo._filtered(**filters)
+        return keyset_page(db, stmt, (Appointment.fecha, Appointment.id), limit, cursor)
+
+    @staticmethod
+    def named(
+        db: Session,
+        columns: Sequence,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        **filters,
+    ) -> Tuple[List[dict], Optional[str]]:
+        """`columns` de los turnos más los nombres de paciente, médico y especialidad.
+
+        Un solo SELECT con JOIN que devuelve dicts, sin hidratar objetos ORM; con
+        `limit` pagina por (fecha, id) igual que `page`.
+        """
+        stmt = (
+            AppointmentRepo._filtered(columns=(*columns, *_NOMBRES), **filters)
+            .join(Patient, Patient.id == Appointment.paciente_id)
+            .join(Doctor, Doctor.id == Appointment.medico_id)
+            .join(Specialty, Specialty.id == Appointment.especialidad_id)
+        )
+        keys = (Appointment.fecha, Appointment.id)
+        if limit is None:
+            rows, next_cursor = db.execute(stmt.order_by(*keys)).all(), None
+        else:
+            rows, next_cursor = keyset_page(db, stmt, keys, limit, cursor, scalars=False)
+        return [dict(row._mapping) for row in rows], next_cursor
+
+    @staticmethod
+    def busy(db: Session, medico_id: int, desde: datetime, hasta: datetime) -> List[Tuple[datetime, datetime]]:
+        """Intervalos (inicio, fin) ocupados del médico que tocan [desde, hasta)."""
+        if appointment_index.enabled:
+            intervals = appointment_index.between(db, medico_id, desde, hasta)
+            if intervals is not None:
+                return intervals
+
+        stmt = (
+            select(Appointment.fecha, Appointment.duracion_min)
+            .where(
+                Appointment.medico_id == medico_id,
+                Appointment.fecha >= desde - MAX_DURACION,
+                Appointment.fecha < hasta,
+                Appointment.estado.not_in(ESTADOS_LIBRES),
+            )
+            .order_by(Appointment.fecha)
+        )
+        intervals = []
+        for fecha, duracion in db.execute(stmt):
+            fin = fecha + timedelta(minutes=duracion)
+            if fin > desde:
+                intervals.append((fecha, fin))
+        return intervals
+
+    @staticmethod
+    def busy_many(db: Session, medico_ids: List[int], desde: datetime, hasta: datetime) -> List[Tuple[int, datetime, datetime]]:
+        """Intervalos (medico_id, inicio, fin) ocupados de varios médicos en una sola consulta."""
+        if not medico_ids:
+            return []
+        stmt = (
+            select(Appointment.medico_id, Appointment.fecha, Appointment.duracion_min)
+            .where(
+                Appointment.medico_id.in_(medico_ids),
+                Appointment.fecha >= desde - MAX_DURACION,
+                Appointment.fecha < hasta,
+                Appointment.estado.not_in(ESTADOS_LIBRES),
+            )
+            .order_by(Appointment.medico_id, Appointment.fecha)
+        )
+        intervals = []
+        for medico_id, fecha, duracion in db.execute(stmt):
+            fin = fecha + timedelta(minutes=duracion)
+            if fin > desde:
+                intervals.append((medico_id, fecha, fin))
+        return intervals
+
+    @staticmethod
+    def busy_for(
+        db: Session,
+        medico_ids: List[int],
+        paciente_ids: List[int],
+        desde: datetime,
+        hasta: datetime,
+    ) -> List[Tuple[int, int, int, datetime, datetime]]:
+        """Intervalos (id, medico_id, paciente_id, inicio, fin) de varios médicos o pacientes en una sola consulta."""
+        if not medico_ids and not paciente_ids:
+            return []
+        stmt = select(
+            Appointment.id, Appointment.medico_id, Appointment.paciente_id, Appointment.fecha, Appointment.duracion_min
+        ).where(
+            or_(Appointment.medico_id.in_(medico_ids), Appointment.paciente_id.in_(paciente_ids)),
+            Appointment.fecha >= desde - MAX_DURACION,
+            Appointment.fecha < hasta,
+            Appointment.estado.not_in(ESTADOS_LIBRES),
+        )
+        intervals = []
+        for ap_id, medico_id, paciente_id, fecha, duracion in db.execute(stmt):
+            fin = fecha + timedelta(minutes=duracion)
+            if fin > desde:
+                intervals.append((ap_id, medico_id, paciente_id, fecha, fin))
+        return intervals
+
+    @staticmethod
+    def create(db: Session, *, auto_commit: bool = True, **data) -> Appointment:
         obj = Appointment(**data)
         db.add(obj)
+        db.flush()
+        # Antes del commit: la clave queda marcada hasta que termine la transacción
+        appointment_index.write(db, obj)
+        if not auto_commit:
+            return obj
         db.commit()
         db.refresh(obj)
         return obj
 
+    @staticmethod
+    def create_many(db: Session, rows: List[dict]) -> List[int]:
+        """Inserta varios turnos con un único executemany y un solo commit; devuelve los ids en orden.
+
+        Los ids se asocian a cada fila por (medico_id, fecha), que es única entre turnos ya
+        validados: `sort_by_parameter_order` haría que SQLite emita un INSERT por fila.
+        """
+        if not rows:
+            return []
+        stmt = insert(Appointment).returning(Appointment.id, Appointment.medico_id, Appointment.fecha)
+        ids = {(medico_id, fecha): ap_id for ap_id, medico_id, fecha in db.execute(stmt, rows)}
+        ids = [ids[(row["medico_id"], row["fecha"])] for row in rows]
+        keys = {("medico", row["medico_id"]) for row in rows} | {("paciente", row["paciente_id"]) for row in rows}
+        appointment_index.touch(db, keys, reload=True)
+        db.commit()
+        return ids
+
     @staticmethod
     def get(db: Session, tid: int) -> Optional[Appointment]:
         return db.get(Appointment, tid)
 
+    @staticmethod
+    def get_for_update(db: Session, tid: int) -> Optional[Appointment]:
+        """Relee el turno desde la base dentro de un bloque de reserva.
+
+        Descarta lo que la sesión tenía cargado (populate_existing) y en PostgreSQL toma
+        el lock de la fila (FOR UPDATE; SQLite ya tiene el lock de escritura).
+        """
+        stmt = (
+            select(Appointment)
+            .where(Appointment.id == tid)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        return db.execute(stmt).scalar_one_or_none()
+
     @staticmethod
     def update(db: Session, tid: int, **data) -> Appointment:
         obj = db.get(Appointment, tid)
         for k, v in data.items():
             setattr(obj, k, v)
+        db.flush()
+        appointment_index.write(db, obj)
         db.commit()
         db.refresh(obj)
         return obj
 
     @staticmethod
-    def cancel(db: Session, tid: int):
+    def cancel(db: Session, tid: int, *, auto_commit: bool = True):
         obj = db.get(Appointment, tid)
         obj.estado = TurnoEstado.Cancelado
+        if not auto_commit:
+            # El llamador hace el commit y actualiza appointment_index
+            db.flush()
+            return
         db.commit()
+        appointment_index.discard(tid)
+
+    @staticmethod
+    def reserved_between(db: Session, medico_id: int, desde: datetime, hasta: datetime) -> List[Appointment]:
+        stmt = (
+            select(Appointment)
+            .where(
+                Appointment.medico_id == medico_id,
+                Appointment.fecha >= desde,
+                Appointment.fecha < hasta,
+                Appointment.estado == TurnoEstado.Reservado,
+            )
+            .order_by(Appointment.fecha)
+        )
+        return list(db.execute(stmt).scalars().all())
+
+    @staticmethod
+    def mark_rescheduled(db: Session, ids: List[int]) -> None:
+        """Marca turnos como Reprogramado sin commit; el llamador inserta los nuevos en la misma transacción."""
+        stmt = (
+            update(Appointment)
+            .where(Appointment.id.in_(ids))
+            .values(estado=TurnoEstado.Reprogramado)
+            .execution_options(synchronize_session="fetch")
+        )
+        db.execute(stmt)
 
     @staticmethod
     def atender(db: Session, tid: int, receta_url: str | None = None, *, auto_commit: bool = True):
@@ -61,33 +286,64 @@ class AppointmentRepo:
         if auto_commit:
             db.commit()
 
+    @staticmethod
+    def lock_booking(db: Session, medico_ids: Iterable[int], paciente_ids: Iterable[int]) -> None:
+        """Serializa las reservas de esos médicos/pacientes hasta el commit o rollback.
+
+        En SQLite toma el lock de escritura de la base con BEGIN IMMEDIATE; en PostgreSQL,
+        advisory locks transaccionales por médico y por paciente, siempre en el mismo
+        orden para no generar deadlocks.
+        """
+        conn = db.connection()
+        dialect = conn.dialect.name
+        if dialect == "sqlite":
+            # Estado real de la conexión del driver (sqlite3 o aiosqlite, según DB_ASYNC):
+            # pysqlite abre la transacción recién con la primera escritura
+            if not conn.connection.driver_connection.in_transaction:
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+        elif dialect == "postgresql":
+            keys = sorted({(1, m) for m in medico_ids} | {(2, p) for p in paciente_ids})
+            for kind, key in keys:
+                conn.execute(text("SELECT pg_advisory_xact_lock(:kind, :key)"), {"kind": kind, "key": key})
+
+    @staticmethod
+    def _fin_expr(db: Session):
+        """Expresión SQL para `fecha + duracion_min` según el dialecto."""
+        if db.get_bind().dialect.name == "sqlite":
+            return func.datetime(Appointment.fecha, "+" + cast(Appointment.duracion_min, String) + " minutes")
+        return Appointment.fecha + func.make_interval(0, 0, 0, 0, 0, Appointment.duracion_min)
+
     @staticmethod
     def overlaps(
         db: Session,
         doctor_id: int,
-        patient_id: int,
+        patient_id: Optional[int],
         inicio: datetime,
         duracion: int,
         exclude_id: Optional[int] = None,
     ) -> bool:
+        """Si el turno pisa otro del médico o del paciente; definitivo dentro de AppointmentService.reserva."""
+        if appointment_index.enabled and patient_id is not None:
+            # Un "no se solapa" del índice (claves cargadas y sin escrituras en curso)
+            # reemplaza a la consulta; un solapamiento se confirma con la DB, así una baja
+            # que el índice todavía no aplicó nunca rechaza un turno
+            if appointment_index.overlaps(db, doctor_id, patient_id, inicio, duracion, exclude_id) is False:
+                return False
+
         fin = inicio + timedelta(minutes=duracion)
-        stmt = (
-            select(Appointment)
-            .where(
-                Appointment.estado != TurnoEstado.Cancelado,
-                or_(
-                    Appointment.medico_id == doctor_id,
-                    Appointment.paciente_id == patient_id,
-                ),
-            )
-            .order_by(Appointment.fecha)
-        )
+        # Solo se miran turnos que empiezan dentro de la ventana [inicio - MAX_DURACION, fin):
+        # así cada EXISTS recorre un rango acotado de ix_appointments_*_fecha.
+        ventana = [
+            Appointment.fecha >= inicio - MAX_DURACION,
+            Appointment.fecha < fin,
+            AppointmentRepo._fin_expr(db) > inicio,
+            Appointment.estado.not_in(ESTADOS_LIBRES),
+        ]
         if exclude_id:
-            stmt = stmt.where(Appointment.id != exclude_id)
-
-        candidates = db.execute(stmt).scalars().all()
-        for ap in candidates:
-            ap_end = ap.fecha + timedelta(minutes=ap.duracion_min)
-            if ap.fecha < fin and inicio < ap_end:
-                return True
-        return False
+            ventana.append(Appointment.id != exclude_id)
+
+        medico = exists().where(Appointment.medico_id == doctor_id, *ventana)
+        if patient_id is None:
+            return bool(db.scalar(select(medico)))
+        paciente = exists().where(Appointment.paciente_id == patient_id, *ventana)
+        return bool(db.scalar(select(or_(medico, paciente))))
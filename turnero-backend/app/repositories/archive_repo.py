@@ -0,0 +1,172 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, func, insert, literal, select, union_all, update
+from sqlalchemy.orm import Session
+
+from app.models.appointment import Appointment, TurnoEstado
+from app.models.archive import (
+    ArchivedAppointment,
+    ArchivedConsultation,
+    ArchivedPrescription,
+    ArchivedPrescriptionItem,
+    ArchivedReminder,
+)
+from app.models.consultation import Consultation
+from app.models.prescription import Prescription, PrescriptionItem
+from app.models.reminder import Reminder
+from app.models.waitlist import WaitlistEntry
+
+# Solo se archivan turnos cerrados; un Reservado pasado (ausente sin registrar) queda en
+# la tabla viva hasta que se lo atienda o cancele
+ESTADOS_ARCHIVABLES = (TurnoEstado.Atendido, TurnoEstado.Cancelado, TurnoEstado.Reprogramado)
+
+# Columnas de los reportes, comunes a `appointments` y `appointments_archive`
+_COLUMNAS_REPORTE = ("id", "paciente_id", "medico_id", "especialidad_id", "fecha", "estado")
+
+
+def _copiar(db: Session, archivo, vivo, where, **extra) -> int:
+    """INSERT ... SELECT de las filas de `vivo` que cumplen `where` en su tabla de archivo."""
+    columnas = [c.name for c in archivo.__table__.columns if c.name not in extra]
+    origen = select(*[vivo.__table__.c[n] for n in columnas], *[literal(v) for v in extra.values()]).where(where)
+    return db.execute(insert(archivo).from_select(columnas + list(extra), origen)).rowcount
+
+
+def _borrar(db: Session, modelo, where) -> None:
+    db.execute(delete(modelo).where(where).execution_options(synchronize_session=False))
+
+
+class ArchiveRepo:
+    @staticmethod
+    def ids_to_archive(db: Session, antes_de: datetime, limit: int) -> List[int]:
+        stmt = (
+            select(Appointment.id)
+            .where(Appointment.fecha < antes_de, Appointment.estado.in_(ESTADOS_ARCHIVABLES))
+            .order_by(Appointment.id)
+            .limit(limit)
+        )
+        return list(db.execute(stmt).scalars().all())
+
+    @staticmethod
+    def move(db: Session, ids: List[int]) -> Dict[str, int]:
+        """Copia los turnos `ids` y sus dependientes al archivo y los borra de las tablas vivas.
+
+        No hace commit: el lote entero entra en la transacción del llamador.
+        """
+        consultas = list(db.execute(select(Consultation.id).where(Consultation.appointment_id.in_(ids))).scalars())
+        recetas = list(
+            db.execute(select(Prescription.id).where(Prescription.consultation_id.in_(consultas))).scalars()
+        )
+        movidos = {
+            "turnos": _copiar(
+                db, ArchivedAppointment, Appointment, Appointment.id.in_(ids), archivado_en=datetime.utcnow()
+            ),
+            "consultas": _copiar(db, ArchivedConsultation, Consultation, Consultation.id.in_(consultas)),
+            "recetas": _copiar(db, ArchivedPrescription, Prescription, Prescription.id.in_(recetas)),
+            "recordatorios": _copiar(db, ArchivedReminder, Reminder, Reminder.appointment_id.in_(ids)),
+        }
+        _copiar(db, ArchivedPrescriptionItem, PrescriptionItem, PrescriptionItem.prescription_id.in_(recetas))
+
+        _borrar(db, PrescriptionItem, PrescriptionItem.prescription_id.in_(recetas))
+        _borrar(db, Prescription, Prescription.id.in_(recetas))
+        _borrar(db, Consultation, Consultation.id.in_(consultas))
+        _borrar(db, Reminder, Reminder.appointment_id.in_(ids))
+        # Lo mismo que haría el ON DELETE SET NULL de las FKs (SQLite no las aplica)
+        db.execute(
+            update(WaitlistEntry)
+            .where(WaitlistEntry.turno_id.in_(ids))
+            .values(turno_id=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            update(Appointment)
+            .where(Appointment.reprogramado_de_id.in_(ids), Appointment.id.not_in(ids))
+            .values(reprogramado_de_id=None)
+            .execution_options(synchronize_session=False)
+        )
+        _borrar(db, Appointment, Appointment.id.in_(ids))
+        return movidos
+
+    @staticmethod
+    def newest(db: Session) -> Optional[datetime]:
+        """Fecha del turno archivado más reciente (None si el archivo está vacío)."""
+        return db.scalar(select(func.max(ArchivedAppointment.fecha)))
+
+    @staticmethod
+    def appointments(db: Session, desde: Optional[datetime] = None, hasta: Optional[datetime] = None):
+        """Turnos del rango para los reportes: subquery con id, paciente_id, medico_id,
+        especialidad_id, fecha y estado.
+
+        Solo agrega `appointments_archive` (UNION ALL) si el rango empieza antes del
+        turno archivado más reciente.
+        """
+        selects = []
+        modelos = [Appointment]
+        newest = ArchiveRepo.newest(db)
+        if newest is not None and (desde is None or desde <= newest):
+            modelos.append(ArchivedAppointment)
+        for modelo in modelos:
+            stmt = select(*[getattr(modelo, n) for n in _COLUMNAS_REPORTE])
+            if desde is not None:
+                stmt = stmt.where(modelo.fecha >= desde)
+            if hasta is not None:
+                stmt = stmt.where(modelo.fecha <= hasta)
+            selects.append(stmt)
+        if len(selects) == 1:
+            return selects[0].subquery("turnos")
+        return union_all(*selects).subquery("turnos")
+
+    @staticmethod
+    def consultations_by_patient(db: Session, patient_id: int) -> List[dict]:
+        """Consultas archivadas del paciente con la forma de ConsultationOut."""
+        consultas = db.execute(
+            select(ArchivedConsultation)
+            .join(ArchivedAppointment, ArchivedAppointment.id == ArchivedConsultation.appointment_id)
+            .where(ArchivedAppointment.paciente_id == patient_id)
+            .order_by(ArchivedConsultation.created_at.desc())
+        ).scalars().all()
+        if not consultas:
+            return []
+        recetas = db.execute(
+            select(ArchivedPrescription)
+            .where(ArchivedPrescription.consultation_id.in_([c.id for c in consultas]))
+            .order_by(ArchivedPrescription.id)
+        ).scalars().all()
+        items = defaultdict(list)
+        if recetas:
+            stmt = (
+                select(ArchivedPrescriptionItem)
+                .where(ArchivedPrescriptionItem.prescription_id.in_([r.id for r in recetas]))
+                .order_by(ArchivedPrescriptionItem.id)
+            )
+            for item in db.execute(stmt).scalars():
+                items[item.prescription_id].append(item)
+        receta_por_consulta = {}
+        for receta in recetas:
+            receta_por_consulta.setdefault(receta.consultation_id, receta)
+        return [
+            {
+                "id": c.id,
+                "appointment_id": c.appointment_id,
+                "created_at": c.created_at,
+                "motivo": c.motivo,
+                "observaciones": c.observaciones,
+                "diagnostico": c.diagnostico,
+                "indicaciones": c.indicaciones,
+                "receta": _receta(receta_por_consulta.get(c.id), items),
+            }
+            for c in consultas
+        ]
+
+
+def _receta(receta: Optional[ArchivedPrescription], items) -> Optional[dict]:
+    if receta is None:
+        return None
+    return {
+        "id": receta.id,
+        "fecha_emision": receta.fecha_emision,
+        "estado": receta.estado,
+        "firma_digital": receta.firma_digital,
+        "items": items[receta.id],
+    }
@@ -1,25 +1,76 @@
 from datetime import time
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, selectinload
 
-from app.models.doctor import Doctor, DoctorAvailability
+from app.models.doctor import Doctor, DoctorAvailability, doctor_specialty
 from app.models.specialty import Specialty
+from app.repositories.pagination import keyset_page
+from app.repositories.slot_repo import SlotRepo
 
 
 class DoctorRepo:
     @staticmethod
-    def list(db: Session) -> List[Doctor]:
+    def _filtered(activo: Optional[bool], especialidad_id: Optional[int]):
+        stmt = select(Doctor).options(
+            selectinload(Doctor.specialties),
+            selectinload(Doctor.availability),
+        )
+        if activo is not None:
+            stmt = stmt.where(Doctor.activo.is_(activo))
+        if especialidad_id:
+            stmt = stmt.join(doctor_specialty, doctor_specialty.c.doctor_id == Doctor.id).where(
+                doctor_specialty.c.specialty_id == especialidad_id
+            )
+        return stmt
+
+    @staticmethod
+    def list(db: Session, activo: Optional[bool] = None, especialidad_id: Optional[int] = None) -> List[Doctor]:
+        stmt = DoctorRepo._filtered(activo, especialidad_id).order_by(Doctor.apellido, Doctor.nombre)
+        return list(db.execute(stmt).scalars().all())
+
+    @staticmethod
+    def page(
+        db: Session,
+        limit: int,
+        cursor: Optional[str] = None,
+        activo: Optional[bool] = None,
+        especialidad_id: Optional[int] = None,
+    ) -> Tuple[List[Doctor], Optional[str]]:
+        stmt = DoctorRepo._filtered(activo, especialidad_id)
+        return keyset_page(db, stmt, (Doctor.apellido, Doctor.nombre, Doctor.id), limit, cursor)
+
+    @staticmethod
+    def availability_for(
+        db: Session,
+        *,
+        especialidad_id: Optional[int] = None,
+        medico_ids: Optional[Iterable[int]] = None,
+    ) -> List:
+        """Franjas de disponibilidad de médicos activos, con su nombre, en una sola consulta."""
         stmt = (
-            select(Doctor)
-            .options(
-                selectinload(Doctor.specialties),
-                selectinload(Doctor.availability),
+            select(
+                DoctorAvailability.doctor_id,
+                DoctorAvailability.day_of_week,
+                DoctorAvailability.start_time,
+                DoctorAvailability.end_time,
+                DoctorAvailability.slot_minutes,
+                Doctor.apellido,
+                Doctor.nombre,
             )
-            .order_by(Doctor.apellido, Doctor.nombre)
+            .join(Doctor, Doctor.id == DoctorAvailability.doctor_id)
+            .where(Doctor.activo.is_(True))
+            .order_by(Doctor.apellido, Doctor.nombre, DoctorAvailability.start_time)
         )
-        return list(db.execute(stmt).scalars().all())
+        if especialidad_id:
+            stmt = stmt.join(doctor_specialty, doctor_specialty.c.doctor_id == Doctor.id).where(
+                doctor_specialty.c.specialty_id == especialidad_id
+            )
+        if medico_ids:
+            stmt = stmt.where(Doctor.id.in_(list(medico_ids)))
+        return list(db.execute(stmt).all())
 
     @staticmethod
     def _load_specialties(db: Session, ids: Iterable[int]) -> List[Specialty]:
@@ -43,32 +94,42 @@ class DoctorRepo:
         return availability
 
     @staticmethod
-    def _ensure_unique(
+    def _duplicate(
         db: Session,
         *,
         dni: str,
         email: Optional[str],
         matricula: str,
         exclude_id: Optional[int] = None,
-    ) -> None:
-        stmt = select(Doctor).where(Doctor.dni == dni)
-        if exclude_id:
-            stmt = stmt.where(Doctor.id != exclude_id)
-        if db.execute(stmt).scalar_one_or_none():
-            raise ValueError("Ya existe un médico con ese DNI")
-
+    ) -> Optional[str]:
+        """Mensaje si otro médico ya tiene ese DNI, email o matrícula (una sola consulta), si no None."""
+        conditions = [Doctor.dni == dni, Doctor.matricula == matricula]
         if email:
-            stmt = select(Doctor).where(Doctor.email == email)
-            if exclude_id:
-                stmt = stmt.where(Doctor.id != exclude_id)
-            if db.execute(stmt).scalar_one_or_none():
-                raise ValueError("Ya existe un médico con ese email")
-
-        stmt = select(Doctor).where(Doctor.matricula == matricula)
+            conditions.append(Doctor.email == email)
+        stmt = select(Doctor.dni, Doctor.matricula).where(or_(*conditions))
         if exclude_id:
             stmt = stmt.where(Doctor.id != exclude_id)
-        if db.execute(stmt).scalar_one_or_none():
-            raise ValueError("Ya existe un médico con esa matrícula")
+        found = db.execute(stmt.limit(1)).first()
+        if found is None:
+            return None
+        if found.dni == dni:
+            return "Ya existe un médico con ese DNI"
+        if found.matricula == matricula:
+            return "Ya existe un médico con esa matrícula"
+        return "Ya existe un médico con ese email"
+
+    @staticmethod
+    def _commit_unique(db: Session, doctor: Doctor, exclude_id: Optional[int] = None) -> None:
+        """Commit que traduce la violación de los índices únicos de DNI/email/matrícula a su mensaje."""
+        dni, email, matricula = doctor.dni, doctor.email, doctor.matricula
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            message = DoctorRepo._duplicate(db, dni=dni, email=email, matricula=matricula, exclude_id=exclude_id)
+            if message:
+                raise ValueError(message)
+            raise
 
     @staticmethod
     def create(
@@ -78,17 +139,11 @@ class DoctorRepo:
         availability: Iterable[dict] | None = None,
         **data,
     ) -> Doctor:
-        DoctorRepo._ensure_unique(
-            db,
-            dni=data["dni"],
-            email=data.get("email"),
-            matricula=data["matricula"],
-        )
         doctor = Doctor(**{k: v for k, v in data.items() if k not in {"specialties", "availability"}})
         doctor.specialties = DoctorRepo._load_specialties(db, specialties or [])
         doctor.availability = DoctorRepo._build_availability(availability or [])
         db.add(doctor)
-        db.commit()
+        DoctorRepo._commit_unique(db, doctor)
         db.refresh(doctor)
         return doctor
 
@@ -96,6 +151,18 @@ class DoctorRepo:
     def get(db: Session, did: int) -> Optional[Doctor]:
         return db.get(Doctor, did)
 
+    @staticmethod
+    def get_many(db: Session, ids: Iterable[int]) -> Dict[int, Doctor]:
+        stmt = (
+            select(Doctor)
+            .options(
+                selectinload(Doctor.specialties),
+                selectinload(Doctor.availability),
+            )
+            .where(Doctor.id.in_(list(ids)))
+        )
+        return {d.id: d for d in db.execute(stmt).scalars().all()}
+
     @staticmethod
     def get_full(db: Session, did: int) -> Optional[Doctor]:
         stmt = (
@@ -121,14 +188,6 @@ class DoctorRepo:
         if not doctor:
             raise ValueError("Médico inexistente")
 
-        DoctorRepo._ensure_unique(
-            db,
-            dni=data.get("dni", doctor.dni),
-            email=data.get("email", doctor.email),
-            matricula=doctor.matricula,
-            exclude_id=did,
-        )
-
         for key, value in data.items():
             setattr(doctor, key, value)
 
@@ -136,8 +195,9 @@ class DoctorRepo:
             doctor.specialties = DoctorRepo._load_specialties(db, specialties)
         if availability is not None:
             doctor.availability = DoctorRepo._build_availability(availability)
+            SlotRepo.regenerate(db, did, doctor.availability)
 
-        db.commit()
+        DoctorRepo._commit_unique(db, doctor, exclude_id=did)
         db.refresh(doctor)
         return doctor
 
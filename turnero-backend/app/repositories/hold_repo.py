@@ -0,0 +1,138 @@
+import heapq
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.slot_hold import SlotHold
+from app.repositories.appointment_repo import MAX_DURACION
+
+
+class _ExpiryHeap:
+    """Vencimientos de los holds creados por este proceso, ordenados en un heap.
+
+    Permite saber en O(1) si hay algo vencido para barrer, sin consultar la tabla. Los
+    holds de otros procesos (o de antes de un reinicio) no están en el heap: para esos
+    se barre la tabla entera cada SLOT_HOLD_SWEEP_SECONDS.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, int]] = []
+        self._lock = Lock()
+        self._last_sweep = datetime.min
+
+    def push(self, expira_en: datetime, hid: int) -> None:
+        with self._lock:
+            heapq.heappush(self._heap, (expira_en, hid))
+
+    def pop_expired(self, now: datetime) -> bool:
+        popped = False
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                heapq.heappop(self._heap)
+                popped = True
+        return popped
+
+    def sweep_due(self, now: datetime, every: int) -> bool:
+        """True si pasaron `every` segundos desde el último barrido periódico (y lo reprograma)."""
+        with self._lock:
+            if now < self._last_sweep + timedelta(seconds=every):
+                return False
+            self._last_sweep = now
+            return True
+
+
+expiry_heap = _ExpiryHeap()
+
+
+class HoldRepo:
+    @staticmethod
+    def create(db: Session, *, auto_commit: bool = True, **data) -> SlotHold:
+        hold = SlotHold(**data)
+        db.add(hold)
+        if auto_commit:
+            db.commit()
+            db.refresh(hold)
+        else:
+            db.flush()
+        expiry_heap.push(hold.expira_en, hold.id)
+        return hold
+
+    @staticmethod
+    def get_many(db: Session, ids: Iterable[int]) -> Dict[int, SlotHold]:
+        ids = {hid for hid in ids if hid}
+        if not ids:
+            return {}
+        return {hold.id: hold for hold in db.execute(select(SlotHold).where(SlotHold.id.in_(ids))).scalars()}
+
+    @staticmethod
+    def release(
+        db: Session,
+        hid: int,
+        medico_id: Optional[int] = None,
+        usuario_id: Optional[int] = None,
+        *,
+        auto_commit: bool = True,
+    ) -> int:
+        stmt = delete(SlotHold).where(SlotHold.id == hid)
+        if medico_id is not None:
+            stmt = stmt.where(SlotHold.medico_id == medico_id)
+        if usuario_id is not None:
+            stmt = stmt.where(SlotHold.usuario_id == usuario_id)
+        count = db.execute(stmt).rowcount
+        if auto_commit:
+            db.commit()
+        return count
+
+    @staticmethod
+    def sweep(db: Session, force: bool = False) -> int:
+        """Borra todos los holds vencidos de la tabla.
+
+        Solo toca la tabla si el heap indica que venció alguno de este proceso o si toca el
+        barrido periódico.
+        """
+        now = datetime.now()
+        expired = expiry_heap.pop_expired(now)
+        due = expiry_heap.sweep_due(now, settings.SLOT_HOLD_SWEEP_SECONDS)
+        if not (expired or due or force):
+            return 0
+        count = db.execute(delete(SlotHold).where(SlotHold.expira_en <= now)).rowcount
+        db.commit()
+        return count
+
+    @staticmethod
+    def overlaps(
+        db: Session,
+        medico_id: int,
+        inicio: datetime,
+        duracion: int,
+        exclude_id: Optional[int] = None,
+    ) -> bool:
+        fin = inicio + timedelta(minutes=duracion)
+        return any(
+            hid != exclude_id for hid, _, _, _ in HoldRepo.busy_many(db, [medico_id], inicio, fin)
+        )
+
+    @staticmethod
+    def busy_many(
+        db: Session, medico_ids: Iterable[int], desde: datetime, hasta: datetime
+    ) -> List[Tuple[int, int, datetime, datetime]]:
+        """Holds vigentes (id, medico_id, inicio, fin) que tocan [desde, hasta)."""
+        medico_ids = list(medico_ids)
+        if not medico_ids:
+            return []
+        stmt = select(SlotHold.id, SlotHold.medico_id, SlotHold.fecha, SlotHold.duracion_min).where(
+            SlotHold.medico_id.in_(medico_ids),
+            SlotHold.fecha >= desde - MAX_DURACION,
+            SlotHold.fecha < hasta,
+            SlotHold.expira_en > datetime.now(),
+        )
+        holds = []
+        for hid, medico_id, fecha, duracion in db.execute(stmt):
+            fin = fecha + timedelta(minutes=duracion)
+            if fin > desde:
+                holds.append((hid, medico_id, fecha, fin))
+        return holds
@@ -0,0 +1,60 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import Session
+
+# Tope de filas por página para los listados con `limit`
+MAX_LIMIT = 500
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Cursor opaco con los valores de orden de la última fila devuelta."""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError) as exc:
+        raise ValueError("Cursor inválido") from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Cursor inválido")
+    return values
+
+
+def keyset_page(
+    db: Session,
+    stmt: Select,
+    keys: Sequence,
+    limit: int,
+    cursor: Optional[str] = None,
+    scalars: bool = True,
+) -> Tuple[List, Optional[str]]:
+    """Página de `stmt` ordenada por `keys` (la última debe ser única, normalmente el id).
+
+    En lugar de OFFSET se filtra por `(keys) > (valores del cursor)`, así cada página
+    es un rango del índice sin importar cuán lejos se esté. Devuelve las filas y el
+    cursor de la página siguiente (None si no hay más). Con `scalars=False` devuelve
+    las filas Core (un select de columnas que incluya las de `keys`).
+    """
+    if cursor:
+        values = decode_cursor(cursor, len(keys))
+        for i, key in enumerate(keys):
+            if key.type.python_type is datetime:
+                try:
+                    values[i] = datetime.fromisoformat(values[i])
+                except (TypeError, ValueError) as exc:
+                    raise ValueError("Cursor inválido") from exc
+        stmt = stmt.where(tuple_(*keys) > tuple_(*values))
+    result = db.execute(stmt.order_by(*keys).limit(limit + 1))
+    rows = list(result.scalars().all() if scalars else result.all())
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, key.key) for key in keys])
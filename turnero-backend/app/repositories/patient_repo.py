@@ -1,65 +1,228 @@
-from typing import List, Optional
+import heapq
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import func, insert, literal_column, or_, select, text
+from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.orm import Session
 
 from app.models.patient import Patient
+from app.repositories.pagination import keyset_page
+
+# Largo mínimo de un término para buscarlo por trigramas
+MIN_TRIGRAMA = 3
+# Coincidencias que se traen del índice FTS para rankear en cada búsqueda
+CANDIDATOS = 200
+# Misma expresión que el índice GIN ix_patients_busqueda_trgm (PostgreSQL)
+_PG_BUSQUEDA = literal_column("(patients.apellido || ' ' || patients.nombre || ' ' || patients.dni)")
+
+
+def _like(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _contains(term: str):
+    pattern = _like(term)
+    return or_(
+        Patient.apellido.like(pattern, escape="\\"),
+        Patient.nombre.like(pattern, escape="\\"),
+        Patient.dni.like(pattern, escape="\\"),
+    )
 
 
 class PatientRepo:
     @staticmethod
-    def list(db: Session) -> List[Patient]:
+    def list(db: Session, activo: Optional[bool] = None) -> List[Patient]:
         stmt = select(Patient).order_by(Patient.apellido, Patient.nombre)
+        if activo is not None:
+            stmt = stmt.where(Patient.activo.is_(activo))
         return list(db.execute(stmt).scalars().all())
 
     @staticmethod
-    def _ensure_unique(
+    def page(
+        db: Session,
+        limit: int,
+        cursor: Optional[str] = None,
+        activo: Optional[bool] = None,
+    ) -> Tuple[List[Patient], Optional[str]]:
+        stmt = select(Patient)
+        if activo is not None:
+            stmt = stmt.where(Patient.activo.is_(activo))
+        return keyset_page(db, stmt, (Patient.apellido, Patient.nombre, Patient.id), limit, cursor)
+
+    @staticmethod
+    def search(db: Session, q: str, limit: int = 20, activo: Optional[bool] = None) -> List[Patient]:
+        """Top `limit` pacientes cuyo apellido, nombre o DNI contienen todos los términos de `q`.
+
+        Con términos de 1-2 caracteres solamente (sin trigramas) busca apellidos o DNIs
+        que empiezan con ese texto.
+        """
+        terms = q.split()
+        if not terms:
+            return []
+        dialect = db.get_bind().dialect.name
+        ids = None
+        if all(len(t) < MIN_TRIGRAMA for t in terms):
+            ids = PatientRepo._search_prefix(db, terms, limit, activo)
+        elif dialect == "sqlite":
+            ids = PatientRepo._search_fts(db, terms, limit, activo)
+        elif dialect == "postgresql":
+            stmt = select(Patient.id).where(*[_PG_BUSQUEDA.ilike(_like(t), escape="\\") for t in terms])
+            if activo is not None:
+                stmt = stmt.where(Patient.activo.is_(activo))
+            stmt = stmt.order_by(func.word_similarity(q, _PG_BUSQUEDA).desc(), Patient.id).limit(limit)
+            ids = list(db.execute(stmt).scalars())
+        if ids is None:
+            # Sin índice de búsqueda: LIKE recorriendo la tabla en orden alfabético
+            stmt = select(Patient.id).where(*[_contains(t) for t in terms])
+            if activo is not None:
+                stmt = stmt.where(Patient.activo.is_(activo))
+            stmt = stmt.order_by(Patient.apellido, Patient.nombre, Patient.id).limit(limit)
+            ids = list(db.execute(stmt).scalars())
+        found = PatientRepo.get_many(db, ids)
+        return [found[i] for i in ids if i in found]
+
+    @staticmethod
+    def _search_prefix(db: Session, terms: List[str], limit: int, activo: Optional[bool]) -> List[int]:
+        """Rango sobre el índice de DNI o de apellido para el primer término."""
+        first = terms[0]
+        if first.isdigit():
+            column, lo, order = Patient.dni, first, (Patient.dni, Patient.id)
+        else:
+            column, lo = Patient.apellido, first[:1].upper() + first[1:].lower()
+            order = (Patient.apellido, Patient.nombre, Patient.id)
+        hi = lo[:-1] + chr(ord(lo[-1]) + 1)
+        stmt = select(Patient.id).where(column >= lo, column < hi, *[_contains(t) for t in terms[1:]])
+        if activo is not None:
+            stmt = stmt.where(Patient.activo.is_(activo))
+        return list(db.execute(stmt.order_by(*order).limit(limit)).scalars())
+
+    @staticmethod
+    def _search_fts(db: Session, terms: List[str], limit: int, activo: Optional[bool]) -> Optional[List[int]]:
+        """Búsqueda en patients_fts.
+
+        Puntuar todas las coincidencias (bm25) cuesta decenas de ms cuando un término es
+        común ("gonz" con 1M de pacientes), así que se toma una ventana de `CANDIDATOS`
+        coincidencias en orden de rowid y se ordena en Python: primero los que tienen un
+        campo que empieza con cada término, después alfabético.
+        """
+        match = " ".join('"' + t.replace('"', '""') + '"' for t in terms if len(t) >= MIN_TRIGRAMA)
+        params = {"match": match, "limit": max(limit, CANDIDATOS)}
+        where = ["patients_fts MATCH :match"]
+        for i, t in enumerate(t for t in terms if len(t) < MIN_TRIGRAMA):
+            # Los términos de 1-2 letras no tienen trigramas: se filtran sobre la fila
+            where.append(
+                f"(p.apellido LIKE :t{i} ESCAPE '\\' OR p.nombre LIKE :t{i} ESCAPE '\\' OR p.dni LIKE :t{i} ESCAPE '\\')"
+            )
+            params[f"t{i}"] = _like(t)
+        if activo is not None:
+            where.append("p.activo = :activo")
+            params["activo"] = activo
+        sql = text(
+            "SELECT p.id, p.apellido, p.nombre, p.dni FROM patients_fts "
+            "JOIN patients p ON p.id = patients_fts.rowid "
+            f"WHERE {' AND '.join(where)} ORDER BY patients_fts.rowid LIMIT :limit"
+        )
+        try:
+            rows = db.execute(sql, params).all()
+        except OperationalError:
+            # Sin tabla FTS5 (SQLite sin trigram): el llamador usa LIKE
+            return None
+
+        lowered = [t.lower() for t in terms]
+
+        def score(row):
+            fields = (row.apellido.lower(), row.nombre.lower(), row.dni)
+            misses = sum(not any(f.startswith(t) for f in fields) for t in lowered)
+            return misses, row.apellido, row.nombre, row.id
+
+        return [row.id for row in heapq.nsmallest(limit, rows, key=score)]
+
+    @staticmethod
+    def _duplicate(
         db: Session,
         *,
         dni: str,
         email: Optional[str],
         exclude_id: Optional[int] = None,
-    ) -> None:
-        stmt = select(Patient).where(Patient.dni == dni)
+    ) -> Optional[str]:
+        """Mensaje si otro paciente ya tiene ese DNI o email (una sola consulta), si no None."""
+        conditions = [Patient.dni == dni]
+        if email:
+            conditions.append(Patient.email == email)
+        stmt = select(Patient.dni).where(or_(*conditions))
         if exclude_id:
             stmt = stmt.where(Patient.id != exclude_id)
-        if db.execute(stmt).scalar_one_or_none():
-            raise ValueError("Ya existe un paciente con ese DNI")
+        found = db.execute(stmt.limit(1)).scalar_one_or_none()
+        if found is None:
+            return None
+        if found == dni:
+            return "Ya existe un paciente con ese DNI"
+        return "Ya existe un paciente con ese email"
 
-        if email:
-            stmt = select(Patient).where(Patient.email == email)
-            if exclude_id:
-                stmt = stmt.where(Patient.id != exclude_id)
-            if db.execute(stmt).scalar_one_or_none():
-                raise ValueError("Ya existe un paciente con ese email")
+    @staticmethod
+    def _commit_unique(db: Session, obj: Patient, exclude_id: Optional[int] = None) -> None:
+        """Commit que traduce la violación de ix_patients_dni/ix_patients_email a su mensaje.
+
+        La unicidad la garantizan los índices únicos; la consulta de `_duplicate` solo
+        corre si el commit falla, para saber qué campo está repetido.
+        """
+        dni, email = obj.dni, obj.email
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            message = PatientRepo._duplicate(db, dni=dni, email=email, exclude_id=exclude_id)
+            if message:
+                raise ValueError(message)
+            raise
 
     @staticmethod
     def create(db: Session, **data) -> Patient:
-        PatientRepo._ensure_unique(db, dni=data["dni"], email=data.get("email"))
         obj = Patient(**data)
         db.add(obj)
-        db.commit()
+        PatientRepo._commit_unique(db, obj)
         db.refresh(obj)
         return obj
 
+    @staticmethod
+    def existing_identities(db: Session, dnis: Iterable[str], emails: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+        """DNIs y emails de `dnis`/`emails` que ya tiene algún paciente (una sola consulta)."""
+        dnis, emails = list(dnis), list(emails)
+        conditions = [Patient.dni.in_(dnis)] if dnis else []
+        if emails:
+            conditions.append(Patient.email.in_(emails))
+        if not conditions:
+            return set(), set()
+        rows = db.execute(select(Patient.dni, Patient.email).where(or_(*conditions))).all()
+        return {dni for dni, _ in rows}, {email for _, email in rows if email}
+
+    @staticmethod
+    def create_many(db: Session, rows: List[dict]) -> int:
+        """Inserta varios pacientes con un único executemany y un solo commit."""
+        if not rows:
+            return 0
+        db.execute(insert(Patient), rows)
+        db.commit()
+        return len(rows)
+
     @staticmethod
     def get(db: Session, pid: int) -> Optional[Patient]:
         return db.get(Patient, pid)
 
+    @staticmethod
+    def get_many(db: Session, ids: Iterable[int]) -> Dict[int, Patient]:
+        stmt = select(Patient).where(Patient.id.in_(list(ids)))
+        return {p.id: p for p in db.execute(stmt).scalars().all()}
+
     @staticmethod
     def update(db: Session, pid: int, **data) -> Patient:
         obj = db.get(Patient, pid)
         if not obj:
             raise ValueError("Paciente inexistente")
-        PatientRepo._ensure_unique(
-            db,
-            dni=data.get("dni", obj.dni),
-            email=data.get("email", obj.email),
-            exclude_id=pid,
-        )
         for k, v in data.items():
             setattr(obj, k, v)
-        db.commit()
+        PatientRepo._commit_unique(db, obj, exclude_id=pid)
         db.refresh(obj)
         return obj
 
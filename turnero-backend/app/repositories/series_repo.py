@@ -0,0 +1,66 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models.appointment import Appointment, TurnoEstado
+from app.models.appointment_series import AppointmentSeries
+from app.repositories.appointment_repo import appointment_index
+
+
+class SeriesRepo:
+    @staticmethod
+    def create(db: Session, **data) -> AppointmentSeries:
+        # Sin commit: los turnos de la serie se insertan en la misma transacción
+        series = AppointmentSeries(**data)
+        db.add(series)
+        db.flush()
+        return series
+
+    @staticmethod
+    def get(db: Session, sid: int) -> Optional[AppointmentSeries]:
+        return db.get(AppointmentSeries, sid)
+
+    @staticmethod
+    def future_occurrences(db: Session, sid: int) -> List[Appointment]:
+        """Turnos reservados futuros de la serie, releídos de la base (se llama dentro del bloque de reserva)."""
+        stmt = (
+            select(Appointment)
+            .where(
+                Appointment.serie_id == sid,
+                Appointment.estado == TurnoEstado.Reservado,
+                Appointment.fecha > datetime.now(),
+            )
+            .order_by(Appointment.fecha)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        return list(db.execute(stmt).scalars().all())
+
+    @staticmethod
+    def cancel_future(db: Session, series: AppointmentSeries, *, auto_commit: bool = True) -> int:
+        stmt = (
+            update(Appointment)
+            .where(
+                Appointment.serie_id == series.id,
+                Appointment.estado == TurnoEstado.Reservado,
+                Appointment.fecha > datetime.now(),
+            )
+            .values(estado=TurnoEstado.Cancelado)
+            .execution_options(synchronize_session=False)
+        )
+        count = db.execute(stmt).rowcount
+        appointment_index.touch(db, [("medico", series.medico_id), ("paciente", series.paciente_id)], reload=True)
+        if auto_commit:
+            db.commit()
+        return count
+
+    @staticmethod
+    def reschedule(db: Session, series: AppointmentSeries, changes: List[dict], **data) -> None:
+        """Aplica `changes` ({id, fecha, duracion_min}) con un único UPDATE por clave primaria."""
+        db.execute(update(Appointment), changes)
+        appointment_index.touch(db, [("medico", series.medico_id), ("paciente", series.paciente_id)], reload=True)
+        for k, v in data.items():
+            setattr(series, k, v)
+        db.commit()
@@ -0,0 +1,182 @@
+import bisect
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.doctor import DoctorAvailability
+from app.models.slot import DoctorSlot, SlotHorizon
+from app.repositories.appointment_repo import MAX_DURACION, AppointmentRepo
+
+_slots = DoctorSlot.__table__
+
+# Ningún slot dura más que un día: acota la búsqueda por ix_slots_medico_inicio.
+_MAX_SLOT = timedelta(days=1)
+
+_occupy = (
+    update(_slots)
+    .where(
+        _slots.c.medico_id == bindparam("m"),
+        _slots.c.inicio > bindparam("desde_min"),
+        _slots.c.inicio < bindparam("hasta"),
+        _slots.c.fin > bindparam("desde"),
+    )
+    .values(ocupados=_slots.c.ocupados + bindparam("delta"))
+)
+
+
+class SlotRepo:
+    """Tabla `slots` materializada a partir de la disponibilidad de cada médico.
+
+    Es opcional (SLOTS_MATERIALIZED_ENABLED). Se genera del lado de las escrituras:
+    al crear un médico o cambiar su disponibilidad, al arrancar la app y con POST
+    /admin/slots (tarea diaria que corre el horizonte de SLOTS_DIAS_ADELANTE días). Se
+    mantiene en la misma transacción que las altas, bajas y cambios de turnos. Las
+    lecturas nunca escriben: un día sin materializar se calcula desde la
+    disponibilidad. Los holds no se materializan: duran minutos y se descuentan al leer.
+    """
+
+    @staticmethod
+    def enabled() -> bool:
+        return settings.SLOTS_MATERIALIZED_ENABLED
+
+    @staticmethod
+    def _generate(
+        db: Session,
+        medico_id: int,
+        availability: Iterable[DoctorAvailability],
+        desde: date,
+        hasta: date,
+    ) -> None:
+        """Reemplaza los slots del médico desde `desde` por los de [desde, hasta]."""
+        db.execute(
+            delete(DoctorSlot).where(
+                DoctorSlot.medico_id == medico_id,
+                DoctorSlot.inicio >= datetime.combine(desde, time.min),
+            )
+        )
+        by_weekday = {}
+        for av in availability:
+            by_weekday.setdefault(av.day_of_week, []).append(av)
+
+        slots: List[Tuple[datetime, datetime]] = []
+        day = desde
+        while day <= hasta:
+            for av in by_weekday.get(day.weekday(), []):
+                step = timedelta(minutes=av.slot_minutes or 30)
+                current = datetime.combine(day, av.start_time)
+                av_end = datetime.combine(day, av.end_time)
+                while current + step <= av_end:
+                    slots.append((current, current + step))
+                    current += step
+            day += timedelta(days=1)
+        if not slots:
+            return
+
+        busy = sorted(
+            (start, end)
+            for _, start, end in AppointmentRepo.busy_many(
+                db,
+                [medico_id],
+                datetime.combine(desde, time.min),
+                datetime.combine(hasta, time.min) + timedelta(days=1),
+            )
+        )
+        rows = []
+        for start, end in slots:
+            lo = bisect.bisect_left(busy, (start - MAX_DURACION,))
+            hi = bisect.bisect_left(busy, (end,))
+            ocupados = sum(1 for _, ap_end in busy[lo:hi] if ap_end > start)
+            rows.append({"medico_id": medico_id, "inicio": start, "fin": end, "ocupados": ocupados})
+        db.execute(insert(DoctorSlot), rows)
+
+    @staticmethod
+    def _set_horizon(db: Session, medico_id: int, desde: date, hasta: date) -> None:
+        horizon = db.get(SlotHorizon, medico_id)
+        if horizon:
+            horizon.desde, horizon.hasta = desde, hasta
+        else:
+            db.add(SlotHorizon(medico_id=medico_id, desde=desde, hasta=hasta))
+
+    @staticmethod
+    def covers(db: Session, medico_id: int, day: date) -> bool:
+        """True si `day` ya está materializado para el médico (solo lectura)."""
+        if not SlotRepo.enabled() or day < date.today():
+            return False
+        horizon = db.get(SlotHorizon, medico_id)
+        return bool(horizon and horizon.desde <= day <= horizon.hasta)
+
+    @staticmethod
+    def extend(db: Session, medico_id: int, availability: Iterable[DoctorAvailability]) -> None:
+        """Materializa los días que faltan hasta SLOTS_DIAS_ADELANTE y borra los pasados (sin commit).
+
+        Toma el lock de reservas del médico para no perder altas concurrentes.
+        """
+        if not SlotRepo.enabled():
+            return
+        AppointmentRepo.lock_booking(db, [medico_id], [])
+        today = date.today()
+        limit = today + timedelta(days=settings.SLOTS_DIAS_ADELANTE)
+        horizon = db.get(SlotHorizon, medico_id, populate_existing=True)
+        if horizon and horizon.desde <= today <= horizon.hasta + timedelta(days=1):
+            # Solo se agregan los días nuevos al final del horizonte
+            if horizon.hasta < limit:
+                SlotRepo._generate(db, medico_id, availability, horizon.hasta + timedelta(days=1), limit)
+            limit = max(limit, horizon.hasta)
+            db.execute(
+                delete(DoctorSlot).where(
+                    DoctorSlot.medico_id == medico_id,
+                    DoctorSlot.inicio < datetime.combine(today, time.min),
+                )
+            )
+        else:
+            db.execute(delete(DoctorSlot).where(DoctorSlot.medico_id == medico_id))
+            SlotRepo._generate(db, medico_id, availability, today, limit)
+        SlotRepo._set_horizon(db, medico_id, today, limit)
+
+    @staticmethod
+    def regenerate(db: Session, medico_id: int, availability: Iterable[DoctorAvailability]) -> None:
+        """Recalcula los slots futuros del médico tras cambiar su disponibilidad (sin commit)."""
+        if not SlotRepo.enabled():
+            return
+        AppointmentRepo.lock_booking(db, [medico_id], [])
+        today = date.today()
+        limit = today + timedelta(days=settings.SLOTS_DIAS_ADELANTE)
+        db.execute(delete(DoctorSlot).where(DoctorSlot.medico_id == medico_id))
+        SlotRepo._generate(db, medico_id, availability, today, limit)
+        SlotRepo._set_horizon(db, medico_id, today, limit)
+
+    @staticmethod
+    def occupy(db: Session, intervals: Iterable[Tuple[int, datetime, datetime]], delta: int = 1) -> None:
+        """Suma `delta` a los slots que pisan cada intervalo (medico_id, inicio, fin); sin commit."""
+        if not SlotRepo.enabled():
+            return
+        params = [
+            {"m": m, "desde": start, "desde_min": start - _MAX_SLOT, "hasta": end, "delta": delta}
+            for m, start, end in intervals
+        ]
+        if params:
+            db.connection().execute(_occupy, params)
+
+    @staticmethod
+    def free(
+        db: Session,
+        medico_id: int,
+        desde: datetime,
+        hasta: datetime,
+    ) -> List[Tuple[datetime, datetime]]:
+        """Slots libres (inicio, fin) del médico contenidos en [desde, hasta)."""
+        stmt = (
+            select(DoctorSlot.inicio, DoctorSlot.fin)
+            .where(
+                DoctorSlot.medico_id == medico_id,
+                DoctorSlot.inicio >= desde,
+                DoctorSlot.inicio < hasta,
+                DoctorSlot.fin <= hasta,
+                DoctorSlot.ocupados == 0,
+            )
+            .order_by(DoctorSlot.inicio)
+        )
+        return [(start, end) for start, end in db.execute(stmt)]
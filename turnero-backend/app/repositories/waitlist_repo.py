@@ -0,0 +1,88 @@
+import heapq
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.models.waitlist import WaitlistEntry
+
+# Estados que todavía pueden recibir una vacante (una oferta vencida vuelve a la cola)
+ESTADOS_EN_ESPERA = ("PENDIENTE", "OFRECIDO")
+
+
+class WaitlistRepo:
+    @staticmethod
+    def create(db: Session, **data) -> WaitlistEntry:
+        entry = WaitlistEntry(**data)
+        db.add(entry)
+        db.commit()
+        db.refresh(entry)
+        return entry
+
+    @staticmethod
+    def get(db: Session, eid: int) -> Optional[WaitlistEntry]:
+        return db.get(WaitlistEntry, eid)
+
+    @staticmethod
+    def list(
+        db: Session,
+        medico_id: Optional[int] = None,
+        especialidad_id: Optional[int] = None,
+        paciente_id: Optional[int] = None,
+        estado: Optional[str] = None,
+    ) -> List[WaitlistEntry]:
+        stmt = select(WaitlistEntry)
+        if medico_id:
+            stmt = stmt.where(WaitlistEntry.medico_id == medico_id)
+        if especialidad_id:
+            stmt = stmt.where(WaitlistEntry.especialidad_id == especialidad_id)
+        if paciente_id:
+            stmt = stmt.where(WaitlistEntry.paciente_id == paciente_id)
+        if estado:
+            stmt = stmt.where(WaitlistEntry.estado == estado)
+        return list(db.execute(stmt.order_by(WaitlistEntry.id)).scalars().all())
+
+    @staticmethod
+    def candidates(
+        db: Session,
+        medico_id: int,
+        especialidad_id: int,
+        inicio: datetime,
+        duracion: int,
+        limit: int = 20,
+    ) -> List[WaitlistEntry]:
+        """Entradas que aceptan el horario [inicio, inicio + duracion) del médico, por orden de llegada.
+
+        Hay una búsqueda por cola (entradas para ese médico en ix_waitlist_medico_estado_id,
+        para cualquier médico de la especialidad en ix_waitlist_especialidad_estado_id) y por
+        estado, y se mezclan por id. Con igualdad en todas las columnas anteriores a `id` el
+        índice ya entrega las entradas en orden de llegada: no hay ordenamiento y la búsqueda
+        termina al juntar `limit` entradas que encajan. La ventana y la duración se comparan
+        en el índice, así que el costo crece con las entradas en espera que llegaron antes y no
+        encajan en el horario; si casi ninguna encaja, se recorre la cola entera de ese médico.
+        """
+        now = datetime.now()
+        fin = inicio + timedelta(minutes=duracion)
+        fits = [
+            WaitlistEntry.desde <= inicio,
+            WaitlistEntry.hasta >= fin,
+            WaitlistEntry.duracion_min <= duracion,
+            or_(WaitlistEntry.oferta_expira.is_(None), WaitlistEntry.oferta_expira <= now),
+        ]
+        by_doctor = select(WaitlistEntry).where(WaitlistEntry.medico_id == medico_id, *fits)
+        by_specialty = select(WaitlistEntry).where(
+            WaitlistEntry.especialidad_id == especialidad_id,
+            WaitlistEntry.medico_id.is_(None),
+            *fits,
+        )
+        queues = [
+            list(
+                db.execute(stmt.where(WaitlistEntry.estado == estado).order_by(WaitlistEntry.id).limit(limit))
+                .scalars()
+                .all()
+            )
+            for stmt in (by_doctor, by_specialty)
+            for estado in ESTADOS_EN_ESPERA
+        ]
+        return list(heapq.merge(*queues, key=lambda entry: entry.id))[:limit]
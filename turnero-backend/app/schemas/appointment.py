@@ -1,6 +1,5 @@
-from datetime import datetime
-from datetime import datetime
-from typing import Literal, Optional
+from datetime import date, datetime
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, field_serializer, field_validator
 from pydantic.config import ConfigDict
@@ -34,7 +33,8 @@ class AppointmentBase(BaseModel):
 
 
 class AppointmentCreate(AppointmentBase):
-    pass
+    # id de un hold (POST /turnos/hold) que se consume al crear el turno
+    hold_id: Optional[int] = None
 
 
 class AppointmentUpdate(BaseModel):
@@ -62,3 +62,91 @@ class AppointmentUpdate(BaseModel):
 class AppointmentOut(AppointmentBase):
     id: int
     estado: TurnoEstado
+    reprogramado_de_id: Optional[int] = None
+
+    @field_validator("estado", mode="before")
+    @classmethod
+    def estado_value(cls, value):
+        # El modelo guarda un Enum; el Literal solo acepta el string
+        return getattr(value, "value", value)
+
+
+class AppointmentNamedOut(AppointmentOut):
+    # Solo con GET /turnos?expand=nombres
+    paciente_nombre: Optional[str] = None
+    medico_nombre: Optional[str] = None
+    especialidad_nombre: Optional[str] = None
+
+
+class AppointmentAgendaOut(BaseModel):
+    id: int
+    fecha: datetime
+    duracion_min: int
+    estado: TurnoEstado
+    paciente_id: int
+    paciente_nombre: str
+    medico_nombre: str
+    especialidad_nombre: str
+
+    @field_validator("estado", mode="before")
+    @classmethod
+    def estado_value(cls, value):
+        return getattr(value, "value", value)
+
+    @field_serializer("fecha")
+    def serialize_fecha(self, value: datetime) -> str:
+        return value.strftime("%Y-%m-%dT%H:%M")
+
+
+class AppointmentReschedule(BaseModel):
+    fecha: datetime
+    duracion_min: Optional[int] = None
+    # hold tomado sobre el horario nuevo, se consume al reprogramar
+    hold_id: Optional[int] = None
+
+    @field_validator("fecha", mode="before")
+    @classmethod
+    def parse_fecha(cls, value):
+        if isinstance(value, datetime):
+            return value
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError as exc:
+            raise ValueError("La fecha debe tener formato YYYY-MM-DDTHH:MM") from exc
+
+
+class AppointmentDayReschedule(BaseModel):
+    medico_id: int
+    fecha: date
+    nueva_fecha: date
+    # si se indica, los turnos pasan a otro médico (mismo horario)
+    medico_destino_id: Optional[int] = None
+    omitir_conflictos: bool = False
+
+
+class AppointmentMoved(BaseModel):
+    id: int
+    reprogramado_de_id: int
+    fecha: str
+
+
+class AppointmentSkipped(BaseModel):
+    id: int
+    fecha: str
+    error: str
+
+
+class AppointmentDayRescheduleOut(BaseModel):
+    turnos: List[AppointmentMoved]
+    omitidos: List[AppointmentSkipped]
+
+
+class AppointmentBulkCreate(BaseModel):
+    items: List[AppointmentCreate]
+
+
+class AppointmentBulkResult(BaseModel):
+    index: int
+    ok: bool
+    id: Optional[int] = None
+    error: Optional[str] = None
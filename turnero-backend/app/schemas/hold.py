@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, field_serializer
+from pydantic.config import ConfigDict
+
+
+class HoldCreate(BaseModel):
+    medico_id: int
+    fecha: datetime
+    duracion_min: int = 30
+    ttl_segundos: Optional[int] = None
+
+
+class HoldOut(BaseModel):
+    id: int
+    medico_id: int
+    fecha: datetime
+    duracion_min: int
+    expira_en: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_serializer("fecha")
+    def serialize_fecha(self, value: datetime) -> str:
+        return value.strftime("%Y-%m-%dT%H:%M")
@@ -1,7 +1,7 @@
 from datetime import date
 from pydantic import BaseModel, EmailStr, field_validator
 from pydantic.config import ConfigDict
-from typing import Optional
+from typing import List, Optional
 
 
 class PatientBase(BaseModel):
@@ -38,3 +38,17 @@ class PatientUpdate(PatientBase):
 class PatientOut(PatientBase):
     id: int
     activo: bool
+
+
+class PatientImportError(BaseModel):
+    fila: int
+    dni: Optional[str] = None
+    error: str
+
+
+class PatientImportResult(BaseModel):
+    filas: int
+    creados: int
+    errores: List[PatientImportError]
+    # Errores que no entraron en `errores` por superar el máximo informado
+    errores_omitidos: int = 0
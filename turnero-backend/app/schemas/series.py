@@ -0,0 +1,64 @@
+from datetime import date, time
+from typing import List, Optional
+
+from pydantic import BaseModel, field_validator
+
+
+def _valid_hora(value):
+    if isinstance(value, time):
+        return value.strftime("%H:%M")
+    try:
+        time.fromisoformat(value)
+    except ValueError as exc:
+        raise ValueError("La hora debe tener formato HH:MM") from exc
+    return value
+
+
+class SeriesCreate(BaseModel):
+    paciente_id: int
+    medico_id: int
+    especialidad_id: int
+    dias_semana: List[int]  # 0=Monday
+    hora: str
+    desde: date
+    semanas: int
+    duracion_min: int = 30
+    omitir_conflictos: bool = False
+
+    @field_validator("hora", mode="before")
+    @classmethod
+    def valid_hora(cls, value):
+        return _valid_hora(value)
+
+    @field_validator("dias_semana")
+    @classmethod
+    def valid_dias(cls, value: List[int]):
+        if not value or any(d < 0 or d > 6 for d in value):
+            raise ValueError("Los días de la semana deben estar entre 0 (lunes) y 6 (domingo)")
+        return sorted(set(value))
+
+
+class SeriesReschedule(BaseModel):
+    hora: str
+    duracion_min: Optional[int] = None
+
+    @field_validator("hora", mode="before")
+    @classmethod
+    def valid_hora(cls, value):
+        return _valid_hora(value)
+
+
+class SeriesTurno(BaseModel):
+    id: int
+    fecha: str
+
+
+class SeriesOmitido(BaseModel):
+    fecha: str
+    error: str
+
+
+class SeriesOut(BaseModel):
+    serie_id: int
+    turnos: List[SeriesTurno]
+    omitidos: List[SeriesOmitido] = []
@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, field_serializer
+from pydantic.config import ConfigDict
+
+
+class WaitlistCreate(BaseModel):
+    paciente_id: int
+    especialidad_id: int
+    medico_id: Optional[int] = None  # sin médico: cualquiera de la especialidad
+    desde: datetime
+    hasta: datetime
+    duracion_min: int = 30
+    auto_reservar: bool = False
+
+
+class WaitlistOut(BaseModel):
+    id: int
+    paciente_id: int
+    especialidad_id: int
+    medico_id: Optional[int] = None
+    desde: datetime
+    hasta: datetime
+    duracion_min: int
+    auto_reservar: bool
+    estado: str
+    hold_id: Optional[int] = None
+    oferta_expira: Optional[datetime] = None
+    turno_id: Optional[int] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_serializer("desde", "hasta")
+    def serialize_fecha(self, value: datetime) -> str:
+        return value.strftime("%Y-%m-%dT%H:%M")
@@ -1,18 +1,46 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta, time
-from typing import Dict, List, Optional
+import bisect
+import heapq
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, time
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.models.appointment import Appointment, TurnoEstado
+from app.core.config import settings
+from app.models.appointment import ESTADOS_LIBRES, Appointment, TurnoEstado
 from app.models.doctor import Doctor, DoctorAvailability
 from app.models.patient import Patient
+from app.models.slot_hold import SlotHold
 from app.models.specialty import Specialty
-from app.repositories.appointment_repo import AppointmentRepo
+from app.models.waitlist import WaitlistEntry
+from app.repositories.appointment_repo import (
+    COLUMNAS_AGENDA,
+    COLUMNAS_TURNO,
+    MAX_DURACION,
+    AppointmentRepo,
+    appointment_index,
+)
+from app.repositories.archive_repo import ArchiveRepo
+from app.repositories.doctor_repo import DoctorRepo
+from app.repositories.hold_repo import HoldRepo
+from app.repositories.patient_repo import PatientRepo
+from app.repositories.slot_repo import SlotRepo
+from app.repositories.waitlist_repo import WaitlistRepo
+from app.services import slot_engine
+from app.services.day_calendar import DayCalendar
 
 FMT = "%Y-%m-%dT%H:%M"
+MSG_SOLAPAMIENTO = "Existe un solapamiento con otro turno del médico o del paciente"
+MSG_HOLD = "El horario está reservado temporalmente por otro usuario"
+MSG_HOLD_INVALIDO = "La reserva temporal no existe o pertenece a otro usuario"
+MAX_DIAS_GRILLA = 92
+MAX_LOTE = 20000
+MAX_DIAS_BUSQUEDA = 180
+DIAS_POR_BLOQUE = 7
 
 
 def _parse_datetime(value: datetime | str) -> datetime:
@@ -34,12 +62,192 @@ def _time_in_availability(avail: DoctorAvailability, start: datetime, duration:
     )
 
 
+def _slot(start: datetime, end: datetime) -> Dict:
+    iso = start.strftime(FMT)
+    return {"iso": iso, "inicio": iso[11:], "fin": end.strftime("%H:%M")}
+
+
+def _slots_for_day(
+    day: date,
+    availabilities,
+    busy: List[Tuple[datetime, datetime]],
+    duracion_min: int,
+    inicio: str | None = None,
+    fin: str | None = None,
+) -> List[Dict]:
+    """Slots libres de un día a partir de las franjas de disponibilidad y los intervalos ocupados.
+
+    Las franjas prenden minutos de un DayCalendar y los intervalos ocupados los apagan;
+    cada slot candidato se resuelve con un AND de bits (O(slots + ocupados)).
+    """
+    calendar = DayCalendar(day)
+    bands = []
+    for av in availabilities:
+        av_start = datetime.combine(day, av.start_time)
+        av_end = datetime.combine(day, av.end_time)
+        if inicio:
+            custom_start = datetime.combine(day, datetime.strptime(inicio, "%H:%M").time())
+            av_start = max(av_start, custom_start)
+        if fin:
+            custom_end = datetime.combine(day, datetime.strptime(fin, "%H:%M").time())
+            av_end = min(av_end, custom_end)
+        calendar.open(av_start, av_end)
+        bands.append((av_start, av_end))
+    for ap_start, ap_end in busy:
+        calendar.close(ap_start, ap_end)
+
+    step = timedelta(minutes=duracion_min)
+    return [
+        _slot(current, current + step)
+        for av_start, av_end in bands
+        for current in calendar.free_slots(av_start, av_end, duracion_min)
+    ]
+
+
+def _grid_matches(day: date, availabilities, duracion_min: int, inicio: str | None) -> bool:
+    """True si la grilla pedida coincide con la de la tabla `slots` (paso slot_minutes desde cada franja)."""
+    custom_start = datetime.strptime(inicio, "%H:%M").time() if inicio else None
+    for av in availabilities:
+        if av.slot_minutes != duracion_min:
+            return False
+        if custom_start and custom_start > av.start_time:
+            offset = datetime.combine(day, custom_start) - datetime.combine(day, av.start_time)
+            if offset % timedelta(minutes=duracion_min):
+                return False
+    return True
+
+
+def _interval(medico_id: int, start: datetime, duration: int) -> Tuple[int, datetime, datetime]:
+    return medico_id, start, start + timedelta(minutes=duration)
+
+
+def _check_cancelable(appointment: Appointment) -> None:
+    if appointment.estado != TurnoEstado.Reservado:
+        raise ValueError("El turno no puede cancelarse")
+    if appointment.fecha <= datetime.now():
+        raise ValueError("Solo se pueden cancelar turnos futuros")
+
+
+def _check_reprogramable(appointment: Appointment) -> None:
+    if appointment.estado != TurnoEstado.Reservado:
+        raise ValueError("El turno no puede reprogramarse")
+    if appointment.fecha <= datetime.now():
+        raise ValueError("Solo se pueden reprogramar turnos futuros")
+
+
+def _check_hold(
+    hold: Optional[SlotHold], usuario_id: Optional[int], medico_id: int, start: datetime, duration: int
+) -> None:
+    """El hold que se consume tiene que ser del usuario, estar vigente y cubrir exactamente el turno."""
+    if not hold or hold.usuario_id != usuario_id:
+        raise ValueError(MSG_HOLD_INVALIDO)
+    if hold.expira_en <= datetime.now():
+        raise ValueError("La reserva temporal venció")
+    if (hold.medico_id, hold.fecha, hold.duracion_min) != (medico_id, start, duration):
+        raise ValueError("La reserva temporal no corresponde al horario del turno")
+
+
+def _conflict_message(errors: Dict[int, str], fechas: List[datetime], sujeto: str = "La serie") -> str:
+    detail = "; ".join(f"{fechas[i].strftime(FMT)}: {msg}" for i, msg in sorted(errors.items())[:5])
+    extra = f" (y {len(errors) - 5} más)" if len(errors) > 5 else ""
+    return f"{sujeto} tiene {len(errors)} fechas con conflictos: {detail}{extra}"
+
+
+def _busy_with_holds(db: Session, medico_ids: List[int], desde: datetime, hasta: datetime):
+    """Intervalos (medico_id, inicio, fin) ocupados por turnos o por holds vigentes."""
+    busy = AppointmentRepo.busy_many(db, medico_ids, desde, hasta)
+    busy += [(medico_id, h_start, h_end) for _, medico_id, h_start, h_end in HoldRepo.busy_many(db, medico_ids, desde, hasta)]
+    return busy
+
+
+def _busy_by_day(intervals) -> Dict[Tuple[int, date], List[Tuple[datetime, datetime]]]:
+    """Agrupa intervalos (medico_id, inicio, fin) por médico y por cada día que tocan."""
+    busy_by_day: Dict[Tuple[int, date], List[Tuple[datetime, datetime]]] = defaultdict(list)
+    for medico_id, ap_start, ap_end in intervals:
+        day = ap_start.date()
+        busy_by_day[(medico_id, day)].append((ap_start, ap_end))
+        # Los turnos que cruzan la medianoche también ocupan los días siguientes
+        while datetime.combine(day + timedelta(days=1), time.min) < ap_end:
+            day += timedelta(days=1)
+            busy_by_day[(medico_id, day)].append((ap_start, ap_end))
+    return busy_by_day
+
+
+def _overlaps_sorted(intervals: List[Tuple[datetime, datetime]], start: datetime, end: datetime) -> bool:
+    """Solapamiento contra una lista de intervalos ordenada por inicio."""
+    lo = bisect.bisect_left(intervals, (start - MAX_DURACION,))
+    hi = bisect.bisect_left(intervals, (end,))
+    return any(ap_end > start for _, ap_end in intervals[lo:hi])
+
+
 class AppointmentService:
     @staticmethod
-    def list(db: Session, medico_id: Optional[int], desde: Optional[str], hasta: Optional[str]):
-        desde_dt = _parse_datetime(desde) if desde else None
-        hasta_dt = _parse_datetime(hasta) if hasta else None
-        return AppointmentRepo.list(db, medico_id, desde_dt, hasta_dt)
+    def _filters(
+        medico_id: Optional[int],
+        desde: Optional[str],
+        hasta: Optional[str],
+        paciente_id: Optional[int],
+        especialidad_id: Optional[int],
+        estado: Optional[str],
+    ) -> Dict:
+        return {
+            "medico_id": medico_id,
+            "desde": _parse_datetime(desde) if desde else None,
+            "hasta": _parse_datetime(hasta) if hasta else None,
+            "paciente_id": paciente_id,
+            "especialidad_id": especialidad_id,
+            "estado": TurnoEstado(estado) if estado else None,
+        }
+
+    @staticmethod
+    def list(
+        db: Session,
+        medico_id: Optional[int],
+        desde: Optional[str],
+        hasta: Optional[str],
+        paciente_id: Optional[int] = None,
+        especialidad_id: Optional[int] = None,
+        estado: Optional[str] = None,
+        expand: Optional[str] = None,
+    ):
+        filters = AppointmentService._filters(medico_id, desde, hasta, paciente_id, especialidad_id, estado)
+        if expand == "nombres":
+            return AppointmentRepo.named(db, COLUMNAS_TURNO, **filters)[0]
+        return AppointmentRepo.list(db, **filters)
+
+    @staticmethod
+    def page(
+        db: Session,
+        limit: int,
+        cursor: Optional[str] = None,
+        medico_id: Optional[int] = None,
+        desde: Optional[str] = None,
+        hasta: Optional[str] = None,
+        paciente_id: Optional[int] = None,
+        especialidad_id: Optional[int] = None,
+        estado: Optional[str] = None,
+        expand: Optional[str] = None,
+    ):
+        filters = AppointmentService._filters(medico_id, desde, hasta, paciente_id, especialidad_id, estado)
+        if expand == "nombres":
+            return AppointmentRepo.named(db, COLUMNAS_TURNO, limit, cursor, **filters)
+        return AppointmentRepo.page(db, limit, cursor, **filters)
+
+    @staticmethod
+    def agenda(
+        db: Session,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        medico_id: Optional[int] = None,
+        desde: Optional[str] = None,
+        hasta: Optional[str] = None,
+        paciente_id: Optional[int] = None,
+        especialidad_id: Optional[int] = None,
+        estado: Optional[str] = None,
+    ):
+        """Proyección para la tabla de turnos; devuelve (filas, cursor siguiente)."""
+        filters = AppointmentService._filters(medico_id, desde, hasta, paciente_id, especialidad_id, estado)
+        return AppointmentRepo.named(db, COLUMNAS_AGENDA, limit, cursor, **filters)
 
     @staticmethod
     def get(db: Session, tid: int):
@@ -49,31 +257,17 @@ class AppointmentService:
         return ap
 
     @staticmethod
-    def _validate_slot(
-        db: Session,
-        doctor_id: int,
-        patient_id: int,
-        specialty_id: int,
-        start: datetime,
-        duration: int,
-        exclude_id: Optional[int] = None,
-    ) -> None:
+    def check_horario(doctor: Doctor | None, start: datetime, duration: int) -> None:
+        """Validaciones del horario pedido para un médico (fecha, duración, disponibilidad)."""
         if start < datetime.now():
             raise ValueError("La fecha del turno debe ser futura")
         if duration <= 0:
             raise ValueError("La duración debe ser mayor a 0")
+        if timedelta(minutes=duration) > MAX_DURACION:
+            raise ValueError("La duración no puede superar las 12 horas")
 
-        doctor: Doctor | None = db.get(Doctor, doctor_id)
         if not doctor or not doctor.activo:
             raise ValueError("El médico no está activo")
-        if not doctor.specialties:
-            raise ValueError("El médico no tiene especialidades asignadas")
-        if specialty_id not in {s.id for s in doctor.specialties}:
-            raise ValueError("La especialidad seleccionada no corresponde al médico")
-
-        patient = db.get(Patient, patient_id)
-        if not patient or not patient.activo:
-            raise ValueError("El paciente no está activo")
 
         # Validar disponibilidad
         weekday = start.weekday()
@@ -85,23 +279,189 @@ class AppointmentService:
         if not slot_ok:
             raise ValueError("El horario no se encuentra dentro de la disponibilidad del médico")
 
-        if AppointmentRepo.overlaps(db, doctor_id, patient_id, start, duration, exclude_id):
-            raise ValueError("Existe un solapamiento con otro turno del médico o del paciente")
+    @staticmethod
+    def _check_slot(
+        doctor: Doctor | None,
+        patient: Patient | None,
+        specialty_id: int,
+        start: datetime,
+        duration: int,
+    ) -> None:
+        """Validaciones del turno que no dependen de otros turnos."""
+        AppointmentService.check_horario(doctor, start, duration)
+        if not doctor.specialties:
+            raise ValueError("El médico no tiene especialidades asignadas")
+        if specialty_id not in {s.id for s in doctor.specialties}:
+            raise ValueError("La especialidad seleccionada no corresponde al médico")
+
+        if not patient or not patient.activo:
+            raise ValueError("El paciente no está activo")
+
+    @staticmethod
+    def _validate_slot(
+        db: Session,
+        doctor_id: int,
+        patient_id: int,
+        specialty_id: int,
+        start: datetime,
+        duration: int,
+    ) -> None:
+        doctor: Doctor | None = db.get(Doctor, doctor_id)
+        patient = db.get(Patient, patient_id)
+        AppointmentService._check_slot(doctor, patient, specialty_id, start, duration)
+
+    @staticmethod
+    @contextmanager
+    def reserva(db: Session, medico_ids: Iterable[int], paciente_ids: Iterable[int]):
+        """Bloque de reserva: toma el lock de esos médicos/pacientes y hace rollback si algo falla.
+
+        Los chequeos de solapamiento hechos adentro del bloque son definitivos: ningún otro
+        proceso puede reservar para esos médicos/pacientes hasta el commit.
+        """
+        AppointmentRepo.lock_booking(db, medico_ids, paciente_ids)
+        try:
+            yield
+        except Exception:
+            db.rollback()
+            raise
 
     @staticmethod
-    def create(db: Session, data: dict):
+    def create(db: Session, data: dict, usuario_id: Optional[int] = None, *, auto_commit: bool = True):
+        """Alta de un turno; con `auto_commit=False` el llamador hace el commit."""
         start = _parse_datetime(data["fecha"])
         duration = data.get("duracion_min", 30)
+        doctor_id, patient_id = data["medico_id"], data["paciente_id"]
+        hold_id = data.pop("hold_id", None)
         AppointmentService._validate_slot(
             db,
-            data["medico_id"],
-            data["paciente_id"],
+            doctor_id,
+            patient_id,
             data["especialidad_id"],
             start,
             duration,
         )
         data["fecha"] = start
-        return AppointmentRepo.create(db, **data)
+        with AppointmentService.reserva(db, [doctor_id], [patient_id]):
+            if hold_id:
+                _check_hold(db.get(SlotHold, hold_id), usuario_id, doctor_id, start, duration)
+            if AppointmentRepo.overlaps(db, doctor_id, patient_id, start, duration):
+                raise ValueError(MSG_SOLAPAMIENTO)
+            if HoldRepo.overlaps(db, doctor_id, start, duration, exclude_id=hold_id):
+                raise ValueError(MSG_HOLD)
+            if hold_id:
+                # El hold propio se consume en la misma transacción que el alta
+                HoldRepo.release(db, hold_id, doctor_id, auto_commit=False)
+            SlotRepo.occupy(db, [_interval(doctor_id, start, duration)])
+            return AppointmentRepo.create(db, auto_commit=auto_commit, **data)
+
+    @staticmethod
+    def validate_batch(
+        db: Session,
+        pending: List[Tuple[datetime, int, dict]],
+        exclude_ids: frozenset = frozenset(),
+        usuario_id: Optional[int] = None,
+    ) -> Tuple[List[Tuple[int, dict]], Dict[int, str]]:
+        """Valida ítems (inicio, índice, datos) contra la DB y entre sí.
+
+        Devuelve los ítems aceptados (índice, datos) en orden de fecha y los errores
+        por índice. `exclude_ids` son turnos existentes que no cuentan como ocupados;
+        el `hold_id` de un ítem solo deja de contar si es de `usuario_id` y cubre el ítem.
+        """
+        pending = sorted(pending, key=lambda p: (p[0], p[1]))
+        doctors = DoctorRepo.get_many(db, {data["medico_id"] for _, _, data in pending})
+        patients = PatientRepo.get_many(db, {data["paciente_id"] for _, _, data in pending})
+        taken: Dict[Tuple[str, int], List[Tuple[datetime, datetime]]] = defaultdict(list)
+        for ap_id, medico_id, paciente_id, ap_start, ap_end in AppointmentRepo.busy_for(
+            db,
+            list(doctors),
+            list(patients),
+            pending[0][0],
+            pending[-1][0] + MAX_DURACION,
+        ):
+            if ap_id in exclude_ids:
+                continue
+            taken[("medico", medico_id)].append((ap_start, ap_end))
+            taken[("paciente", paciente_id)].append((ap_start, ap_end))
+        holds = HoldRepo.get_many(db, (data.get("hold_id") for _, _, data in pending))
+        hold_errors: Dict[int, str] = {}
+        for start, i, data in pending:
+            if data.get("hold_id"):
+                try:
+                    _check_hold(holds.get(data["hold_id"]), usuario_id, data["medico_id"], start, data["duracion_min"])
+                except ValueError as exc:
+                    hold_errors[i] = str(exc)
+        own_holds = {data["hold_id"] for _, i, data in pending if data.get("hold_id") and i not in hold_errors}
+        for hid, medico_id, hold_start, hold_end in HoldRepo.busy_many(
+            db, list(doctors), pending[0][0], pending[-1][0] + MAX_DURACION
+        ):
+            if hid not in own_holds:
+                taken[("medico", medico_id)].append((hold_start, hold_end))
+        for intervals in taken.values():
+            intervals.sort()
+
+        accepted: List[Tuple[int, dict]] = []
+        errors: Dict[int, str] = {}
+        for start, i, data in pending:
+            duration = data["duracion_min"]
+            try:
+                if i in hold_errors:
+                    raise ValueError(hold_errors[i])
+                AppointmentService._check_slot(
+                    doctors.get(data["medico_id"]),
+                    patients.get(data["paciente_id"]),
+                    data["especialidad_id"],
+                    start,
+                    duration,
+                )
+                end = start + timedelta(minutes=duration)
+                keys = (("medico", data["medico_id"]), ("paciente", data["paciente_id"]))
+                if any(_overlaps_sorted(taken[key], start, end) for key in keys):
+                    raise ValueError(MSG_SOLAPAMIENTO)
+            except ValueError as exc:
+                errors[i] = str(exc)
+                continue
+            for key in keys:
+                bisect.insort(taken[key], (start, end))
+            accepted.append((i, data))
+        return accepted, errors
+
+    @staticmethod
+    def create_bulk(db: Session, items: List[dict], usuario_id: Optional[int] = None) -> List[Dict]:
+        """Crea un lote de turnos en una sola transacción.
+
+        Médicos, pacientes y turnos existentes se leen una vez para todo el lote; cada
+        ítem se valida contra la DB y contra los ítems ya aceptados del mismo lote.
+        Los ítems inválidos no se insertan y se informan con su error.
+        """
+        if len(items) > MAX_LOTE:
+            raise ValueError(f"El lote no puede superar {MAX_LOTE} turnos")
+        results: List[Dict] = [{"index": i, "ok": False} for i in range(len(items))]
+        pending = []
+        for i, data in enumerate(items):
+            try:
+                start = _parse_datetime(data["fecha"])
+            except ValueError as exc:
+                results[i]["error"] = str(exc)
+                continue
+            pending.append((start, i, {**data, "fecha": start, "duracion_min": data.get("duracion_min", 30)}))
+        if not pending:
+            return results
+
+        medico_ids = {data["medico_id"] for _, _, data in pending}
+        paciente_ids = {data["paciente_id"] for _, _, data in pending}
+        with AppointmentService.reserva(db, medico_ids, paciente_ids):
+            accepted, errors = AppointmentService.validate_batch(db, pending, usuario_id=usuario_id)
+            for _, data in accepted:
+                if data.get("hold_id"):
+                    HoldRepo.release(db, data["hold_id"], data["medico_id"], auto_commit=False)
+            rows = [{k: v for k, v in data.items() if k != "hold_id"} for _, data in accepted]
+            SlotRepo.occupy(db, [_interval(r["medico_id"], r["fecha"], r["duracion_min"]) for r in rows])
+            new_ids = AppointmentRepo.create_many(db, rows)
+        for i, msg in errors.items():
+            results[i]["error"] = msg
+        for (i, _), new_id in zip(accepted, new_ids):
+            results[i].update(ok=True, id=new_id)
+        return results
 
     @staticmethod
     def update(db: Session, tid: int, data: dict):
@@ -122,29 +482,235 @@ class AppointmentService:
             specialty_id,
             start,
             duration,
-            exclude_id=tid,
         )
 
         data["fecha"] = start
-        return AppointmentRepo.update(db, tid, **data)
+        with AppointmentService.reserva(db, [doctor_id], [patient_id]):
+            if AppointmentRepo.overlaps(db, doctor_id, patient_id, start, duration, tid):
+                raise ValueError(MSG_SOLAPAMIENTO)
+            if HoldRepo.overlaps(db, doctor_id, start, duration):
+                raise ValueError(MSG_HOLD)
+            if existing.estado not in ESTADOS_LIBRES:
+                SlotRepo.occupy(db, [_interval(existing.medico_id, existing.fecha, existing.duracion_min)], -1)
+            if data.get("estado", existing.estado) not in ESTADOS_LIBRES:
+                SlotRepo.occupy(db, [_interval(doctor_id, start, duration)])
+            return AppointmentRepo.update(db, tid, **data)
 
     @staticmethod
     def cancelar(db: Session, tid: int):
         appointment = AppointmentRepo.get(db, tid)
         if not appointment:
             raise ValueError("Turno inexistente")
-        if appointment.estado in {TurnoEstado.Cancelado, TurnoEstado.Atendido}:
-            raise ValueError("El turno no puede cancelarse")
-        if appointment.fecha <= datetime.now():
-            raise ValueError("Solo se pueden cancelar turnos futuros")
-        return AppointmentRepo.cancel(db, tid)
+        _check_cancelable(appointment)
+        with AppointmentService.reserva(db, [appointment.medico_id], []):
+            # Releído con el lock: si otro request lo canceló mientras se esperaba, no se
+            # libera el horario ni se ofrece a la lista de espera por segunda vez
+            appointment = AppointmentRepo.get_for_update(db, tid)
+            if appointment.estado == TurnoEstado.Cancelado:
+                db.rollback()
+                return None
+            _check_cancelable(appointment)
+            SlotRepo.occupy(db, [_interval(appointment.medico_id, appointment.fecha, appointment.duracion_min)], -1)
+            AppointmentRepo.cancel(db, tid, auto_commit=False)
+            entry, nuevo = AppointmentService._cubrir_vacante(db, appointment)
+            db.commit()
+        appointment_index.discard(tid)
+        return entry
+
+    @staticmethod
+    def reprogramar(
+        db: Session,
+        tid: int,
+        fecha: datetime | str,
+        duracion_min: Optional[int] = None,
+        hold_id: Optional[int] = None,
+        usuario_id: Optional[int] = None,
+    ) -> Appointment:
+        """Mueve un turno a otro horario en una sola transacción.
+
+        El turno original queda en estado Reprogramado (libera su horario) y se crea uno
+        nuevo que lo referencia con `reprogramado_de_id`; el horario liberado se ofrece a
+        la lista de espera igual que en una cancelación.
+        """
+        existing = AppointmentRepo.get(db, tid)
+        if not existing:
+            raise ValueError("Turno inexistente")
+        _check_reprogramable(existing)
+
+        start = _parse_datetime(fecha)
+        duration = duracion_min or existing.duracion_min
+        doctor_id, patient_id = existing.medico_id, existing.paciente_id
+        AppointmentService._check_slot(
+            db.get(Doctor, doctor_id), db.get(Patient, patient_id), existing.especialidad_id, start, duration
+        )
+        with AppointmentService.reserva(db, [doctor_id], [patient_id]):
+            # Releído con el lock: dos reprogramaciones simultáneas no pueden pasar las dos
+            existing = AppointmentRepo.get_for_update(db, tid)
+            _check_reprogramable(existing)
+            if (existing.medico_id, existing.paciente_id) != (doctor_id, patient_id):
+                raise ValueError("El turno fue modificado mientras se reprogramaba; reintente")
+            if hold_id:
+                _check_hold(db.get(SlotHold, hold_id), usuario_id, doctor_id, start, duration)
+            if AppointmentRepo.overlaps(db, doctor_id, patient_id, start, duration, tid):
+                raise ValueError(MSG_SOLAPAMIENTO)
+            if HoldRepo.overlaps(db, doctor_id, start, duration, exclude_id=hold_id):
+                raise ValueError(MSG_HOLD)
+            if hold_id:
+                HoldRepo.release(db, hold_id, doctor_id, auto_commit=False)
+            SlotRepo.occupy(db, [_interval(doctor_id, existing.fecha, existing.duracion_min)], -1)
+            SlotRepo.occupy(db, [_interval(doctor_id, start, duration)])
+            AppointmentRepo.mark_rescheduled(db, [tid])
+            nuevo = AppointmentRepo.create(
+                db,
+                auto_commit=False,
+                paciente_id=patient_id,
+                medico_id=doctor_id,
+                especialidad_id=existing.especialidad_id,
+                fecha=start,
+                duracion_min=duration,
+                serie_id=existing.serie_id,
+                reprogramado_de_id=tid,
+            )
+            _, ocupante = AppointmentService._cubrir_vacante(db, existing)
+            db.commit()
+        appointment_index.discard(tid)
+        return nuevo
+
+    @staticmethod
+    def reprogramar_dia(
+        db: Session,
+        medico_id: int,
+        fecha: date,
+        nueva_fecha: date,
+        medico_destino_id: Optional[int] = None,
+        omitir_conflictos: bool = False,
+    ) -> Dict:
+        """Mueve todos los turnos reservados de un médico en un día a otro día (y opcionalmente a otro médico).
+
+        Conserva el horario de cada turno. Todo se valida como un lote y se aplica en una
+        sola transacción; con `omitir_conflictos` se mueven los que entran y se informa el resto.
+        """
+        desde = max(datetime.combine(fecha, time.min), datetime.now())
+        turnos = AppointmentRepo.reserved_between(db, medico_id, desde, datetime.combine(fecha, time.min) + timedelta(days=1))
+        if not turnos:
+            raise ValueError("El médico no tiene turnos futuros para reprogramar ese día")
+        destino = medico_destino_id or medico_id
+        delta = nueva_fecha - fecha
+        if not delta and destino == medico_id:
+            raise ValueError("Debe indicar otra fecha u otro médico")
+
+        fechas = [ap.fecha + delta for ap in turnos]
+        pending = [
+            (
+                start,
+                i,
+                {
+                    "paciente_id": ap.paciente_id,
+                    "medico_id": destino,
+                    "especialidad_id": ap.especialidad_id,
+                    "fecha": start,
+                    "duracion_min": ap.duracion_min,
+                    "serie_id": ap.serie_id,
+                    "reprogramado_de_id": ap.id,
+                },
+            )
+            for i, (ap, start) in enumerate(zip(turnos, fechas))
+        ]
+        paciente_ids = {ap.paciente_id for ap in turnos}
+        with AppointmentService.reserva(db, {medico_id, destino}, paciente_ids):
+            accepted, errors = AppointmentService.validate_batch(
+                db, pending, exclude_ids=frozenset(ap.id for ap in turnos)
+            )
+            if errors and not omitir_conflictos:
+                raise ValueError(_conflict_message(errors, fechas, "La reprogramación"))
+            if not accepted:
+                raise ValueError("Ningún turno pudo reprogramarse")
+
+            rows = [data for _, data in accepted]
+            movidos = [turnos[i] for i, _ in accepted]
+            SlotRepo.occupy(db, [_interval(ap.medico_id, ap.fecha, ap.duracion_min) for ap in movidos], -1)
+            SlotRepo.occupy(db, [_interval(r["medico_id"], r["fecha"], r["duracion_min"]) for r in rows])
+            AppointmentRepo.mark_rescheduled(db, [ap.id for ap in movidos])
+            new_ids = AppointmentRepo.create_many(db, rows)
+        # Cambian los turnos del médico de origen, del de destino y de cada paciente movido
+        for key in {medico_id, destino}:
+            appointment_index.invalidate(medico_id=key)
+        for paciente_id in {ap.paciente_id for ap in movidos}:
+            appointment_index.invalidate(paciente_id=paciente_id)
+        return {
+            "turnos": [
+                {"id": new_id, "reprogramado_de_id": row["reprogramado_de_id"], "fecha": row["fecha"].strftime(FMT)}
+                for new_id, row in zip(new_ids, rows)
+            ],
+            "omitidos": [
+                {"id": turnos[i].id, "fecha": turnos[i].fecha.strftime(FMT), "error": msg}
+                for i, msg in sorted(errors.items())
+            ],
+        }
+
+    @staticmethod
+    def _cubrir_vacante(db: Session, appointment: Appointment) -> Tuple[Optional[WaitlistEntry], Optional[Appointment]]:
+        """Ofrece (o reserva) el horario liberado al primer candidato de la lista de espera.
+
+        Corre dentro de la transacción de la cancelación y con el lock del médico tomado;
+        no hace commit. Devuelve la entrada atendida y el turno creado, si los hay.
+        """
+        for entry in WaitlistRepo.candidates(
+            db, appointment.medico_id, appointment.especialidad_id, appointment.fecha, appointment.duracion_min
+        ):
+            if entry.paciente_id == appointment.paciente_id:
+                continue
+            patient = db.get(Patient, entry.paciente_id)
+            if not patient or not patient.activo:
+                continue
+            if HoldRepo.overlaps(db, appointment.medico_id, appointment.fecha, entry.duracion_min):
+                # Otro usuario tiene el horario retenido: no se puede ofrecer a nadie
+                return None, None
+            AppointmentRepo.lock_booking(db, [], [entry.paciente_id])
+            if AppointmentRepo.overlaps(
+                db, appointment.medico_id, entry.paciente_id, appointment.fecha, entry.duracion_min
+            ):
+                continue
+
+            if entry.auto_reservar:
+                nuevo = AppointmentRepo.create(
+                    db,
+                    auto_commit=False,
+                    paciente_id=entry.paciente_id,
+                    medico_id=appointment.medico_id,
+                    especialidad_id=entry.especialidad_id,
+                    fecha=appointment.fecha,
+                    duracion_min=entry.duracion_min,
+                )
+                SlotRepo.occupy(db, [_interval(nuevo.medico_id, nuevo.fecha, nuevo.duracion_min)])
+                entry.estado = "ASIGNADO"
+                entry.turno_id = nuevo.id
+                # Sin autoflush: otra vacante de la misma transacción no tiene que volver a elegirla
+                db.flush()
+                return entry, nuevo
+
+            expira_en = datetime.now() + timedelta(seconds=settings.WAITLIST_OFERTA_TTL_SECONDS)
+            hold = HoldRepo.create(
+                db,
+                auto_commit=False,
+                medico_id=appointment.medico_id,
+                fecha=appointment.fecha,
+                duracion_min=entry.duracion_min,
+                expira_en=expira_en,
+            )
+            entry.estado = "OFRECIDO"
+            entry.hold_id = hold.id
+            entry.oferta_expira = expira_en
+            db.flush()
+            return entry, None
+        return None, None
 
     @staticmethod
     def atender(db: Session, tid: int, receta_url: Optional[str] = None):
         appointment = AppointmentRepo.get(db, tid)
         if not appointment:
             raise ValueError("Turno inexistente")
-        if appointment.estado in {TurnoEstado.Cancelado, TurnoEstado.Atendido}:
+        if appointment.estado != TurnoEstado.Reservado:
             raise ValueError("El turno no puede marcarse como atendido")
         if appointment.fecha > datetime.now():
             raise ValueError("Solo se pueden cerrar turnos cuya fecha ya ocurrió")
@@ -161,7 +727,7 @@ class AppointmentService:
             select(func.count(Appointment.id)).where(
                 Appointment.fecha >= inicio,
                 Appointment.fecha <= fin,
-                Appointment.estado != TurnoEstado.Cancelado,
+                Appointment.estado.not_in(ESTADOS_LIBRES),
             )
         ) or 0
         return {"pacientes": total_pacientes, "medicos": total_medicos, "turnos_hoy": turnos_hoy}
@@ -171,12 +737,13 @@ class AppointmentService:
         desde_dt = _parse_datetime(desde) if desde else None
         hasta_dt = _parse_datetime(hasta) if hasta else None
 
-        appt = select(Appointment.medico_id, func.count(Appointment.id).label("total"))
-        if desde_dt:
-            appt = appt.where(Appointment.fecha >= desde_dt)
-        if hasta_dt:
-            appt = appt.where(Appointment.fecha <= hasta_dt)
-        appt = appt.group_by(Appointment.medico_id).subquery()
+        turnos = ArchiveRepo.appointments(db, desde_dt, hasta_dt)
+        appt = (
+            select(turnos.c.medico_id, func.count(turnos.c.id).label("total"))
+            .where(turnos.c.estado != TurnoEstado.Reprogramado)
+            .group_by(turnos.c.medico_id)
+            .subquery()
+        )
 
         stmt = (
             select(
@@ -196,9 +763,11 @@ class AppointmentService:
 
     @staticmethod
     def reportes_por_especialidad(db: Session):
+        turnos = ArchiveRepo.appointments(db)
         appt = (
-            select(Appointment.especialidad_id, func.count(Appointment.id).label("total"))
-            .group_by(Appointment.especialidad_id)
+            select(turnos.c.especialidad_id, func.count(turnos.c.id).label("total"))
+            .where(turnos.c.estado != TurnoEstado.Reprogramado)
+            .group_by(turnos.c.especialidad_id)
             .subquery()
         )
         stmt = (
@@ -218,29 +787,26 @@ class AppointmentService:
             raise ValueError("Debe indicar rango de fechas")
         desde_dt = _parse_datetime(f"{desde}T00:00")
         hasta_dt = _parse_datetime(f"{hasta}T23:59")
+        turnos = ArchiveRepo.appointments(db, desde_dt, hasta_dt)
         stmt = (
             select(
-                Appointment.fecha,
+                turnos.c.fecha,
                 Patient.apellido.label("pac_apellido"),
                 Patient.nombre.label("pac_nombre"),
                 Doctor.apellido.label("med_apellido"),
                 Doctor.nombre.label("med_nombre"),
                 Specialty.nombre.label("especialidad"),
             )
-            .join(Patient, Patient.id == Appointment.paciente_id)
-            .join(Doctor, Doctor.id == Appointment.medico_id)
-            .join(Specialty, Specialty.id == Appointment.especialidad_id)
-            .where(
-                Appointment.estado == TurnoEstado.Atendido,
-                Appointment.fecha >= desde_dt,
-                Appointment.fecha <= hasta_dt,
-            )
-            .order_by(Appointment.fecha)
+            .join(Patient, Patient.id == turnos.c.paciente_id)
+            .join(Doctor, Doctor.id == turnos.c.medico_id)
+            .join(Specialty, Specialty.id == turnos.c.especialidad_id)
+            .where(turnos.c.estado == TurnoEstado.Atendido)
+            .order_by(turnos.c.fecha)
         )
         if medico_id:
-            stmt = stmt.where(Appointment.medico_id == medico_id)
+            stmt = stmt.where(turnos.c.medico_id == medico_id)
         if especialidad_id:
-            stmt = stmt.where(Appointment.especialidad_id == especialidad_id)
+            stmt = stmt.where(turnos.c.especialidad_id == especialidad_id)
         rows = db.execute(stmt).all()
         return [
             {
@@ -258,27 +824,18 @@ class AppointmentService:
             raise ValueError("Debe indicar rango de fechas")
         desde_dt = _parse_datetime(f"{desde}T00:00")
         hasta_dt = _parse_datetime(f"{hasta}T23:59")
+        turnos = ArchiveRepo.appointments(db, desde_dt, hasta_dt)
         asistencias = db.scalar(
-            select(func.count(Appointment.id)).where(
-                Appointment.estado == TurnoEstado.Atendido,
-                Appointment.fecha >= desde_dt,
-                Appointment.fecha <= hasta_dt,
-            )
+            select(func.count(turnos.c.id)).where(turnos.c.estado == TurnoEstado.Atendido)
         ) or 0
         reserved_past = db.scalar(
-            select(func.count(Appointment.id)).where(
-                Appointment.estado == TurnoEstado.Reservado,
-                Appointment.fecha >= desde_dt,
-                Appointment.fecha <= hasta_dt,
-                Appointment.fecha < datetime.now(),
+            select(func.count(turnos.c.id)).where(
+                turnos.c.estado == TurnoEstado.Reservado,
+                turnos.c.fecha < datetime.now(),
             )
         ) or 0
         cancelados = db.scalar(
-            select(func.count(Appointment.id)).where(
-                Appointment.estado == TurnoEstado.Cancelado,
-                Appointment.fecha >= desde_dt,
-                Appointment.fecha <= hasta_dt,
-            )
+            select(func.count(turnos.c.id)).where(turnos.c.estado == TurnoEstado.Cancelado)
         ) or 0
         inasistencias = reserved_past + cancelados
         return {
@@ -307,38 +864,142 @@ class AppointmentService:
             return []
 
         start_of_day = datetime.combine(day.date(), time.min)
-        end_of_day = datetime.combine(day.date(), time.max)
-        busy = AppointmentRepo.list(db, medico_id=medico_id, desde=start_of_day, hasta=end_of_day)
-
-        slots: List[Dict] = []
-        for av in availabilities:
-            av_start = datetime.combine(day.date(), av.start_time)
-            av_end = datetime.combine(day.date(), av.end_time)
-            if inicio:
-                custom_start = datetime.combine(day.date(), datetime.strptime(inicio, "%H:%M").time())
-                av_start = max(av_start, custom_start)
-            if fin:
-                custom_end = datetime.combine(day.date(), datetime.strptime(fin, "%H:%M").time())
-                av_end = min(av_end, custom_end)
-            current = av_start
-            step = timedelta(minutes=duracion_min)
-            while current + step <= av_end:
-                slot_end = current + step
-                overlap = False
-                for ap in busy:
-                    if ap.estado == TurnoEstado.Cancelado:
+        end_of_day = start_of_day + timedelta(days=1)
+        holds = sorted((h_start, h_end) for _, _, h_start, h_end in HoldRepo.busy_many(db, [medico_id], start_of_day, end_of_day))
+
+        # Con la tabla `slots` materializada es una lectura por rango de ix_slots_medico_inicio
+        # (solo si el día ya está materializado; si no, se calcula desde la disponibilidad)
+        if _grid_matches(day.date(), availabilities, duracion_min, inicio) and SlotRepo.covers(
+            db, medico_id, day.date()
+        ):
+            desde = datetime.combine(day.date(), datetime.strptime(inicio, "%H:%M").time()) if inicio else start_of_day
+            hasta = datetime.combine(day.date(), datetime.strptime(fin, "%H:%M").time()) if fin else end_of_day
+            return [
+                _slot(slot_start, slot_end)
+                for slot_start, slot_end in SlotRepo.free(db, medico_id, desde, hasta)
+                if not _overlaps_sorted(holds, slot_start, slot_end)
+            ]
+
+        busy = AppointmentRepo.busy(db, medico_id, start_of_day, end_of_day) + holds
+        return _slots_for_day(day.date(), availabilities, busy, duracion_min, inicio, fin)
+
+    @staticmethod
+    def grilla(
+        db: Session,
+        desde: str,
+        hasta: str,
+        especialidad_id: Optional[int] = None,
+        medico_ids: Optional[List[int]] = None,
+        duracion_min: int = 30,
+        inicio: str | None = None,
+        fin: str | None = None,
+    ) -> List[Dict]:
+        """Slots libres de varios médicos en un rango de días (una consulta de disponibilidad y una de turnos).
+
+        Cada médico se resuelve para todo el rango de una vez con `slot_engine`
+        (vectorizado si NumPy está instalado).
+        """
+        if not especialidad_id and not medico_ids:
+            raise ValueError("Debe indicar especialidad o médicos")
+        if duracion_min <= 0:
+            raise ValueError("La duración debe ser mayor a 0")
+        try:
+            first = date.fromisoformat(desde)
+            last = date.fromisoformat(hasta)
+        except ValueError as exc:
+            raise ValueError("Formato de fecha inválido. Usar YYYY-MM-DD") from exc
+        if last < first:
+            raise ValueError("El rango de fechas es inválido")
+        if (last - first).days >= MAX_DIAS_GRILLA:
+            raise ValueError(f"El rango no puede superar {MAX_DIAS_GRILLA} días")
+
+        avail_rows = DoctorRepo.availability_for(db, especialidad_id=especialidad_id, medico_ids=medico_ids)
+        doctors: Dict[int, Dict] = {}
+        rows_by_doctor: Dict[int, List] = defaultdict(list)
+        for row in avail_rows:
+            doctors.setdefault(row.doctor_id, {"medico_id": row.doctor_id, "medico": f"{row.apellido}, {row.nombre}"})
+            rows_by_doctor[row.doctor_id].append(row)
+
+        desde_dt = datetime.combine(first, time.min)
+        hasta_dt = datetime.combine(last, time.min) + timedelta(days=1)
+        busy_by_doctor: Dict[int, List[Tuple[datetime, datetime]]] = defaultdict(list)
+        for medico_id, ap_start, ap_end in _busy_with_holds(db, list(doctors), desde_dt, hasta_dt):
+            busy_by_doctor[medico_id].append((ap_start, ap_end))
+
+        result: List[Dict] = []
+        for medico_id, info in doctors.items():
+            free = slot_engine.free_slots(
+                first,
+                last,
+                slot_engine.bands_by_weekday(rows_by_doctor[medico_id], inicio, fin),
+                busy_by_doctor[medico_id],
+                duracion_min,
+            )
+            dias = [
+                {
+                    "fecha": day.isoformat(),
+                    "slots": [{"iso": iso, "inicio": iso[11:], "fin": slot_fin} for iso, slot_fin in slots],
+                }
+                for day, slots in free.items()
+            ]
+            result.append({**info, "dias": dias})
+        return result
+
+    @staticmethod
+    def proximo_disponible(
+        db: Session,
+        especialidad_id: int,
+        duracion_min: int = 30,
+        desde: Optional[str] = None,
+        cantidad: int = 5,
+    ) -> List[Dict]:
+        """Primeros `cantidad` slots libres entre los médicos activos de una especialidad.
+
+        Avanza día por día leyendo los turnos por bloques de una semana y mezcla los
+        slots de cada médico con un heap, cortando apenas junta los pedidos.
+        """
+        if duracion_min <= 0:
+            raise ValueError("La duración debe ser mayor a 0")
+        if cantidad <= 0:
+            raise ValueError("La cantidad debe ser mayor a 0")
+        desde_dt = max(_parse_datetime(desde) if desde else datetime.now(), datetime.now())
+        desde_iso = desde_dt.strftime(FMT)
+
+        doctors: Dict[int, str] = {}
+        by_weekday: Dict[Tuple[int, int], List] = defaultdict(list)
+        for row in DoctorRepo.availability_for(db, especialidad_id=especialidad_id):
+            doctors.setdefault(row.doctor_id, f"{row.apellido}, {row.nombre}")
+            by_weekday[(row.doctor_id, row.day_of_week)].append(row)
+        if not doctors:
+            return []
+
+        first = desde_dt.date()
+        found: List[Dict] = []
+        for offset in range(0, MAX_DIAS_BUSQUEDA, DIAS_POR_BLOQUE):
+            block_start = first + timedelta(days=offset)
+            block_days = [block_start + timedelta(days=i) for i in range(min(DIAS_POR_BLOQUE, MAX_DIAS_BUSQUEDA - offset))]
+            weekdays = {day.weekday() for day in block_days}
+            medico_ids = [m for m in doctors if any((m, w) in by_weekday for w in weekdays)]
+            if not medico_ids:
+                continue
+            busy_by_day = _busy_by_day(
+                _busy_with_holds(
+                    db,
+                    medico_ids,
+                    datetime.combine(block_days[0], time.min),
+                    datetime.combine(block_days[-1], time.min) + timedelta(days=1),
+                )
+            )
+            for day in block_days:
+                per_doctor = []
+                for medico_id in medico_ids:
+                    availabilities = by_weekday.get((medico_id, day.weekday()))
+                    if not availabilities:
                         continue
-                    ap_end = ap.fecha + timedelta(minutes=ap.duracion_min)
-                    if ap.fecha < slot_end and current < ap_end:
-                        overlap = True
-                        break
-                if not overlap:
-                    slots.append(
-                        {
-                            "iso": current.strftime(FMT),
-                            "inicio": current.strftime("%H:%M"),
-                            "fin": slot_end.strftime("%H:%M"),
-                        }
-                    )
-                current += step
-        return slots
+                    slots = _slots_for_day(day, availabilities, busy_by_day.get((medico_id, day), []), duracion_min)
+                    per_doctor.append([(slot["iso"], medico_id, slot) for slot in slots if slot["iso"] >= desde_iso])
+                for iso, medico_id, slot in heapq.merge(*per_doctor):
+                    found.append({"medico_id": medico_id, "medico": doctors[medico_id], **slot})
+                    if len(found) >= cantidad:
+                        return found
+        return found
@@ -0,0 +1,53 @@
+"""Archivo de turnos históricos.
+
+Los turnos cerrados (atendidos, cancelados o reprogramados) con fecha anterior a
+ARCHIVE_AFTER_DAYS se mueven, con sus consultas, recetas y recordatorios, a las tablas
+`*_archive` (app/models/archive.py), en lotes de ARCHIVE_BATCH_SIZE turnos: cada lote
+es una transacción, así el lock de escritura se libera entre lotes y una interrupción
+deja el archivo consistente. Los Reservado pasados quedan en las tablas vivas hasta que
+se los cierre. Las tablas vivas quedan con los turnos recientes, que son los que
+recorren la agenda, los solapamientos y la disponibilidad; los reportes y el historial
+del paciente leen además el archivo.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.repositories.appointment_repo import AppointmentRepo, appointment_index
+from app.repositories.archive_repo import ArchiveRepo
+
+
+class ArchiveService:
+    @staticmethod
+    def horizonte(dias: Optional[int] = None) -> datetime:
+        dias = settings.ARCHIVE_AFTER_DAYS if dias is None else dias
+        hoy = datetime.combine(datetime.now().date(), datetime.min.time())
+        return hoy - timedelta(days=dias)
+
+    @staticmethod
+    def archivar(db: Session, dias: Optional[int] = None, lote: Optional[int] = None) -> Dict:
+        if dias is not None and dias < 1:
+            raise ValueError("Solo se pueden archivar turnos pasados")
+        antes_de = ArchiveService.horizonte(dias)
+        lote = lote or settings.ARCHIVE_BATCH_SIZE
+        total = {"turnos": 0, "consultas": 0, "recetas": 0, "recordatorios": 0}
+        lotes = 0
+        while True:
+            AppointmentRepo.lock_booking(db, [], [])
+            try:
+                ids = ArchiveRepo.ids_to_archive(db, antes_de, lote)
+                movidos = ArchiveRepo.move(db, ids) if ids else {}
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            if not ids:
+                break
+            for clave, cantidad in movidos.items():
+                total[clave] += cantidad
+            lotes += 1
+        if lotes:
+            appointment_index.clear()
+        return {"antes_de": antes_de, "lotes": lotes, **total}
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from app.models.appointment import TurnoEstado
 from app.models.prescription import Prescription, PrescriptionItem
 from app.repositories.appointment_repo import AppointmentRepo
+from app.repositories.archive_repo import ArchiveRepo
 from app.repositories.consultation_repo import ConsultationRepo
 from app.schemas.consultation import ConsultationCreate
 from app.schemas.prescription import PrescriptionIn
@@ -17,6 +18,8 @@ class ConsultationService:
             raise ValueError("Turno inexistente")
         if appointment.estado == TurnoEstado.Cancelado:
             raise ValueError("El turno está cancelado")
+        if appointment.estado == TurnoEstado.Reprogramado:
+            raise ValueError("El turno fue reprogramado")
         if appointment.fecha > datetime.now():
             raise ValueError("Solo se pueden registrar consultas de turnos ya realizados")
         if ConsultationRepo.get_by_appointment(db, appointment_id):
@@ -56,7 +59,8 @@ class ConsultationService:
 
     @staticmethod
     def historial_paciente(db: Session, paciente_id: int):
-        return ConsultationRepo.by_patient(db, paciente_id)
+        # Las consultas archivadas son anteriores a todas las vivas
+        return ConsultationRepo.by_patient(db, paciente_id) + ArchiveRepo.consultations_by_patient(db, paciente_id)
 
     @staticmethod
     def detalle_turno(db: Session, appointment_id: int):
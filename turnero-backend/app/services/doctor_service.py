@@ -1,18 +1,33 @@
+from typing import Optional
+
 from sqlalchemy.orm import Session
 
 from app.repositories.doctor_repo import DoctorRepo
+from app.services.slot_service import SlotService
 
 
 class DoctorService:
     @staticmethod
-    def list(db: Session):
-        return DoctorRepo.list(db)
+    def list(db: Session, activo: Optional[bool] = None, especialidad_id: Optional[int] = None):
+        return DoctorRepo.list(db, activo, especialidad_id)
+
+    @staticmethod
+    def page(
+        db: Session,
+        limit: int,
+        cursor: Optional[str] = None,
+        activo: Optional[bool] = None,
+        especialidad_id: Optional[int] = None,
+    ):
+        return DoctorRepo.page(db, limit, cursor, activo, especialidad_id)
 
     @staticmethod
     def create(db: Session, data: dict):
         specialties = data.pop("specialty_ids", [])
         availability = data.pop("availability", [])
-        return DoctorRepo.create(db, specialties=specialties, availability=availability, **data)
+        doctor = DoctorRepo.create(db, specialties=specialties, availability=availability, **data)
+        SlotService.materializar(db, [doctor.id])
+        return doctor
 
     @staticmethod
     def update(db: Session, did: int, data: dict):
@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.doctor import Doctor
+from app.models.slot_hold import SlotHold
+from app.repositories.appointment_repo import AppointmentRepo
+from app.repositories.hold_repo import HoldRepo
+from app.services.appointment_service import MSG_HOLD, MSG_SOLAPAMIENTO, AppointmentService, _parse_datetime
+
+
+class HoldService:
+    @staticmethod
+    def reservar(
+        db: Session,
+        medico_id: int,
+        fecha: datetime | str,
+        duracion_min: int = 30,
+        ttl_segundos: Optional[int] = None,
+        usuario_id: Optional[int] = None,
+    ) -> SlotHold:
+        """Bloquea temporalmente un horario del médico mientras se completa el alta del turno."""
+        ttl = ttl_segundos or settings.SLOT_HOLD_TTL_SECONDS
+        if not 0 < ttl <= settings.SLOT_HOLD_MAX_TTL_SECONDS:
+            raise ValueError(f"El tiempo de reserva debe estar entre 1 y {settings.SLOT_HOLD_MAX_TTL_SECONDS} segundos")
+        start = _parse_datetime(fecha)
+        HoldRepo.sweep(db)
+        AppointmentService.check_horario(db.get(Doctor, medico_id), start, duracion_min)
+
+        with AppointmentService.reserva(db, [medico_id], []):
+            if AppointmentRepo.overlaps(db, medico_id, None, start, duracion_min):
+                raise ValueError(MSG_SOLAPAMIENTO)
+            if HoldRepo.overlaps(db, medico_id, start, duracion_min):
+                raise ValueError(MSG_HOLD)
+            return HoldRepo.create(
+                db,
+                medico_id=medico_id,
+                fecha=start,
+                duracion_min=duracion_min,
+                expira_en=datetime.now() + timedelta(seconds=ttl),
+                usuario_id=usuario_id,
+            )
+
+    @staticmethod
+    def liberar(db: Session, hid: int, usuario_id: int) -> None:
+        # Solo quien tomó el hold puede liberarlo; uno ajeno se informa como inexistente
+        if not HoldRepo.release(db, hid, usuario_id=usuario_id):
+            raise ValueError("Reserva temporal inexistente")
@@ -1,12 +1,19 @@
+import csv
 from datetime import datetime, date
+from typing import IO, Callable, Dict, Iterator, List, Optional, Tuple
 
-from sqlalchemy.orm import Session
-
-from datetime import datetime
-
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.repositories.patient_repo import PatientRepo
+from app.schemas.patient import PatientCreate
+
+# Filas que se validan, deduplican e insertan juntas en la importación CSV
+LOTE_IMPORTACION = 1000
+# Errores por fila que se devuelven como máximo (el resto solo se cuenta)
+MAX_ERRORES_IMPORTACION = 1000
+COLUMNAS_OBLIGATORIAS = ("nombre", "apellido", "dni", "fecha_nacimiento")
 
 
 def _parse_birthdate(value: str) -> date:
@@ -16,26 +23,55 @@ def _parse_birthdate(value: str) -> date:
         raise ValueError("La fecha de nacimiento debe tener formato YYYY-MM-DD") from exc
 
 
+def _birthdate(value: str) -> date:
+    birth = _parse_birthdate(value)
+    if birth > datetime.now().date():
+        raise ValueError("La fecha de nacimiento no puede ser futura")
+    return birth
+
+
+def _validation_message(exc: ValidationError) -> str:
+    error = exc.errors()[0]
+    campo = ".".join(str(part) for part in error["loc"])
+    return f"{campo}: {error['msg']}"
+
+
+def _csv_rows(stream: IO[str]) -> Iterator[Tuple[int, Dict[str, Optional[str]]]]:
+    """(línea, fila) del CSV con los encabezados normalizados y los vacíos como None."""
+    reader = csv.DictReader(stream)
+    columnas = [(c or "").strip().lower() for c in reader.fieldnames or []]
+    faltantes = [c for c in COLUMNAS_OBLIGATORIAS if c not in columnas]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el CSV: {', '.join(faltantes)}")
+    reader.fieldnames = columnas
+    for row in reader:
+        yield reader.line_num, {
+            k: (v.strip() or None) if isinstance(v, str) else None for k, v in row.items() if k
+        }
+
+
 class PatientService:
     @staticmethod
-    def list(db: Session):
-        return PatientRepo.list(db)
+    def list(db: Session, activo: Optional[bool] = None):
+        return PatientRepo.list(db, activo)
+
+    @staticmethod
+    def buscar(db: Session, q: str, limit: int = 20, activo: Optional[bool] = None):
+        return PatientRepo.search(db, q.strip(), limit, activo)
+
+    @staticmethod
+    def page(db: Session, limit: int, cursor: Optional[str] = None, activo: Optional[bool] = None):
+        return PatientRepo.page(db, limit, cursor, activo)
 
     @staticmethod
     def create(db: Session, data: dict):
-        birth = _parse_birthdate(data["fecha_nacimiento"])
-        if birth > datetime.now().date():
-            raise ValueError("La fecha de nacimiento no puede ser futura")
-        data["fecha_nacimiento"] = birth
+        data["fecha_nacimiento"] = _birthdate(data["fecha_nacimiento"])
         return PatientRepo.create(db, **data)
 
     @staticmethod
     def update(db: Session, pid: int, data: dict):
         if "fecha_nacimiento" in data:
-            birth = _parse_birthdate(data["fecha_nacimiento"])
-            if birth > datetime.now().date():
-                raise ValueError("La fecha de nacimiento no puede ser futura")
-            data["fecha_nacimiento"] = birth
+            data["fecha_nacimiento"] = _birthdate(data["fecha_nacimiento"])
         data.pop("dni", None)
         return PatientRepo.update(db, pid, **data)
 
@@ -49,3 +85,93 @@ class PatientService:
         if not patient:
             raise ValueError("Paciente inexistente")
         return patient
+
+    @staticmethod
+    def importar_csv(db: Session, stream: IO[str]) -> Dict:
+        """Alta masiva desde un CSV con encabezados (los de PatientCreate).
+
+        Se lee de a LOTE_IMPORTACION filas, así la memoria no depende del tamaño del
+        archivo: cada lote se valida, se deduplica por DNI y email contra la base con una
+        sola consulta (y contra las otras filas del lote) y se inserta con un executemany
+        y un commit. Las filas con error no se insertan y se informan con su número de
+        línea; los lotes ya insertados quedan aunque un lote posterior falle.
+        """
+        result = {"filas": 0, "creados": 0, "errores": [], "errores_omitidos": 0}
+
+        def error(fila: int, dni: Optional[str], mensaje: str) -> None:
+            if len(result["errores"]) < MAX_ERRORES_IMPORTACION:
+                result["errores"].append({"fila": fila, "dni": dni, "error": mensaje})
+            else:
+                result["errores_omitidos"] += 1
+
+        lote: List[Tuple[int, Dict]] = []
+        try:
+            for fila, row in _csv_rows(stream):
+                result["filas"] += 1
+                vacias = [c for c in COLUMNAS_OBLIGATORIAS if not row.get(c)]
+                if vacias:
+                    error(fila, row.get("dni"), f"Faltan datos obligatorios: {', '.join(vacias)}")
+                    continue
+                try:
+                    data = PatientCreate(**row).model_dump()
+                    data["fecha_nacimiento"] = _birthdate(data["fecha_nacimiento"])
+                except ValidationError as exc:
+                    error(fila, row.get("dni"), _validation_message(exc))
+                    continue
+                except ValueError as exc:
+                    error(fila, row.get("dni"), str(exc))
+                    continue
+                lote.append((fila, data))
+                if len(lote) >= LOTE_IMPORTACION:
+                    result["creados"] += PatientService._importar_lote(db, lote, error)
+                    lote = []
+        except UnicodeDecodeError as exc:
+            raise ValueError(f"El archivo debe estar codificado en UTF-8 (cerca de la fila {result['filas'] + 2})") from exc
+        except csv.Error as exc:
+            raise ValueError(f"CSV inválido en la fila {result['filas'] + 2}: {exc}") from exc
+        result["creados"] += PatientService._importar_lote(db, lote, error)
+        result["errores"].sort(key=lambda e: e["fila"])
+        return result
+
+    @staticmethod
+    def _importar_lote(
+        db: Session, lote: List[Tuple[int, Dict]], error: Callable[[int, Optional[str], str], None]
+    ) -> int:
+        for _ in range(2):
+            dnis, emails = PatientRepo.existing_identities(
+                db, {d["dni"] for _, d in lote}, {d["email"] for _, d in lote if d["email"]}
+            )
+            rows = []
+            for fila, data in lote:
+                if data["dni"] in dnis:
+                    error(fila, data["dni"], "Ya existe un paciente con ese DNI")
+                    continue
+                if data["email"] and data["email"] in emails:
+                    error(fila, data["dni"], "Ya existe un paciente con ese email")
+                    continue
+                # Las filas siguientes del lote con el mismo DNI o email quedan como repetidas
+                dnis.add(data["dni"])
+                if data["email"]:
+                    emails.add(data["email"])
+                rows.append((fila, data))
+            try:
+                return PatientRepo.create_many(db, [data for _, data in rows])
+            except IntegrityError:
+                # Otro proceso dio de alta alguno de estos pacientes entre la consulta y el
+                # insert: se vuelve a deduplicar el lote una vez
+                db.rollback()
+                lote = rows
+        # Sigue chocando: alta de a una fila, cada una con su error
+        creados = 0
+        for fila, data in lote:
+            try:
+                PatientRepo.create(db, **data)
+            except ValueError as exc:
+                error(fila, data["dni"], str(exc))
+                continue
+            except IntegrityError:
+                db.rollback()
+                error(fila, data["dni"], "No se pudo dar de alta el paciente")
+                continue
+            creados += 1
+        return creados
@@ -0,0 +1,124 @@
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.waitlist import WaitlistEntry
+from app.repositories.appointment_repo import AppointmentRepo
+from app.repositories.series_repo import SeriesRepo
+from app.repositories.slot_repo import SlotRepo
+from app.services.appointment_service import FMT, AppointmentService, _conflict_message, _interval
+
+MAX_SEMANAS = 104
+
+
+def _expand(desde: date, dias_semana: List[int], hora: time, semanas: int) -> List[datetime]:
+    """Fechas de la serie: cada día indicado de cada semana, a partir de `desde`."""
+    monday = desde - timedelta(days=desde.weekday())
+    days = (monday + timedelta(weeks=w, days=d) for w in range(semanas) for d in dias_semana)
+    return [datetime.combine(day, hora) for day in days if day >= desde]
+
+
+class SeriesService:
+    @staticmethod
+    def crear(db: Session, data: dict) -> Dict:
+        if not 0 < data["semanas"] <= MAX_SEMANAS:
+            raise ValueError(f"La serie debe durar entre 1 y {MAX_SEMANAS} semanas")
+        hora = time.fromisoformat(data["hora"])
+        fechas = _expand(data["desde"], data["dias_semana"], hora, data["semanas"])
+        if not fechas:
+            raise ValueError("La serie no genera ningún turno")
+
+        base = {
+            "paciente_id": data["paciente_id"],
+            "medico_id": data["medico_id"],
+            "especialidad_id": data["especialidad_id"],
+            "duracion_min": data["duracion_min"],
+        }
+        pending = [(fecha, i, {**base, "fecha": fecha}) for i, fecha in enumerate(fechas)]
+        with AppointmentService.reserva(db, [base["medico_id"]], [base["paciente_id"]]):
+            accepted, errors = AppointmentService.validate_batch(db, pending)
+            if errors and not data["omitir_conflictos"]:
+                raise ValueError(_conflict_message(errors, fechas))
+            if not accepted:
+                raise ValueError("Ninguna fecha de la serie está disponible")
+
+            series = SeriesRepo.create(
+                db,
+                **base,
+                dias_semana=",".join(str(d) for d in data["dias_semana"]),
+                hora=hora,
+                desde=data["desde"],
+                semanas=data["semanas"],
+            )
+            rows = [{**row, "receta_url": None, "serie_id": series.id} for _, row in accepted]
+            SlotRepo.occupy(db, [_interval(r["medico_id"], r["fecha"], r["duracion_min"]) for r in rows])
+            new_ids = AppointmentRepo.create_many(db, rows)
+        return {
+            "serie_id": series.id,
+            "turnos": [{"id": new_id, "fecha": row["fecha"].strftime(FMT)} for new_id, row in zip(new_ids, rows)],
+            "omitidos": [{"fecha": fechas[i].strftime(FMT), "error": msg} for i, msg in sorted(errors.items())],
+        }
+
+    @staticmethod
+    def cancelar(db: Session, sid: int) -> Tuple[int, List[WaitlistEntry]]:
+        """Cancela los turnos futuros de la serie y ofrece cada horario a la lista de espera.
+
+        Devuelve la cantidad de turnos cancelados y las entradas de la lista de espera atendidas.
+        """
+        series = SeriesRepo.get(db, sid)
+        if not series:
+            raise ValueError("Serie inexistente")
+        with AppointmentService.reserva(db, [series.medico_id], [series.paciente_id]):
+            occurrences = SeriesRepo.future_occurrences(db, sid)
+            SlotRepo.occupy(db, [_interval(ap.medico_id, ap.fecha, ap.duracion_min) for ap in occurrences], -1)
+            count = SeriesRepo.cancel_future(db, series, auto_commit=False)
+            entries = []
+            for ap in occurrences:
+                entry, _ = AppointmentService._cubrir_vacante(db, ap)
+                if entry:
+                    entries.append(entry)
+            db.commit()
+        return count, entries
+
+    @staticmethod
+    def reprogramar(db: Session, sid: int, hora: str, duracion_min: Optional[int] = None) -> Dict:
+        """Mueve todos los turnos futuros de la serie a otra hora del mismo día."""
+        series = SeriesRepo.get(db, sid)
+        if not series:
+            raise ValueError("Serie inexistente")
+        new_time = time.fromisoformat(hora)
+        duration = duracion_min or series.duracion_min
+        with AppointmentService.reserva(db, [series.medico_id], [series.paciente_id]):
+            # Los turnos se leen con el lock tomado: una cancelación o reprogramación
+            # concurrente ya terminó y no se mueven turnos que dejaron de estar reservados
+            occurrences = SeriesRepo.future_occurrences(db, sid)
+            if not occurrences:
+                raise ValueError("La serie no tiene turnos futuros para reprogramar")
+            fechas = [datetime.combine(ap.fecha.date(), new_time) for ap in occurrences]
+            pending = [
+                (
+                    fecha,
+                    i,
+                    {
+                        "paciente_id": ap.paciente_id,
+                        "medico_id": ap.medico_id,
+                        "especialidad_id": ap.especialidad_id,
+                        "fecha": fecha,
+                        "duracion_min": duration,
+                    },
+                )
+                for i, (ap, fecha) in enumerate(zip(occurrences, fechas))
+            ]
+            changes = [{"id": ap.id, "fecha": fecha, "duracion_min": duration} for ap, fecha in zip(occurrences, fechas)]
+            _, errors = AppointmentService.validate_batch(db, pending, exclude_ids=frozenset(ap.id for ap in occurrences))
+            if errors:
+                raise ValueError(_conflict_message(errors, fechas))
+            SlotRepo.occupy(db, [_interval(ap.medico_id, ap.fecha, ap.duracion_min) for ap in occurrences], -1)
+            SlotRepo.occupy(db, [_interval(series.medico_id, c["fecha"], duration) for c in changes])
+            SeriesRepo.reschedule(db, series, changes, hora=new_time, duracion_min=duration)
+        return {
+            "serie_id": series.id,
+            "turnos": [{"id": c["id"], "fecha": c["fecha"].strftime(FMT)} for c in changes],
+            "omitidos": [],
+        }
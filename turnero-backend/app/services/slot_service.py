@@ -0,0 +1,31 @@
+from typing import Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.repositories.doctor_repo import DoctorRepo
+from app.repositories.slot_repo import SlotRepo
+
+
+class SlotService:
+    @staticmethod
+    def materializar(db: Session, medico_ids: Optional[Iterable[int]] = None) -> int:
+        """Corre el horizonte de la tabla `slots` hasta SLOTS_DIAS_ADELANTE.
+
+        Para los médicos activos (o `medico_ids`), un commit por médico. Es la tarea de
+        mantenimiento diaria (POST /admin/slots); también corre al arrancar la app.
+        Devuelve la cantidad de médicos procesados.
+        """
+        if not SlotRepo.enabled():
+            return 0
+        if medico_ids is None:
+            doctors = DoctorRepo.list(db, activo=True)
+        else:
+            doctors = list(DoctorRepo.get_many(db, medico_ids).values())
+        for doctor in doctors:
+            try:
+                SlotRepo.extend(db, doctor.id, doctor.availability)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+        return len(doctors)
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.doctor import Doctor
+from app.models.patient import Patient
+from app.models.slot_hold import SlotHold
+from app.models.specialty import Specialty
+from app.models.waitlist import WaitlistEntry
+from app.repositories.appointment_repo import MAX_DURACION
+from app.repositories.hold_repo import HoldRepo
+from app.repositories.waitlist_repo import WaitlistRepo
+from app.services.appointment_service import AppointmentService
+
+
+class WaitlistService:
+    @staticmethod
+    def list(
+        db: Session,
+        medico_id: Optional[int] = None,
+        especialidad_id: Optional[int] = None,
+        paciente_id: Optional[int] = None,
+        estado: Optional[str] = None,
+    ):
+        return WaitlistRepo.list(db, medico_id, especialidad_id, paciente_id, estado.upper() if estado else None)
+
+    @staticmethod
+    def crear(db: Session, data: dict, usuario_id: Optional[int] = None) -> WaitlistEntry:
+        patient = db.get(Patient, data["paciente_id"])
+        if not patient or not patient.activo:
+            raise ValueError("El paciente no está activo")
+        if not db.get(Specialty, data["especialidad_id"]):
+            raise ValueError("Especialidad inexistente")
+        if data.get("medico_id"):
+            doctor = db.get(Doctor, data["medico_id"])
+            if not doctor or not doctor.activo:
+                raise ValueError("El médico no está activo")
+            if data["especialidad_id"] not in {s.id for s in doctor.specialties}:
+                raise ValueError("La especialidad seleccionada no corresponde al médico")
+        if data["duracion_min"] <= 0:
+            raise ValueError("La duración debe ser mayor a 0")
+        if timedelta(minutes=data["duracion_min"]) > MAX_DURACION:
+            raise ValueError("La duración no puede superar las 12 horas")
+        if data["hasta"] <= data["desde"]:
+            raise ValueError("El rango de fechas es inválido")
+        if data["hasta"] <= datetime.now():
+            raise ValueError("El rango de fechas debe incluir fechas futuras")
+        return WaitlistRepo.create(db, **data, estado="PENDIENTE", usuario_id=usuario_id)
+
+    @staticmethod
+    def _get(db: Session, eid: int, usuario_id: Optional[int] = None) -> WaitlistEntry:
+        entry = WaitlistRepo.get(db, eid)
+        # Una entrada de otro usuario se informa como inexistente; las anteriores a
+        # la migración 5 no tienen dueño
+        if not entry or (usuario_id is not None and entry.usuario_id not in (None, usuario_id)):
+            raise ValueError("Entrada de lista de espera inexistente")
+        return entry
+
+    @staticmethod
+    def _oferta(db: Session, entry: WaitlistEntry) -> SlotHold:
+        """Hold de la oferta pendiente de la entrada; falla si no hay oferta o ya venció."""
+        if entry.estado != "OFRECIDO":
+            raise ValueError("La entrada no tiene una oferta pendiente")
+        hold = db.get(SlotHold, entry.hold_id, populate_existing=True) if entry.hold_id else None
+        if not hold or hold.expira_en <= datetime.now():
+            raise ValueError("La oferta venció")
+        return hold
+
+    @staticmethod
+    def cancelar(db: Session, eid: int, usuario_id: Optional[int] = None) -> None:
+        entry = WaitlistService._get(db, eid, usuario_id)
+        if entry.estado in {"ASIGNADO", "CANCELADO"}:
+            raise ValueError("La entrada no puede cancelarse")
+        if entry.estado == "OFRECIDO" and entry.hold_id:
+            # Se libera el horario ofrecido para que vuelva a estar disponible
+            HoldRepo.release(db, entry.hold_id, auto_commit=False)
+        entry.estado = "CANCELADO"
+        db.commit()
+
+    @staticmethod
+    def aceptar(db: Session, eid: int, usuario_id: Optional[int] = None):
+        """Confirma la oferta: crea el turno sobre el horario retenido para el paciente.
+
+        El alta, el consumo del hold y el cambio de estado de la entrada van en una sola
+        transacción, bajo el lock de reserva del médico y del paciente.
+        """
+        entry = WaitlistService._get(db, eid, usuario_id)
+        hold = WaitlistService._oferta(db, entry)
+        with AppointmentService.reserva(db, [hold.medico_id], [entry.paciente_id]):
+            # Releída con el lock: dos aceptaciones simultáneas no pueden crear dos turnos
+            db.refresh(entry)
+            hold = WaitlistService._oferta(db, entry)
+            # El hold de la oferta no tiene dueño (lo creó el sistema al liberarse el horario)
+            turno = AppointmentService.create(
+                db,
+                {
+                    "paciente_id": entry.paciente_id,
+                    "medico_id": hold.medico_id,
+                    "especialidad_id": entry.especialidad_id,
+                    "fecha": hold.fecha,
+                    "duracion_min": hold.duracion_min,
+                    "hold_id": hold.id,
+                },
+                auto_commit=False,
+            )
+            entry.estado = "ASIGNADO"
+            entry.turno_id = turno.id
+            entry.hold_id = None
+            db.commit()
+        return turno
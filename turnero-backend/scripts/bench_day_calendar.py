@@ -0,0 +1,122 @@
+"""Slots libres de un día: DayCalendar (bitmap por minuto) contra el recorrido lineal anterior.
+
+Primero verifica sobre 3000 días aleatorios (incluidos turnos que no empiezan en minuto
+exacto) que `_slots_for_day` devuelve lo mismo que el recorrido lineal. Después mide un
+día de 12 horas con slots de 5 minutos y 100 turnos (mejor de 7 corridas) y la memoria
+de un DayCalendar por médico y día.
+
+    python scripts/bench_day_calendar.py
+"""
+import random
+import sys
+import timeit
+import tracemalloc
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.appointment_service import _slot, _slots_for_day  # noqa: E402
+from app.services.day_calendar import DayCalendar  # noqa: E402
+
+DAY = date(2026, 11, 3)
+D0 = datetime.combine(DAY, time.min)
+
+
+def lineal(day, availabilities, busy, duracion_min, inicio=None, fin=None):
+    """El cálculo anterior: cada slot candidato contra todos los intervalos ocupados."""
+    slots = []
+    step = timedelta(minutes=duracion_min)
+    for av in availabilities:
+        av_start = datetime.combine(day, av.start_time)
+        av_end = datetime.combine(day, av.end_time)
+        if inicio:
+            av_start = max(av_start, datetime.combine(day, datetime.strptime(inicio, "%H:%M").time()))
+        if fin:
+            av_end = min(av_end, datetime.combine(day, datetime.strptime(fin, "%H:%M").time()))
+        current = av_start
+        while current + step <= av_end:
+            slot_end = current + step
+            if not any(a < slot_end and current < b for a, b in busy):
+                slots.append(_slot(current, slot_end))
+            current += step
+    return slots
+
+
+def equivalencia(rnd: random.Random, casos: int = 3000) -> None:
+    for _ in range(casos):
+        avs = [
+            SimpleNamespace(
+                start_time=time(rnd.randint(0, 10), rnd.choice([0, 15, 30, 7])),
+                end_time=time(rnd.randint(11, 23), rnd.choice([0, 30, 59])),
+            )
+            for _ in range(rnd.randint(1, 3))
+        ]
+        busy = []
+        for _ in range(rnd.randint(0, 30)):
+            start = D0 + timedelta(minutes=rnd.randint(-200, 1500), seconds=rnd.choice([0, 0, 30]))
+            busy.append((start, start + timedelta(minutes=rnd.randint(1, 120))))
+        duracion = rnd.choice([5, 10, 15, 20, 30, 45, 60])
+        inicio = rnd.choice([None, "09:00", "08:10", "10:03"])
+        fin = rnd.choice([None, "17:00", "16:45"])
+        assert lineal(DAY, avs, busy, duracion, inicio, fin) == _slots_for_day(DAY, avs, busy, duracion, inicio, fin)
+    print(f"equivalencia: {casos} días aleatorios ok")
+
+
+def mejor(fn, number: int = 300) -> float:
+    """Mejor de 7 corridas, en microsegundos por llamada."""
+    return min(timeit.repeat(fn, number=number, repeat=7)) / number * 1e6
+
+
+if __name__ == "__main__":
+    rnd = random.Random(1)
+    equivalencia(rnd)
+
+    avs = [SimpleNamespace(start_time=time(8), end_time=time(20))]
+    busy = [
+        (D0 + timedelta(hours=8, minutes=5 * k), D0 + timedelta(hours=8, minutes=5 * k + 5))
+        for k in sorted(rnd.sample(range(144), 100))
+    ]
+    apertura, cierre = D0 + timedelta(hours=8), D0 + timedelta(hours=20)
+
+    def calendario():
+        cal = DayCalendar(DAY)
+        cal.open(apertura, cierre)
+        for a, b in busy:
+            cal.close(a, b)
+        return cal
+
+    def lineal_sin_formato():
+        step, current, out = timedelta(minutes=5), apertura, []
+        while current + step <= cierre:
+            if not any(a < current + step and current < b for a, b in busy):
+                out.append(current)
+            current += step
+        return out
+
+    def bitmap_sin_formato():
+        return list(calendario().free_slots(apertura, cierre, 5))
+
+    assert lineal_sin_formato() == bitmap_sin_formato()
+    print("día de 12 h, slots de 5 min, 100 turnos")
+    print(f"  _slots_for_day completo: lineal {mejor(lambda: lineal(DAY, avs, busy, 5)):6.0f} us"
+          f"   bitmap {mejor(lambda: _slots_for_day(DAY, avs, busy, 5)):6.0f} us")
+    print(f"  solo el cálculo:         lineal {mejor(lineal_sin_formato):6.0f} us   bitmap {mejor(bitmap_sin_formato):6.0f} us")
+
+    cal = calendario()
+    desde, hasta = D0 + timedelta(hours=12), D0 + timedelta(hours=12, minutes=30)
+    t_lineal = mejor(lambda: any(a < hasta and desde < b for a, b in busy), number=20_000)
+    t_bitmap = mejor(lambda: cal.is_free(desde, hasta), number=20_000)
+    print(f"  un chequeo de solapamiento: lineal {t_lineal:.2f} us   bitmap {t_bitmap:.2f} us")
+
+    tracemalloc.start()
+    calendarios = []
+    for i in range(10_000):
+        c = DayCalendar(DAY)
+        c.open(apertura, cierre)
+        for a, b in busy[: i % 100]:
+            c.close(a, b)
+        calendarios.append(c)
+    por_dia = tracemalloc.get_traced_memory()[0] // len(calendarios)
+    print(f"memoria por médico y día: bitmap {sys.getsizeof(cal.bits)} bytes, {por_dia} bytes con el objeto (tracemalloc)")
@@ -0,0 +1,95 @@
+"""GET /turnos/disponibles/grilla contra una llamada a /turnos/disponibles por médico y día.
+
+Base SQLite temporal con 50 médicos de la especialidad 1 (lunes a sábado de 8 a 20,
+slots de 30 minutos) y 8 turnos por médico y día durante 14 días. Se recorre la grilla
+celda por celda (700 llamadas) y después se pide entera en una sola llamada; las dos
+tienen que devolver la misma cantidad de slots.
+
+    python scripts/bench_grilla.py
+"""
+import atexit
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, datetime, time as dtime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+_tmp = tempfile.mkdtemp(prefix="turnero-bench-")
+atexit.register(shutil.rmtree, _tmp, True)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'app.db')}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.db.session import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.appointment import Appointment  # noqa: E402
+from app.models.doctor import Doctor, DoctorAvailability, doctor_specialty  # noqa: E402
+from app.models.patient import Patient  # noqa: E402
+
+MEDICOS = 50
+DIAS = 14
+TURNOS_POR_DIA = 8
+
+
+def poblar(start: date) -> list:
+    rnd = random.Random(3)
+    with SessionLocal() as db:
+        for i in range(MEDICOS - 1):
+            doctor = Doctor(nombre=f"N{i}", apellido=f"A{i}", dni=f"b{i}", matricula=f"mb{i}", activo=True)
+            doctor.availability = [
+                DoctorAvailability(day_of_week=w, start_time=dtime(8), end_time=dtime(20), slot_minutes=30)
+                for w in range(6)
+            ]
+            db.add(doctor)
+        db.commit()
+        medicos = list(db.execute(select(Doctor.id).order_by(Doctor.id)).scalars())
+        db.execute(insert(doctor_specialty), [{"doctor_id": m, "specialty_id": 1} for m in medicos[1:]])
+        patient = Patient(nombre="Bench", apellido="Grilla", dni="b0", fecha_nacimiento=date(1990, 1, 1))
+        db.add(patient)
+        db.flush()
+        rows = [
+            {
+                "paciente_id": patient.id,
+                "medico_id": m,
+                "especialidad_id": 1,
+                "fecha": datetime.combine(start + timedelta(days=k), dtime()) + timedelta(minutes=30 * h),
+                "duracion_min": 30,
+                "estado": "Reservado",
+            }
+            for m in medicos
+            for k in range(DIAS)
+            for h in rnd.sample(range(8 * 2, 17 * 2), TURNOS_POR_DIA)
+        ]
+        db.execute(insert(Appointment), rows)
+        db.commit()
+    return medicos
+
+
+if __name__ == "__main__":
+    start = date.today() + timedelta(days=1)
+    medicos = poblar(start)
+    client = TestClient(app)
+    token = client.post("/auth/login", json={"email": "admin@demo.com", "password": "admin123"}).json()["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    t = time.perf_counter()
+    por_celda = 0
+    for medico_id in medicos:
+        for k in range(DIAS):
+            params = {"medico_id": medico_id, "fecha": (start + timedelta(days=k)).isoformat(), "inicio": "08:00", "fin": "20:00"}
+            por_celda += len(client.get("/turnos/disponibles", params=params, headers=headers).json())
+    t_celdas = time.perf_counter() - t
+
+    t = time.perf_counter()
+    params = {"especialidad_id": 1, "desde": start.isoformat(), "hasta": (start + timedelta(days=DIAS - 1)).isoformat()}
+    grilla = client.get("/turnos/disponibles/grilla", params=params, headers=headers).json()
+    t_grilla = time.perf_counter() - t
+    en_grilla = sum(len(dia["slots"]) for medico in grilla for dia in medico["dias"])
+
+    print(f"celda por celda: {len(medicos) * DIAS} llamadas, {t_celdas * 1000:.0f} ms ({por_celda} slots)")
+    print(f"grilla:          1 llamada, {t_grilla * 1000:.0f} ms ({en_grilla} slots)")
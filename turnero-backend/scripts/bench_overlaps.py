@@ -0,0 +1,96 @@
+"""Latencia del chequeo de solapamiento (AppointmentRepo.overlaps) según el tamaño de la tabla.
+
+Por cada tamaño crea una base SQLite temporal con N turnos repartidos entre 50 médicos
+y mide 200 chequeos sobre la mitad de la agenda, con el plan de las sentencias que emite.
+
+    python scripts/bench_overlaps.py                 # 1.000, 100.000, 1.000.000 y 5.000.000 turnos
+    python scripts/bench_overlaps.py 10000 50000
+"""
+import atexit
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+_tmp = tempfile.mkdtemp(prefix="turnero-bench-")
+atexit.register(shutil.rmtree, _tmp, True)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'app.db')}"
+
+from sqlalchemy import create_engine, event, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import app.main  # noqa: E402,F401  registra todos los modelos
+from app.db.base import Base  # noqa: E402
+from app.models.appointment import Appointment  # noqa: E402
+from app.repositories.appointment_repo import AppointmentRepo  # noqa: E402
+
+MEDICOS = 50
+CHEQUEOS = 200
+LOTE = 50_000
+
+
+def poblar(engine, n: int, base: datetime) -> None:
+    rnd = random.Random(n)
+    with engine.begin() as conn:
+        rows = []
+        for i in range(n):
+            rows.append(
+                {
+                    "paciente_id": rnd.randint(1, 50_000),
+                    "medico_id": rnd.randint(1, MEDICOS),
+                    "especialidad_id": 1,
+                    "fecha": base + timedelta(minutes=30 * i // MEDICOS),
+                    "duracion_min": 30,
+                    "estado": "Reservado",
+                }
+            )
+            if len(rows) == LOTE:
+                conn.execute(insert(Appointment), rows)
+                rows = []
+        if rows:
+            conn.execute(insert(Appointment), rows)
+
+
+def medir(n: int) -> None:
+    engine = create_engine(f"sqlite:///{os.path.join(_tmp, f'bench_{n}.db')}")
+    Base.metadata.create_all(engine)
+    base = datetime(2020, 1, 1, 8)
+    poblar(engine, n, base)
+    with engine.connect() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    db = sessionmaker(bind=engine)()
+    probe = base + timedelta(minutes=30 * n // (2 * MEDICOS))
+
+    start = time.perf_counter()
+    for i in range(CHEQUEOS):
+        AppointmentRepo.overlaps(db, 7, 123, probe + timedelta(minutes=i), 30)
+    elapsed = (time.perf_counter() - start) / CHEQUEOS
+
+    # Plan de las sentencias que emite AppointmentRepo.overlaps, con sus parámetros
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    AppointmentRepo.overlaps(db, 7, 123, probe, 30)
+    event.remove(engine, "before_cursor_execute", capture)
+    cursor = db.connection().connection.driver_connection.cursor()
+    plan = [row[3] for statement, parameters in captured
+            for row in cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+    print(f"{n:>10,} turnos: {elapsed * 1000:6.2f} ms por chequeo")
+    for step in plan:
+        print(f"{'':>20}{step}")
+    db.close()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [1_000, 100_000, 1_000_000, 5_000_000]
+    for size in sizes:
+        medir(size)
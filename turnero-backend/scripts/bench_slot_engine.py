@@ -0,0 +1,118 @@
+"""Grilla de 90 días x 30 médicos: cálculo por día contra `slot_engine` (Python y NumPy).
+
+Dos escenarios con los ocupados ya en memoria (sin base de datos), respuesta incluida:
+horario de consultorio con grilla de 30 minutos y días de 12 horas con grilla de 5
+minutos y 100 turnos por día. Se verifica que todas las variantes den lo mismo y se
+informa el mejor de varias corridas. La variante NumPy se omite si no está instalado.
+
+    python scripts/bench_slot_engine.py
+"""
+import random
+import sys
+import time as clock
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services import slot_engine  # noqa: E402
+from app.services.appointment_service import _busy_by_day, _slots_for_day  # noqa: E402
+
+DIAS = 90
+MEDICOS = 30
+FIRST = date(2026, 11, 2)
+
+
+def por_dia(rows, busy, duracion):
+    """El camino anterior de la grilla: un `_slots_for_day` por médico y día."""
+    out = []
+    for medico, intervals in busy.items():
+        by_day = _busy_by_day([(medico, a, b) for a, b in intervals])
+        dias = []
+        for k in range(DIAS):
+            day = FIRST + timedelta(days=k)
+            avs = [r for r in rows if r.day_of_week == day.weekday()]
+            slots = _slots_for_day(day, avs, by_day.get((medico, day), []), duracion) if avs else []
+            if slots:
+                dias.append({"fecha": day.isoformat(), "slots": slots})
+        out.append(dias)
+    return out
+
+
+def motor(impl, rows, busy, duracion, con_respuesta=True):
+    bands = slot_engine.bands_by_weekday(rows)
+    days = [FIRST + timedelta(days=k) for k in range(DIAS)]
+    base = datetime.combine(FIRST, time.min)
+    out = []
+    for intervals in busy.values():
+        free = impl(base, days, bands, intervals, duracion)
+        if con_respuesta:
+            free = [
+                {"fecha": d.isoformat(), "slots": [{"iso": a, "inicio": a[11:], "fin": b} for a, b in v]}
+                for d, v in free.items()
+            ]
+        out.append(free)
+    return out
+
+
+def mejor(fn, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        start = clock.perf_counter()
+        result = fn()
+        tiempos.append(clock.perf_counter() - start)
+    return min(tiempos) * 1000, result
+
+
+def escenario(titulo, rows, busy, duracion):
+    total = sum(map(len, busy.values()))
+    t_dia, esperado = mejor(lambda: por_dia(rows, busy, duracion), 3)
+    t_py, result = mejor(lambda: motor(slot_engine._free_python, rows, busy, duracion), 5)
+    assert result == esperado
+    linea = f"  por día {t_dia:5.0f} ms | motor Python {t_py:5.0f} ms (x{t_dia / t_py:.1f})"
+    if slot_engine.np is not None:
+        t_np, result = mejor(lambda: motor(slot_engine._free_numpy, rows, busy, duracion), 5)
+        assert result == esperado
+        t_mask, _ = mejor(lambda: motor(slot_engine._free_numpy, rows, busy, duracion, con_respuesta=False), 5)
+        linea += f" | motor NumPy {t_np:5.0f} ms (x{t_dia / t_np:.1f}), sin armar la respuesta {t_mask:.0f} ms"
+    print(f"{titulo} ({total} turnos)")
+    print(linea)
+
+
+def consultorio(rnd):
+    rows = [SimpleNamespace(day_of_week=w, start_time=time(8), end_time=time(12)) for w in range(5)]
+    rows += [SimpleNamespace(day_of_week=w, start_time=time(14), end_time=time(20)) for w in range(5)]
+    busy = {}
+    for medico in range(MEDICOS):
+        intervals = []
+        for k in range(DIAS):
+            day = FIRST + timedelta(days=k)
+            if day.weekday() >= 5:
+                continue
+            for slot in rnd.sample(range(20), 10):
+                hora = time(8) if slot < 8 else time(14)
+                start = datetime.combine(day, hora) + timedelta(minutes=30 * (slot if slot < 8 else slot - 8))
+                intervals.append((start, start + timedelta(minutes=30)))
+        busy[medico] = intervals
+    return rows, busy
+
+
+def jornada_larga(rnd):
+    rows = [SimpleNamespace(day_of_week=w, start_time=time(8), end_time=time(20)) for w in range(7)]
+    busy = {}
+    for medico in range(MEDICOS):
+        intervals = []
+        for k in range(DIAS):
+            day_start = datetime.combine(FIRST + timedelta(days=k), time(8))
+            for slot in rnd.sample(range(144), 100):
+                start = day_start + timedelta(minutes=5 * slot)
+                intervals.append((start, start + timedelta(minutes=5)))
+        busy[medico] = intervals
+    return rows, busy
+
+
+if __name__ == "__main__":
+    print(f"{DIAS} días x {MEDICOS} médicos, NumPy {'instalado' if slot_engine.np is not None else 'no instalado'}")
+    escenario("consultorio, grilla de 30 min", *consultorio(random.Random(3)), 30)
+    escenario("12 h por día, grilla de 5 min, 100 turnos por día", *jornada_larga(random.Random(5)), 5)
@@ -0,0 +1,102 @@
+"""Altas concurrentes (POST /turnos) con el perfil SQLite por defecto y con el ajustado.
+
+Levanta uvicorn sobre una base temporal, crea 8 médicos y 8 pacientes y lanza 8
+clientes HTTP en paralelo, cada uno con su médico, que hacen 120 altas de 15 minutos.
+Cada perfil se corre dos veces. Necesita uvicorn y httpx.
+
+    python scripts/bench_sqlite_profile.py
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import httpx
+
+BACKEND = Path(__file__).resolve().parents[1]
+PORT = 8765
+CLIENTES = 8
+ALTAS = 120
+
+PERFILES = [
+    (
+        "sin ajustes (rollback journal, synchronous=FULL)",
+        {"SQLITE_WAL": "false", "SQLITE_SYNCHRONOUS": "FULL", "SQLITE_MMAP_SIZE": "0", "SQLITE_CACHE_SIZE_KIB": "2000"},
+    ),
+    ("perfil ajustado (WAL, synchronous=NORMAL, mmap, cache)", {}),
+]
+
+
+def _dias_habiles(cantidad: int) -> list:
+    day, days = date.today() + timedelta(days=1), []
+    while len(days) < cantidad:
+        if day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def correr(etiqueta: str, env: dict) -> None:
+    with tempfile.TemporaryDirectory(prefix="turnero-bench-") as tmp:
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'app.db')}", **env}
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning"],
+            cwd=BACKEND,
+            env=env,
+        )
+        try:
+            base = f"http://127.0.0.1:{PORT}"
+            for _ in range(100):
+                try:
+                    httpx.get(f"{base}/health")
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.1)
+            client = httpx.Client(base_url=base, timeout=60)
+            token = client.post("/auth/login", json={"email": "admin@demo.com", "password": "admin123"}).json()["token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            medicos, pacientes = [], []
+            for i in range(CLIENTES):
+                availability = [
+                    {"day_of_week": w, "start_time": "08:00", "end_time": "20:00", "slot_minutes": 15} for w in range(5)
+                ]
+                doctor = {"nombre": "Bench", "apellido": f"M{i}", "dni": f"9{i}", "matricula": f"B{i}",
+                          "specialty_ids": [1], "availability": availability}
+                medicos.append(client.post("/medicos", headers=headers, json=doctor).json()["id"])
+                patient = {"nombre": "Bench", "apellido": f"P{i}", "dni": f"8{i}", "fecha_nacimiento": "1990-01-01"}
+                pacientes.append(client.post("/pacientes", headers=headers, json=patient).json()["id"])
+
+            horarios = [f"{d}T{8 + m // 60:02d}:{m % 60:02d}" for d in _dias_habiles(10) for m in range(0, 12 * 60, 15)]
+            errores = []
+
+            def cliente(i: int) -> None:
+                with httpx.Client(base_url=base, timeout=60) as http:
+                    for fecha in horarios[:ALTAS]:
+                        data = {"paciente_id": pacientes[i], "medico_id": medicos[i], "especialidad_id": 1,
+                                "fecha": fecha, "duracion_min": 15}
+                        response = http.post("/turnos", headers=headers, json=data)
+                        if response.status_code != 200:
+                            errores.append(response.text[:100])
+
+            hilos = [threading.Thread(target=cliente, args=(i,)) for i in range(CLIENTES)]
+            start = time.perf_counter()
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+            elapsed = time.perf_counter() - start
+            total = CLIENTES * ALTAS
+            print(f"{etiqueta}: {total} altas en {elapsed:.2f} s -> {total / elapsed:.0f} req/s, errores={len(errores)}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    for _ in range(2):
+        for etiqueta, env in PERFILES:
+            correr(etiqueta, env)
@@ -0,0 +1,106 @@
+"""Fixtures comunes.
+
+La app se importa contra una base SQLite en un archivo temporal (DATABASE_URL se fija
+antes del primer import de `app`). Después de cada test se vacían las tablas de turnos
+y pacientes; el admin, las especialidades y el médico demo del seed se conservan.
+"""
+import itertools
+import os
+import tempfile
+import threading
+from datetime import date, timedelta
+
+_tmp = tempfile.mkdtemp(prefix="turnero-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'turnero.db')}"
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+
+from app.main import app
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.repositories.appointment_repo import appointment_index
+from app.services.patient_service import PatientService
+
+# Tablas del seed, que los tests no vacían
+_SEED = {"users", "specialties", "doctors", "doctor_specialties", "doctor_availability"}
+_dni = itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def database_path() -> str:
+    return engine.url.database
+
+
+@pytest.fixture(scope="session")
+def client() -> TestClient:
+    return TestClient(app)
+
+
+@pytest.fixture(scope="session")
+def headers(client) -> dict:
+    token = client.post("/auth/login", json={"email": "admin@demo.com", "password": "admin123"}).json()["token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(autouse=True)
+def _clean_tables():
+    yield
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            if table.name not in _SEED:
+                conn.execute(delete(table))
+    appointment_index.clear()
+
+
+@pytest.fixture
+def make_patient(db):
+    def make(**data):
+        n = next(_dni)
+        values = {"nombre": "Paciente", "apellido": f"Test{n}", "dni": f"90{n:06d}", "fecha_nacimiento": "1990-01-01"}
+        return PatientService.create(db, {**values, **data})
+
+    return make
+
+
+@pytest.fixture
+def tuesday() -> date:
+    """Próximo martes (el médico demo atiende de lunes a viernes de 9 a 17)."""
+    day = date.today() + timedelta(days=1)
+    while day.weekday() != 1:
+        day += timedelta(days=1)
+    return day
+
+
+@pytest.fixture
+def run_concurrently():
+    """Ejecuta cada llamada `fn(session)` en su hilo y con su sesión; devuelve el resultado o la excepción."""
+
+    def run(*calls):
+        results = [None] * len(calls)
+
+        def worker(i, fn):
+            with SessionLocal() as session:
+                try:
+                    results[i] = fn(session)
+                except Exception as exc:
+                    results[i] = exc
+
+        threads = [threading.Thread(target=worker, args=(i, fn)) for i, fn in enumerate(calls)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    return run
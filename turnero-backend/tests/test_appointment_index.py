@@ -0,0 +1,130 @@
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import delete
+
+from app.core.config import settings
+from app.db.query_stats import count_queries
+from app.db.session import SessionLocal
+from app.main import create_app
+from app.models.appointment import Appointment
+from app.repositories.appointment_repo import AppointmentRepo, appointment_index
+from app.services.appointment_service import MSG_SOLAPAMIENTO, AppointmentService
+from app.services.doctor_service import DoctorService
+
+
+@pytest.fixture
+def index_enabled(monkeypatch):
+    monkeypatch.setattr(appointment_index, "enabled", True)
+    appointment_index.clear()
+
+
+@pytest.fixture
+def second_doctor(db):
+    availability = [
+        {"day_of_week": d, "start_time": "09:00", "end_time": "17:00", "slot_minutes": 30} for d in range(5)
+    ]
+    doctor = DoctorService.create(
+        db,
+        {
+            "nombre": "Eva",
+            "apellido": "Destino",
+            "dni": "30999888",
+            "matricula": "MAT-DEST",
+            "specialty_ids": [1],
+            "availability": availability,
+        },
+    )
+    yield doctor
+    db.delete(doctor)
+    db.commit()
+
+
+def test_reprogramar_dia_invalida_destino_y_pacientes(db, tuesday, make_patient, index_enabled, second_doctor):
+    patient, other = make_patient(), make_patient()
+    AppointmentService.create(
+        db, {"paciente_id": patient.id, "medico_id": 1, "especialidad_id": 1, "fecha": f"{tuesday}T10:00"}
+    )
+    nuevo_dia = tuesday + timedelta(days=7)
+    antes = datetime.fromisoformat(f"{tuesday}T10:00")
+    despues = datetime.fromisoformat(f"{nuevo_dia}T10:00")
+    # Carga en el índice las claves del médico de destino y del paciente
+    assert not AppointmentRepo.overlaps(db, second_doctor.id, other.id, despues, 30)
+    assert AppointmentRepo.overlaps(db, second_doctor.id, patient.id, antes, 30)
+
+    AppointmentService.reprogramar_dia(db, 1, tuesday, nuevo_dia, medico_destino_id=second_doctor.id)
+
+    # Médico de destino: ahora ocupado el nuevo día
+    assert AppointmentRepo.overlaps(db, second_doctor.id, other.id, despues, 30)
+    # Paciente: libre el día original, ocupado el nuevo
+    assert not AppointmentRepo.overlaps(db, 1, patient.id, antes, 30)
+    assert AppointmentRepo.overlaps(db, 1, patient.id, despues, 30)
+
+
+def test_un_solapamiento_del_indice_se_confirma_con_la_db(db, tuesday, make_patient, index_enabled):
+    patient = make_patient()
+    turno = AppointmentService.create(
+        db, {"paciente_id": patient.id, "medico_id": 1, "especialidad_id": 1, "fecha": f"{tuesday}T10:00"}
+    )
+    inicio = datetime.fromisoformat(f"{tuesday}T10:00")
+    assert AppointmentRepo.overlaps(db, 1, make_patient().id, inicio, 30)
+
+    # Otro worker lo borra: este índice no se entera, pero no rechaza el horario
+    with SessionLocal() as other:
+        other.execute(delete(Appointment).where(Appointment.id == turno.id))
+        other.commit()
+    assert not AppointmentRepo.overlaps(db, 1, make_patient().id, inicio, 30)
+
+
+def test_dentro_de_la_reserva_el_indice_reemplaza_la_consulta(db, tuesday, make_patient, index_enabled):
+    patient = make_patient()
+    data = {"paciente_id": patient.id, "medico_id": 1, "especialidad_id": 1}
+    AppointmentService.create(db, {**data, "fecha": f"{tuesday}T10:00"})
+
+    with count_queries() as stats:
+        AppointmentService.create(db, {**data, "fecha": f"{tuesday}T11:00"})
+    assert not [sql for sql in stats.statements if "EXISTS" in sql and "appointments" in sql], stats.statements
+
+    # Un solapamiento sigue rechazándose
+    with pytest.raises(ValueError, match=MSG_SOLAPAMIENTO):
+        AppointmentService.create(db, {**data, "paciente_id": make_patient().id, "fecha": f"{tuesday}T10:00"})
+
+
+@pytest.mark.parametrize("commit", [True, False])
+def test_una_alta_sin_commit_no_se_responde_desde_el_indice(db, tuesday, make_patient, index_enabled, commit):
+    patient, other_patient = make_patient(), make_patient()
+    inicio = datetime.fromisoformat(f"{tuesday}T10:00")
+    assert appointment_index.overlaps(db, 1, patient.id, inicio, 30) is False
+
+    with SessionLocal() as other:
+        AppointmentRepo.create(
+            other, auto_commit=False, paciente_id=patient.id, medico_id=1, especialidad_id=1, fecha=inicio
+        )
+        # Mientras la otra transacción no termina, el índice no responde por esas claves
+        assert appointment_index.overlaps(db, 1, other_patient.id, inicio, 30) is None
+        assert appointment_index.between(db, 1, inicio, inicio + timedelta(hours=1)) is None
+        other.commit() if commit else other.rollback()
+
+    assert appointment_index.overlaps(db, 1, other_patient.id, inicio, 30) is commit
+
+
+def test_el_indice_requiere_un_unico_proceso(monkeypatch):
+    monkeypatch.setattr(settings, "APPOINTMENT_INDEX_ENABLED", True)
+    create_app()
+    try:
+        # Un segundo worker sobre la misma base no arranca
+        other = subprocess.run(
+            [sys.executable, "-c", "import app.main"],
+            cwd=Path(__file__).resolve().parents[1],
+            env={**os.environ, "APPOINTMENT_INDEX_ENABLED": "true"},
+            capture_output=True,
+            text=True,
+        )
+        assert other.returncode != 0
+        assert "requiere un único proceso" in other.stderr
+    finally:
+        appointment_index.release_claim()
@@ -0,0 +1,102 @@
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.models.appointment import Appointment
+from app.models.archive import ArchivedAppointment, ArchivedPrescriptionItem, ArchivedReminder
+from app.models.consultation import Consultation
+from app.models.prescription import Prescription, PrescriptionItem
+from app.models.reminder import Reminder
+from app.repositories.appointment_repo import AppointmentRepo
+
+
+def _hace(dias: int, hora: int = 10) -> datetime:
+    return datetime.combine(date.today() - timedelta(days=dias), time(hora))
+
+
+@pytest.fixture
+def historia(db, make_patient, tuesday):
+    """Turnos del mismo paciente: cerrados hace 40-60 días, un ausente y uno atendido hace 10 días."""
+    patient = make_patient()
+    estados = {
+        "atendido": (_hace(60), "Atendido"),
+        "cancelado": (_hace(50), "Cancelado"),
+        "reprogramado": (_hace(45), "Reprogramado"),
+        "ausente": (_hace(40), "Reservado"),
+        "reciente": (_hace(10), "Atendido"),
+    }
+    rows = [
+        {"paciente_id": patient.id, "medico_id": 1, "especialidad_id": 1, "fecha": fecha, "estado": estado}
+        for fecha, estado in estados.values()
+    ]
+    ids = dict(zip(estados, AppointmentRepo.create_many(db, rows)))
+    # El turno que reemplazó al reprogramado sigue vivo y lo referencia
+    ids["nuevo"] = AppointmentRepo.create(
+        db, paciente_id=patient.id, medico_id=1, especialidad_id=1,
+        fecha=datetime.combine(tuesday, time(10)), reprogramado_de_id=ids["reprogramado"],
+    ).id
+    for clave in ("atendido", "reciente"):
+        consulta = Consultation(appointment_id=ids[clave], motivo=f"Control {clave}", diagnostico="Sano")
+        db.add(consulta)
+        db.flush()
+        receta = Prescription(consultation_id=consulta.id, fecha_emision=date.today())
+        db.add(receta)
+        db.flush()
+        db.add(PrescriptionItem(prescription_id=receta.id, medicamento="Ibuprofeno", dosis="400 mg"))
+        db.add(Reminder(appointment_id=ids[clave], canal="email", programado_para=_hace(61)))
+    db.commit()
+    return patient, ids
+
+
+def _lecturas(client, headers, patient):
+    desde, hasta = date.today() - timedelta(days=90), date.today()
+    rutas = [
+        ("/reportes/turnos-medico", {}),
+        ("/reportes/turnos-medico", {"desde": f"{desde}T00:00", "hasta": f"{hasta}T23:59"}),
+        # Rango posterior a todo lo archivado: solo la tabla viva
+        ("/reportes/turnos-medico", {"desde": f"{hasta - timedelta(days=20)}T00:00"}),
+        ("/reportes/turnos-especialidad", {}),
+        ("/reportes/pacientes-atendidos", {"desde": str(desde), "hasta": str(hasta)}),
+        ("/reportes/asistencia", {"desde": str(desde), "hasta": str(hasta)}),
+        (f"/turnos/paciente/{patient.id}/historial", {}),
+    ]
+    lecturas = []
+    for ruta, params in rutas:
+        response = client.get(ruta, params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        lecturas.append(response.json())
+    return lecturas
+
+
+def test_lo_archivado_sigue_en_reportes_e_historial(client, headers, db, historia):
+    patient, ids = historia
+    antes = _lecturas(client, headers, patient)
+
+    response = client.post("/admin/archivar", params={"dias": 30}, headers=headers)
+
+    assert response.status_code == 200
+    assert {k: response.json()[k] for k in ("turnos", "consultas", "recetas", "recordatorios")} == {
+        "turnos": 3, "consultas": 1, "recetas": 1, "recordatorios": 1,
+    }
+    assert _lecturas(client, headers, patient) == antes
+    historial = antes[-1]
+    assert [c["appointment_id"] for c in historial] == [ids["reciente"], ids["atendido"]]
+    assert historial[1]["receta"]["items"][0]["medicamento"] == "Ibuprofeno"
+    assert antes[4] and all(r["especialidad"] for r in antes[4])
+
+
+def test_solo_se_archivan_los_turnos_cerrados_y_vencidos(client, headers, db, historia):
+    _, ids = historia
+    client.post("/admin/archivar", params={"dias": 30}, headers=headers)
+
+    vivos = set(db.execute(select(Appointment.id)).scalars())
+    archivados = set(db.execute(select(ArchivedAppointment.id)).scalars())
+    assert archivados == {ids["atendido"], ids["cancelado"], ids["reprogramado"]}
+    # El ausente sin registrar, el reciente y el turno que reemplazó al reprogramado quedan vivos
+    assert vivos == {ids["ausente"], ids["reciente"], ids["nuevo"]}
+    assert db.get(Appointment, ids["nuevo"]).reprogramado_de_id is None
+    assert [r.appointment_id for r in db.execute(select(Reminder)).scalars()] == [ids["reciente"]]
+    assert [r.appointment_id for r in db.execute(select(ArchivedReminder)).scalars()] == [ids["atendido"]]
+    assert db.execute(select(ArchivedPrescriptionItem.medicamento)).scalars().all() == ["Ibuprofeno"]
+    assert db.execute(select(Consultation.appointment_id)).scalars().all() == [ids["reciente"]]
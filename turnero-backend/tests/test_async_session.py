@@ -0,0 +1,135 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.api.deps import get_db_runner
+from app.core.config import settings
+from app.db.async_session import DbRunner, _create_async_engine, async_url
+from app.main import app
+from app.repositories.appointment_repo import AppointmentRepo
+
+
+@pytest.fixture
+def async_sessions(monkeypatch):
+    """Rutas de lectura sobre aiosqlite (DB_ASYNC=true) con la tabla `slots` habilitada."""
+    monkeypatch.setattr(settings, "SLOTS_MATERIALIZED_ENABLED", True)
+    async_engine = _create_async_engine(async_url(settings.DATABASE_URL))
+    factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def runner():
+        async with factory() as session:
+            yield DbRunner(session=session)
+
+    app.dependency_overrides[get_db_runner] = runner
+    yield factory
+    app.dependency_overrides.pop(get_db_runner)
+    asyncio.run(async_engine.dispose())
+
+
+def test_disponibles_async_con_slots_materializados(client, headers, tuesday, async_sessions):
+    params = {"medico_id": 1, "fecha": tuesday.isoformat()}
+    response = client.get("/turnos/disponibles", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    assert [s["inicio"] for s in response.json()][:2] == ["09:00", "09:30"]
+
+
+def test_lock_booking_sobre_aiosqlite(async_sessions):
+    def driver_in_transaction(session):
+        return session.connection().connection.driver_connection.in_transaction
+
+    async def lock():
+        async with async_sessions() as session:
+            await session.run_sync(AppointmentRepo.lock_booking, [1], [])
+            locked = await session.run_sync(driver_in_transaction)
+            await session.commit()
+        return locked
+
+    assert asyncio.run(lock())
+
+
+# Corre en otro proceso: DB_ASYNC se lee al importar `app`. Devuelve cada respuesta y las
+# sentencias que ejecutó cada engine durante los requests (sin contar el arranque).
+_CON_DB_ASYNC = """
+import json, sys
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.db.async_session import async_engine
+from app.db.session import engine
+from app.main import app
+
+statements = {"sync": 0, "async": 0}
+def counter(key):
+    def count(*args):
+        statements[key] += 1
+    return count
+event.listen(engine, "before_cursor_execute", counter("sync"))
+event.listen(async_engine.sync_engine, "before_cursor_execute", counter("async"))
+
+client = TestClient(app)
+headers = {"Authorization": sys.argv[1]}
+responses = [client.get(path, params=params, headers=headers) for path, params in json.loads(sys.argv[2])]
+print(json.dumps({
+    "driver": async_engine.dialect.driver,
+    "statements": statements,
+    "responses": [[r.status_code, r.json()] for r in responses],
+}))
+"""
+
+
+def test_rutas_de_lectura_de_punta_a_punta_con_db_async(client, headers, make_patient, tuesday):
+    paciente = make_patient()
+    turno = client.post(
+        "/turnos",
+        json={"paciente_id": paciente.id, "medico_id": 1, "especialidad_id": 1, "fecha": f"{tuesday}T10:00"},
+        headers=headers,
+    ).json()
+    semana = {"desde": str(tuesday), "hasta": str(tuesday + timedelta(days=6))}
+    rutas = [
+        ("/turnos", {"expand": "nombres"}),
+        ("/turnos/agenda", semana),
+        (f"/turnos/{turno['id']}", {}),
+        ("/turnos/disponibles", {"medico_id": 1, "fecha": str(tuesday)}),
+        ("/turnos/disponibles/grilla", {**semana, "especialidad_id": 1}),
+        ("/turnos/proximo-disponible", {"especialidad_id": 1, "desde": f"{tuesday}T08:00"}),
+        ("/pacientes", {}),
+        (f"/pacientes/{paciente.id}", {}),
+        ("/pacientes/buscar", {"q": paciente.apellido}),
+        ("/medicos", {}),
+        ("/medicos/1", {}),
+        ("/especialidades", {}),
+        ("/reportes/turnos-medico", {}),
+        ("/reportes/asistencia", semana),
+        ("/reportes/resumen", {}),
+    ]
+    # Las mismas rutas con DB_ASYNC=false: Session común en el threadpool
+    esperado = []
+    for ruta, params in rutas:
+        response = client.get(ruta, params=params, headers=headers)
+        esperado.append([response.status_code, response.json()])
+
+    proceso = subprocess.run(
+        [sys.executable, "-c", _CON_DB_ASYNC, headers["Authorization"], json.dumps(rutas)],
+        cwd=Path(__file__).resolve().parents[1],
+        env={**os.environ, "DB_ASYNC": "true"},
+        capture_output=True,
+        text=True,
+    )
+
+    assert proceso.returncode == 0, proceso.stderr
+    result = json.loads(proceso.stdout.strip().splitlines()[-1])
+    assert result["driver"] == "aiosqlite"
+    # Todo pasó por el AsyncSession: la Session sync no ejecutó nada
+    assert result["statements"]["sync"] == 0
+    assert result["statements"]["async"] >= len(rutas)
+    assert all(status == 200 for status, _ in esperado), esperado
+    assert result["responses"] == esperado
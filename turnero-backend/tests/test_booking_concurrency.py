@@ -0,0 +1,58 @@
+"""Altas simultáneas sobre el mismo horario, cada una en su hilo y su conexión a la base (archivo SQLite)."""
+import threading
+from datetime import datetime, time
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.appointment import Appointment
+from app.repositories.appointment_repo import appointment_index
+from app.services.appointment_service import MSG_SOLAPAMIENTO, AppointmentService
+from app.services.slot_service import SlotService
+
+HILOS = 16
+
+
+def _booking(barrier, data):
+    def book(session):
+        barrier.wait()
+        return AppointmentService.create(session, dict(data))
+
+    return book
+
+
+@pytest.mark.parametrize("modo", ["grilla", "slots", "indice"])
+def test_un_solo_alta_por_horario(db, tuesday, make_patient, monkeypatch, run_concurrently, modo):
+    monkeypatch.setattr(settings, "SLOTS_MATERIALIZED_ENABLED", modo == "slots")
+    if modo == "slots":
+        SlotService.materializar(db)
+    if modo == "indice":
+        # Con la clave del médico ya cargada, el chequeo bajo el lock lo responde el índice
+        monkeypatch.setattr(appointment_index, "enabled", True)
+        appointment_index.between(db, 1, datetime.combine(tuesday, time.min), datetime.combine(tuesday, time.max))
+    barrier = threading.Barrier(HILOS, timeout=10)
+    # Pacientes distintos y horarios que se pisan (10:00, 10:05, ... 10:25) con el mismo médico
+    calls = [
+        _booking(
+            barrier,
+            {
+                "paciente_id": make_patient().id,
+                "medico_id": 1,
+                "especialidad_id": 1,
+                "fecha": f"{tuesday}T10:{5 * (i % 6):02d}",
+                "duracion_min": 30,
+            },
+        )
+        for i in range(HILOS)
+    ]
+
+    results = run_concurrently(*calls)
+
+    booked = [r for r in results if isinstance(r, Appointment)]
+    rejected = [r for r in results if not isinstance(r, Appointment)]
+    assert len(booked) == 1
+    assert all(isinstance(r, ValueError) and str(r) == MSG_SOLAPAMIENTO for r in rejected), rejected
+
+    # Ningún otro turno quedó grabado sobre el horario
+    assert db.execute(select(Appointment.id).where(Appointment.medico_id == 1)).scalars().all() == [booked[0].id]
@@ -0,0 +1,52 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from app.db.query_stats import count_queries
+from app.models.appointment import Appointment
+from app.services.appointment_service import MSG_SOLAPAMIENTO, AppointmentService
+
+
+def _items(patients, first: date, semanas: int):
+    """Un turno por paciente en cada franja de 30 minutos de los días hábiles de `semanas` semanas."""
+    items = []
+    for semana in range(semanas):
+        for dia in range(5):
+            day = first + timedelta(days=7 * semana + dia)
+            for k, patient in enumerate(patients):
+                fecha = datetime.combine(day, datetime.min.time()) + timedelta(hours=9, minutes=30 * k)
+                items.append({"paciente_id": patient.id, "medico_id": 1, "especialidad_id": 1, "fecha": fecha})
+    return items
+
+
+@pytest.fixture
+def monday(tuesday) -> date:
+    return tuesday + timedelta(days=6)
+
+
+@pytest.mark.parametrize("semanas", [1, 8])
+def test_el_lote_se_valida_con_consultas_fijas(db, make_patient, monday, semanas):
+    patients = [make_patient() for _ in range(16)]
+    items = _items(patients, monday, semanas)
+    # Un ítem que pisa a otro del mismo lote y uno fuera de la disponibilidad
+    items.append({**items[0], "paciente_id": patients[1].id})
+    items.append({**items[0], "fecha": items[0]["fecha"].replace(hour=20)})
+
+    with count_queries() as stats:
+        results = AppointmentService.create_bulk(db, items)
+
+    assert sum(r["ok"] for r in results) == len(items) - 2
+    assert results[-2]["error"] == MSG_SOLAPAMIENTO
+    assert results[-1]["error"] == "El horario no se encuentra dentro de la disponibilidad del médico"
+    assert db.scalar(select(func.count(Appointment.id))) == len(items) - 2
+    # Cada resultado trae el id del turno que se creó para ese ítem
+    creados = {ap.id: ap for ap in db.execute(select(Appointment)).scalars()}
+    for item, result in zip(items, results):
+        if result["ok"]:
+            turno = creados[result["id"]]
+            assert (turno.paciente_id, turno.fecha) == (item["paciente_id"], item["fecha"])
+    # Médicos, pacientes, turnos y holds se leen una vez por lote: la cantidad de
+    # sentencias no crece con el tamaño del lote (1 semana = 82 ítems, 8 semanas = 642)
+    assert stats.count <= 12, stats.statements
+    assert not stats.repeated(), stats.statements
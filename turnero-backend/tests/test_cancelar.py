@@ -0,0 +1,59 @@
+import threading
+from datetime import datetime
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.appointment import TurnoEstado
+from app.models.slot import DoctorSlot
+from app.models.waitlist import WaitlistEntry
+from app.repositories.appointment_repo import AppointmentRepo
+from app.services.appointment_service import AppointmentService
+from app.services.slot_service import SlotService
+from app.services.waitlist_service import WaitlistService
+
+
+def test_cancelaciones_simultaneas_del_mismo_turno(db, tuesday, make_patient, monkeypatch, run_concurrently):
+    monkeypatch.setattr(settings, "SLOTS_MATERIALIZED_ENABLED", True)
+    SlotService.materializar(db)
+    patient = make_patient()
+    turno = AppointmentService.create(
+        db, {"paciente_id": patient.id, "medico_id": 1, "especialidad_id": 1, "fecha": f"{tuesday}T10:00"}
+    )
+    for _ in range(2):
+        WaitlistService.crear(
+            db,
+            {
+                "paciente_id": make_patient().id,
+                "especialidad_id": 1,
+                "medico_id": 1,
+                "desde": datetime.fromisoformat(f"{tuesday}T09:00"),
+                "hasta": datetime.fromisoformat(f"{tuesday}T17:00"),
+                "duracion_min": 30,
+            },
+        )
+
+    # Las dos pasan el chequeo previo y recién después compiten por el lock
+    barrier = threading.Barrier(2, timeout=5)
+    waited = threading.local()
+    lock_booking = AppointmentRepo.lock_booking
+
+    def wait_then_lock(*args, **kwargs):
+        if not getattr(waited, "done", False):
+            waited.done = True
+            barrier.wait()
+        lock_booking(*args, **kwargs)
+
+    monkeypatch.setattr(AppointmentRepo, "lock_booking", staticmethod(wait_then_lock))
+    results = run_concurrently(
+        lambda s: AppointmentService.cancelar(s, turno.id),
+        lambda s: AppointmentService.cancelar(s, turno.id),
+    )
+
+    assert not [r for r in results if isinstance(r, Exception)], results
+    assert len([r for r in results if r is not None]) == 1
+    db.expire_all()
+    assert AppointmentRepo.get(db, turno.id).estado == TurnoEstado.Cancelado
+    assert [e.estado for e in db.scalars(select(WaitlistEntry))].count("PENDIENTE") == 1
+    ocupados = db.scalars(select(DoctorSlot.ocupados).where(DoctorSlot.medico_id == 1))
+    assert min(ocupados) == 0
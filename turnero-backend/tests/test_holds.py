@@ -0,0 +1,115 @@
+from datetime import datetime, time, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.query_stats import assert_max_queries
+from app.main import create_app
+from app.models.slot_hold import SlotHold
+from app.repositories import hold_repo
+from app.repositories.hold_repo import HoldRepo
+
+
+@pytest.fixture
+def otro_usuario() -> dict:
+    return {"Authorization": f"Bearer {create_access_token('999')}"}
+
+
+@pytest.fixture
+def hold(client, headers, tuesday):
+    response = client.post("/turnos/hold", json={"medico_id": 1, "fecha": f"{tuesday}T10:00"}, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def _turno(paciente_id, fecha, hold_id, duracion_min=30):
+    return {
+        "paciente_id": paciente_id,
+        "medico_id": 1,
+        "especialidad_id": 1,
+        "fecha": fecha,
+        "duracion_min": duracion_min,
+        "hold_id": hold_id,
+    }
+
+
+def test_solo_el_dueno_libera_el_hold(client, headers, otro_usuario, hold):
+    assert client.delete(f"/turnos/hold/{hold['id']}", headers=otro_usuario).status_code == 404
+    assert client.delete(f"/turnos/hold/{hold['id']}", headers=headers).status_code == 200
+
+
+def test_un_hold_ajeno_no_se_consume(client, headers, otro_usuario, hold, make_patient, tuesday):
+    paciente = make_patient()
+    response = client.post("/turnos", json=_turno(paciente.id, f"{tuesday}T10:00", hold["id"]), headers=otro_usuario)
+    assert response.status_code == 400
+    assert "otro usuario" in response.json()["detail"]
+
+    result = client.post(
+        "/turnos/bulk", json={"items": [_turno(paciente.id, f"{tuesday}T10:00", hold["id"])]}, headers=otro_usuario
+    ).json()
+    assert not result[0]["ok"]
+    assert result[0]["error"] == "La reserva temporal no existe o pertenece a otro usuario"
+
+
+@pytest.mark.parametrize("fecha, duracion_min", [("T11:00", 30), ("T10:00", 60)])
+def test_el_hold_tiene_que_cubrir_el_turno(client, headers, hold, make_patient, tuesday, fecha, duracion_min):
+    paciente = make_patient()
+    response = client.post(
+        "/turnos", json=_turno(paciente.id, f"{tuesday}{fecha}", hold["id"], duracion_min), headers=headers
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "La reserva temporal no corresponde al horario del turno"
+    # El hold sigue vigente y el dueño lo puede usar para el horario que cubre
+    response = client.post("/turnos", json=_turno(paciente.id, f"{tuesday}T10:00", hold["id"]), headers=headers)
+    assert response.status_code == 200
+
+
+def test_un_hold_ajeno_no_habilita_la_reprogramacion(client, headers, otro_usuario, hold, make_patient, tuesday):
+    paciente = make_patient()
+    turno = client.post("/turnos", json=_turno(paciente.id, f"{tuesday}T12:00", None), headers=headers).json()
+    response = client.post(
+        f"/turnos/{turno['id']}/reprogramar",
+        json={"fecha": f"{tuesday}T10:00", "hold_id": hold["id"]},
+        headers=otro_usuario,
+    )
+    assert response.status_code == 400
+    assert "otro usuario" in response.json()["detail"]
+
+
+@pytest.fixture
+def hold_ajeno(db, tuesday):
+    """Hold vencido que dejó otro proceso: no está en el heap de vencimientos de este."""
+    hold = SlotHold(
+        medico_id=1,
+        fecha=datetime.combine(tuesday, time(10)),
+        duracion_min=30,
+        expira_en=datetime.now() - timedelta(minutes=1),
+    )
+    db.add(hold)
+    db.commit()
+    return hold.id
+
+
+def _holds(db):
+    return db.execute(select(SlotHold.id)).scalars().all()
+
+
+def test_el_barrido_periodico_borra_holds_de_otros_procesos(db, hold_ajeno, monkeypatch):
+    monkeypatch.setattr(hold_repo, "expiry_heap", hold_repo._ExpiryHeap())
+
+    assert HoldRepo.sweep(db) == 1
+    assert _holds(db) == []
+    # Hasta el próximo barrido periódico solo se mira el heap, sin consultar la tabla
+    db.add(SlotHold(medico_id=1, fecha=datetime.now(), duracion_min=30, expira_en=datetime.now()))
+    db.commit()
+    with assert_max_queries(0):
+        assert HoldRepo.sweep(db) == 0
+    monkeypatch.setattr(settings, "SLOT_HOLD_SWEEP_SECONDS", 0)
+    assert HoldRepo.sweep(db) == 1
+
+
+def test_al_arrancar_se_borran_los_holds_vencidos(db, hold_ajeno):
+    create_app()
+    assert _holds(db) == []
@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import func, select
+
+from app.models.patient import Patient
+from app.repositories.patient_repo import PatientRepo
+
+ENCABEZADO = "nombre,apellido,dni,fecha_nacimiento,email\n"
+
+
+def _importar(client, headers, filas):
+    archivo = (ENCABEZADO + "".join(f"{fila}\n" for fila in filas)).encode()
+    return client.post("/pacientes/import", files={"archivo": ("pacientes.csv", archivo, "text/csv")}, headers=headers)
+
+
+def _pacientes(db):
+    return db.scalar(select(func.count(Patient.id)))
+
+
+def test_las_filas_con_error_se_informan_con_su_linea(client, headers, db, make_patient):
+    existente = make_patient()
+    response = _importar(
+        client,
+        headers,
+        [
+            "Ana,Uno,70000001,1990-01-01,ana@example.com",
+            "Sin,Fecha,70000002,,",
+            f"Otra,Vez,{existente.dni},1985-05-05,",
+            "Ana,Repetida,70000001,1990-01-01,",
+            "Mismo,Email,70000003,1990-01-01,ana@example.com",
+            "Luis,Dos,70000004,1991-02-03,",
+        ],
+    )
+
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["filas"], result["creados"]) == (6, 2)
+    assert [(e["fila"], e["dni"]) for e in result["errores"]] == [
+        (3, "70000002"),
+        (4, existente.dni),
+        (5, "70000001"),
+        (6, "70000003"),
+    ]
+    assert result["errores"][0]["error"] == "Faltan datos obligatorios: fecha_nacimiento"
+    assert result["errores"][1]["error"] == "Ya existe un paciente con ese DNI"
+    assert result["errores"][3]["error"] == "Ya existe un paciente con ese email"
+    assert _pacientes(db) == 3
+
+
+def test_un_alta_concurrente_del_mismo_dni_queda_como_error_de_fila(client, headers, db, make_patient, monkeypatch):
+    # Otro proceso da de alta el DNI entre la consulta de duplicados y el insert, en los dos intentos
+    existente = make_patient()
+    monkeypatch.setattr(PatientRepo, "existing_identities", staticmethod(lambda db, dnis, emails: (set(), set())))
+
+    response = _importar(
+        client,
+        headers,
+        ["Ana,Uno,70000011,1990-01-01,", f"Otra,Vez,{existente.dni},1985-05-05,", "Luis,Dos,70000012,1991-02-03,"],
+    )
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["creados"] == 2
+    assert result["errores"] == [{"fila": 3, "dni": existente.dni, "error": "Ya existe un paciente con ese DNI"}]
+    assert _pacientes(db) == 3
+
+
+@pytest.mark.parametrize("contenido, detalle", [(b"nombre,dni\nAna,1\n", "Faltan columnas"), (b"\xff\xfe", "UTF-8")])
+def test_un_archivo_invalido_se_rechaza(client, headers, contenido, detalle):
+    response = client.post("/pacientes/import", files={"archivo": ("p.csv", contenido, "text/csv")}, headers=headers)
+    assert response.status_code == 400
+    assert detalle in response.json()["detail"]
@@ -0,0 +1,41 @@
+"""Presupuesto de consultas de los endpoints de lectura: no crece con la cantidad de turnos."""
+from datetime import datetime, time, timedelta
+
+import pytest
+
+from app.db.query_stats import assert_max_queries
+from app.repositories.appointment_repo import AppointmentRepo
+
+# endpoint -> (ruta, parámetros, máximo de consultas)
+ENDPOINTS = {
+    "agenda": ("/turnos/agenda", {}, 1),
+    "nombres": ("/turnos", {"expand": "nombres"}, 1),
+    # médicos de la especialidad, franjas horarias y turnos ocupados
+    "grilla": ("/turnos/disponibles/grilla", {"especialidad_id": 1}, 3),
+}
+
+
+def _reservar(db, make_patient, tuesday, desde: int, hasta: int) -> None:
+    """Turnos `desde`..`hasta` del médico demo, cada uno con otro paciente (16 por martes)."""
+    rows = []
+    for i in range(desde, hasta):
+        day = tuesday + timedelta(days=7 * (i // 16))
+        fecha = datetime.combine(day, time(9)) + timedelta(minutes=30 * (i % 16))
+        rows.append({"paciente_id": make_patient().id, "medico_id": 1, "especialidad_id": 1, "fecha": fecha})
+    AppointmentRepo.create_many(db, rows)
+
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS)
+def test_las_consultas_no_crecen_con_los_turnos(client, headers, db, make_patient, tuesday, endpoint):
+    path, params, limit = ENDPOINTS[endpoint]
+    params = {**params, "desde": tuesday.isoformat(), "hasta": (tuesday + timedelta(days=21)).isoformat()}
+    counts = []
+    for desde, hasta in ((0, 3), (3, 45)):
+        _reservar(db, make_patient, tuesday, desde, hasta)
+        with assert_max_queries(limit) as stats:
+            response = client.get(path, params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        counts.append(stats.count)
+    assert counts[0] == counts[1], counts
+    if endpoint != "grilla":
+        assert len(response.json()) == 45
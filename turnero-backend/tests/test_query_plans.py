@@ -0,0 +1,85 @@
+"""Las consultas de solapamiento y disponibilidad tienen que resolverse con un índice.
+
+Se capturan las sentencias que emite cada consulta y se pasan por EXPLAIN QUERY PLAN
+con los mismos parámetros: ninguna puede recorrer `appointments` entera (SCAN).
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.db.session import engine
+from app.repositories.appointment_repo import AppointmentRepo
+from app.repositories.hold_repo import HoldRepo
+from app.repositories.waitlist_repo import WaitlistRepo
+
+pytestmark = pytest.mark.skipif(engine.dialect.name != "sqlite", reason="EXPLAIN QUERY PLAN es de SQLite")
+
+
+def _plans(db, fn):
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert captured
+    cursor = db.connection().connection.driver_connection.cursor()
+    return [
+        [row[3] for row in cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+        for statement, parameters in captured
+    ]
+
+
+def _assert_indexed(plans, table):
+    for plan in plans:
+        steps = [step for step in plan if f" {table} " in f"{step} "]
+        assert steps, plan
+        for step in steps:
+            assert "USING INDEX ix_" in step or "USING COVERING INDEX ix_" in step, plan
+
+
+@pytest.fixture
+def inicio(tuesday):
+    return datetime.combine(tuesday, datetime.min.time()) + timedelta(hours=10)
+
+
+def test_solapamiento_usa_indices_por_fecha(db, inicio):
+    plans = _plans(db, lambda: AppointmentRepo.overlaps(db, 1, 1, inicio, 30, exclude_id=5))
+    _assert_indexed(plans, "appointments")
+
+
+def test_solapamiento_de_medico_usa_indice(db, inicio):
+    plans = _plans(db, lambda: AppointmentRepo.overlaps(db, 1, None, inicio, 30))
+    _assert_indexed(plans, "appointments")
+
+
+@pytest.mark.parametrize(
+    "consulta",
+    [
+        lambda db, desde, hasta: AppointmentRepo.busy(db, 1, desde, hasta),
+        lambda db, desde, hasta: AppointmentRepo.busy_many(db, [1, 2], desde, hasta),
+        lambda db, desde, hasta: AppointmentRepo.busy_for(db, [1], [1], desde, hasta),
+    ],
+    ids=["busy", "busy_many", "busy_for"],
+)
+def test_disponibilidad_usa_indices(db, inicio, consulta):
+    desde = inicio.replace(hour=0)
+    plans = _plans(db, lambda: consulta(db, desde, desde + timedelta(days=1)))
+    _assert_indexed(plans, "appointments")
+
+
+def test_holds_usan_indice(db, inicio):
+    plans = _plans(db, lambda: HoldRepo.busy_many(db, [1], inicio, inicio + timedelta(hours=1)))
+    _assert_indexed(plans, "slot_holds")
+
+
+def test_candidatos_de_lista_de_espera_salen_del_indice_en_orden(db, inicio):
+    plans = _plans(db, lambda: WaitlistRepo.candidates(db, 1, 1, inicio, 30))
+    _assert_indexed(plans, "waitlist")
+    # El índice ya da el orden por id: sin ordenar todas las entradas anteriores al horario
+    assert not any("TEMP B-TREE" in step for plan in plans for step in plan), plans
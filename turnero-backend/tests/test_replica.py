@@ -0,0 +1,47 @@
+"""Ruteo de lecturas a la réplica con dos archivos SQLite: la base de los tests y una copia vacía."""
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db import session as db_session
+from app.db.base import Base
+from app.db.session import RoutingSession, SessionLocal, _create_engine, engine
+from app.models.specialty import Specialty
+
+
+@pytest.fixture
+def read_session(tmp_path):
+    """Sesiones de lectura sobre la base de los tests y una réplica vacía."""
+    replica = _create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    Base.metadata.create_all(replica)
+    yield sessionmaker(class_=RoutingSession, primary=engine, replica=replica, expire_on_commit=False)
+    replica.dispose()
+    with SessionLocal() as db:
+        db.execute(delete(Specialty).where(Specialty.nombre == "Nueva"))
+        db.commit()
+
+
+def _nombres(db):
+    return db.execute(select(Specialty.nombre)).scalars().all()
+
+
+def test_un_commit_de_otro_request_no_saca_las_lecturas_de_la_replica(read_session):
+    with SessionLocal() as writer:
+        writer.add(Specialty(nombre="Nueva"))
+        writer.commit()
+    with read_session() as db:
+        assert _nombres(db) == []
+
+
+def test_despues_de_escribir_la_sesion_lee_del_primario(read_session):
+    with read_session() as db:
+        db.add(Specialty(nombre="Nueva"))
+        db.flush()
+        assert "Nueva" in _nombres(db)
+
+
+def test_una_replica_atrasada_se_saltea(read_session, monkeypatch):
+    monkeypatch.setattr(db_session, "replica_lag", lambda replica: settings.REPLICA_MAX_LAG_SECONDS + 1)
+    with read_session() as db:
+        assert _nombres(db) != []
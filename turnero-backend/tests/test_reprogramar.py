@@ -0,0 +1,65 @@
+import threading
+
+from sqlalchemy import func, select
+
+from app.models.appointment import Appointment
+from app.services.appointment_service import AppointmentService
+from app.repositories.series_repo import SeriesRepo
+from app.services.series_service import SeriesService
+
+
+def test_reprogramaciones_simultaneas_del_mismo_turno(db, tuesday, make_patient, monkeypatch, run_concurrently):
+    patient = make_patient()
+    dia = tuesday.isoformat()
+    turno = AppointmentService.create(
+        db, {"paciente_id": patient.id, "medico_id": 1, "especialidad_id": 1, "fecha": f"{dia}T10:00"}
+    )
+
+    # Las dos pasan el chequeo previo al lock antes de que cualquiera lo tome
+    barrier = threading.Barrier(2, timeout=5)
+    check_slot = AppointmentService._check_slot
+
+    def check_slot_and_wait(*args, **kwargs):
+        check_slot(*args, **kwargs)
+        barrier.wait()
+
+    monkeypatch.setattr(AppointmentService, "_check_slot", staticmethod(check_slot_and_wait))
+    results = run_concurrently(
+        lambda s: AppointmentService.reprogramar(s, turno.id, f"{dia}T11:00"),
+        lambda s: AppointmentService.reprogramar(s, turno.id, f"{dia}T12:00"),
+    )
+
+    errors = [r for r in results if isinstance(r, Exception)]
+    assert len(errors) == 1 and str(errors[0]) == "El turno no puede reprogramarse"
+    nuevos = db.scalar(select(func.count()).where(Appointment.reprogramado_de_id == turno.id))
+    assert nuevos == 1
+
+
+def test_reprogramar_serie_lee_los_turnos_con_el_lock(db, tuesday, make_patient, monkeypatch):
+    patient = make_patient()
+    serie = SeriesService.crear(
+        db,
+        {
+            "paciente_id": patient.id,
+            "medico_id": 1,
+            "especialidad_id": 1,
+            "dias_semana": [1],
+            "hora": "15:00",
+            "duracion_min": 30,
+            "desde": tuesday,
+            "semanas": 3,
+            "omitir_conflictos": False,
+        },
+    )
+    locked = []
+    future_occurrences = SeriesRepo.future_occurrences
+
+    def spy(session, sid):
+        locked.append(session.connection().connection.driver_connection.in_transaction)
+        return future_occurrences(session, sid)
+
+    monkeypatch.setattr(SeriesRepo, "future_occurrences", staticmethod(spy))
+    result = SeriesService.reprogramar(db, serie["serie_id"], "16:00")
+
+    assert locked == [True]
+    assert [t["fecha"][-5:] for t in result["turnos"]] == ["16:00"] * 3
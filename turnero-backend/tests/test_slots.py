@@ -0,0 +1,69 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.db.query_stats import count_queries
+from app.models.slot import DoctorSlot, SlotHorizon
+from app.services.appointment_service import AppointmentService
+from app.services.doctor_service import DoctorService
+from app.services.slot_service import SlotService
+
+ESCRITURAS = ("INSERT", "UPDATE", "DELETE", "BEGIN")
+
+
+@pytest.fixture
+def materialized(monkeypatch):
+    monkeypatch.setattr(settings, "SLOTS_MATERIALIZED_ENABLED", True)
+
+
+def calculado(db, monkeypatch, *args):
+    monkeypatch.setattr(settings, "SLOTS_MATERIALIZED_ENABLED", False)
+    try:
+        return AppointmentService.disponibles(db, *args)
+    finally:
+        monkeypatch.setattr(settings, "SLOTS_MATERIALIZED_ENABLED", True)
+
+
+def test_disponibles_no_escribe_sin_materializar(db, tuesday, materialized, monkeypatch):
+    with count_queries() as stats:
+        slots = AppointmentService.disponibles(db, 1, tuesday.isoformat())
+    assert not [sql for sql in stats.statements if sql.upper().startswith(ESCRITURAS)]
+    assert db.scalar(select(func.count()).select_from(DoctorSlot)) == 0
+    assert slots == calculado(db, monkeypatch, 1, tuesday.isoformat())
+
+
+def test_materializar_y_leer_slots(db, tuesday, materialized, monkeypatch, make_patient):
+    assert SlotService.materializar(db) == 1
+    horizon = db.get(SlotHorizon, 1)
+    assert horizon.hasta == date.today() + timedelta(days=settings.SLOTS_DIAS_ADELANTE)
+
+    patient = make_patient()
+    fecha = f"{tuesday.isoformat()}T10:00"
+    AppointmentService.create(db, {"paciente_id": patient.id, "medico_id": 1, "especialidad_id": 1, "fecha": fecha})
+    with count_queries() as stats:
+        slots = AppointmentService.disponibles(db, 1, tuesday.isoformat())
+    assert any("FROM slots" in sql for sql in stats.statements)
+    assert "10:00" not in [s["inicio"] for s in slots]
+    assert slots == calculado(db, monkeypatch, 1, tuesday.isoformat())
+
+
+def test_alta_de_medico_materializa(db, materialized):
+    doctor = DoctorService.create(
+        db,
+        {
+            "nombre": "Ana",
+            "apellido": "Slots",
+            "dni": "30111222",
+            "matricula": "MAT-SLOTS",
+            "specialty_ids": [1],
+            "availability": [{"day_of_week": 2, "start_time": "08:00", "end_time": "10:00", "slot_minutes": 30}],
+        },
+    )
+    try:
+        assert db.get(SlotHorizon, doctor.id) is not None
+        assert db.scalar(select(func.count()).where(DoctorSlot.medico_id == doctor.id)) > 0
+    finally:
+        db.delete(doctor)
+        db.commit()
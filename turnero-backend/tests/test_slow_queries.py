@@ -0,0 +1,68 @@
+"""Registro de consultas lentas con SLOW_QUERY_MS=0: toda sentencia cuenta como lenta."""
+import json
+from collections import deque
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db import slow_queries
+from app.db.session import engine
+from app.main import create_app
+
+
+@pytest.fixture
+def lentas(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 0)
+    monkeypatch.setattr(settings, "SLOW_QUERY_LOG", str(tmp_path / "lentas.ndjson"))
+    monkeypatch.setattr(slow_queries, "_buffer", deque(maxlen=5))
+    slow_queries.attach(engine)
+    # App nueva: el middleware que registra la ruta se agrega solo con SLOW_QUERY_MS
+    client = TestClient(create_app())
+    slow_queries.clear()
+    yield client
+    event.remove(engine, "before_cursor_execute", slow_queries._before_cursor_execute)
+    event.remove(engine, "after_cursor_execute", slow_queries._after_cursor_execute)
+
+
+def test_se_guarda_el_plan_y_la_ruta_sin_valores(lentas, headers, make_patient):
+    paciente = make_patient()
+    response = lentas.get(f"/pacientes/{paciente.id}", headers=headers)
+    assert response.status_code == 200
+
+    entry = next(e for e in slow_queries.recent() if "FROM patients" in e["statement"])
+    assert entry["route"] == "GET /pacientes/{pid}"
+    assert any("patients" in step for step in entry["plan"]), entry["plan"]
+    assert "EXPLAIN falló" not in " ".join(entry["plan"])
+    # Solo los tipos de los parámetros: nunca datos del paciente
+    assert str(paciente.id) not in json.dumps(entry["parameters"])
+    with open(settings.SLOW_QUERY_LOG, encoding="utf-8") as log:
+        assert any(json.loads(line)["route"] == "GET /pacientes/{pid}" for line in log)
+
+
+def test_el_buffer_queda_acotado(lentas, headers, make_patient):
+    for _ in range(4):
+        lentas.get(f"/pacientes/{make_patient().id}", headers=headers)
+    assert len(slow_queries.recent()) == 5
+    assert len(lentas.get("/admin/consultas-lentas", params={"limit": 2}, headers=headers).json()) == 2
+
+
+def test_un_explain_que_falla_no_rompe_el_request(lentas, headers, make_patient, monkeypatch):
+    monkeypatch.setitem(slow_queries._EXPLAIN, "sqlite", "EXPLAIN NO ES SQL ")
+    paciente = make_patient()
+
+    response = lentas.get(f"/pacientes/{paciente.id}", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["dni"] == paciente.dni
+    entry = next(e for e in slow_queries.recent() if "FROM patients" in e["statement"])
+    assert entry["plan"][0].startswith("EXPLAIN falló")
+
+
+def test_el_listado_requiere_admin(lentas):
+    assert lentas.get("/admin/consultas-lentas").status_code == 401
+    otro = {"Authorization": f"Bearer {create_access_token('999')}"}
+    assert lentas.get("/admin/consultas-lentas", headers=otro).status_code == 403
+    assert lentas.delete("/admin/consultas-lentas", headers=otro).status_code == 403
@@ -0,0 +1,100 @@
+from datetime import datetime, time, timedelta
+
+import pytest
+from sqlalchemy import event, select
+
+from app.core.security import create_access_token
+from app.models.appointment import Appointment
+from app.models.slot_hold import SlotHold
+from app.services.waitlist_service import WaitlistService
+
+
+@pytest.fixture
+def oferta(client, headers, make_patient, tuesday):
+    """Entrada en lista de espera con una oferta pendiente (se canceló el turno del horario)."""
+    entry = client.post(
+        "/lista-espera",
+        json={
+            "paciente_id": make_patient().id,
+            "especialidad_id": 1,
+            "medico_id": 1,
+            "desde": f"{tuesday}T09:00",
+            "hasta": f"{tuesday}T17:00",
+        },
+        headers=headers,
+    ).json()
+    turno = client.post(
+        "/turnos",
+        json={"paciente_id": make_patient().id, "medico_id": 1, "especialidad_id": 1, "fecha": f"{tuesday}T10:00"},
+        headers=headers,
+    ).json()
+    cancelado = client.post(f"/turnos/{turno['id']}/cancelar", headers=headers).json()
+    assert cancelado["lista_espera"] == {"id": entry["id"], "estado": "OFRECIDO", "turno_id": None}
+    return entry
+
+
+def test_solo_quien_anoto_al_paciente_acepta_la_oferta(client, headers, oferta):
+    otro = {"Authorization": f"Bearer {create_access_token('999')}"}
+    for accion in ("aceptar", "cancelar"):
+        response = client.post(f"/lista-espera/{oferta['id']}/{accion}", headers=otro)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Entrada de lista de espera inexistente"
+
+    response = client.post(f"/lista-espera/{oferta['id']}/aceptar", headers=headers)
+    assert response.status_code == 200
+
+
+def test_aceptar_es_una_sola_transaccion(db, oferta):
+    commits = []
+    event.listen(db, "after_commit", lambda session: commits.append(session))
+    usuario_id = WaitlistService._get(db, oferta["id"]).usuario_id
+
+    turno = WaitlistService.aceptar(db, oferta["id"], usuario_id)
+
+    assert len(commits) == 1
+    entry = WaitlistService._get(db, oferta["id"])
+    assert (entry.estado, entry.turno_id, entry.hold_id) == ("ASIGNADO", turno.id, None)
+    assert db.execute(select(SlotHold)).scalars().all() == []
+    assert db.get(Appointment, turno.id).paciente_id == entry.paciente_id
+
+
+def test_cancelar_una_serie_ofrece_sus_horarios(client, headers, db, make_patient, tuesday):
+    serie = client.post(
+        "/turnos/series",
+        json={
+            "paciente_id": make_patient().id,
+            "medico_id": 1,
+            "especialidad_id": 1,
+            "dias_semana": [tuesday.weekday()],
+            "hora": "11:00",
+            "desde": str(tuesday),
+            "semanas": 2,
+        },
+        headers=headers,
+    ).json()
+    entradas = [
+        client.post(
+            "/lista-espera",
+            json={
+                "paciente_id": make_patient().id,
+                "especialidad_id": 1,
+                "desde": f"{tuesday}T09:00",
+                "hasta": f"{tuesday + timedelta(days=7)}T17:00",
+                "auto_reservar": auto,
+            },
+            headers=headers,
+        ).json()
+        for auto in (True, False)
+    ]
+
+    response = client.post(f"/turnos/series/{serie['serie_id']}/cancelar", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["cancelados"] == 2
+    asignada, ofrecida = response.json()["lista_espera"]
+    assert (asignada["id"], asignada["estado"]) == (entradas[0]["id"], "ASIGNADO")
+    assert (ofrecida["id"], ofrecida["estado"], ofrecida["turno_id"]) == (entradas[1]["id"], "OFRECIDO", None)
+    turno = db.get(Appointment, asignada["turno_id"])
+    assert (turno.paciente_id, turno.fecha) == (entradas[0]["paciente_id"], datetime.combine(tuesday, time(11)))
+    hold = db.execute(select(SlotHold)).scalar_one()
+    assert hold.fecha == datetime.combine(tuesday + timedelta(days=7), time(11))
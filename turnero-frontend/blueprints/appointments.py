@@ -18,35 +18,32 @@ def _load_catalogs(token: str):
     return pacientes, medicos, especialidades
 
 
-def _load_turnos(token: str):
-    today = datetime.now().strftime("%Y-%m-%dT00:00")
-    return _api_get("/turnos", token, params={"desde": today})
+TURNOS_POR_PAGINA = 50
 
 
-def _maps(pacientes, medicos, especialidades):
-    return (
-        {p["id"]: f"{p['apellido']}, {p['nombre']}" for p in pacientes},
-        {m["id"]: f"{m['apellido']}, {m['nombre']}" for m in medicos},
-        {e["id"]: e["nombre"] for e in especialidades},
-    )
+def _load_turnos(token: str, cursor: str | None = None):
+    """Una página de la agenda desde hoy; devuelve (turnos, cursor de la página siguiente).
+
+    La agenda ya trae los nombres de paciente, médico y especialidad, así que la tabla
+    no necesita los catálogos completos.
+    """
+    today = datetime.now().strftime("%Y-%m-%dT00:00")
+    params = {"desde": today, "limit": TURNOS_POR_PAGINA}
+    if cursor:
+        params["cursor"] = cursor
+    return asyncio.run(api.get_page("/turnos/agenda", params=params, token=token))
 
 
 @bp.get("/")
 def index():
     token = session.get("token")
     try:
-        pacientes, medicos, especialidades = _load_catalogs(token)
-        turnos = _load_turnos(token)
+        medicos = _api_get("/medicos", token)
     except Exception as exc:
-        pacientes = medicos = especialidades = turnos = []
+        medicos = []
         flash(f"No se pudieron cargar datos de turnos: {exc}", "error")
-    return render_template(
-        "appointments/index.html",
-        pacientes=pacientes,
-        medicos=medicos,
-        especialidades=especialidades,
-        turnos=turnos,
-    )
+    # El formulario y la tabla se cargan aparte (/turnos/_form y /turnos/_table)
+    return render_template("appointments/index.html", medicos=medicos)
 
 
 @bp.get("/_form")
@@ -84,8 +81,7 @@ def crear():
     try:
         payload = _build_payload(request.form)
         asyncio.run(api.post("/turnos", payload, token=token))
-        turnos = _load_turnos(token)
-        pac_map, med_map, esp_map = _maps(pacientes, medicos, especialidades)
+        turnos, next_cursor = _load_turnos(token)
         now_iso = datetime.now().strftime("%Y-%m-%dT%H:%M")
         return render_template(
             "appointments/_form.html",
@@ -95,9 +91,7 @@ def crear():
             values={},
             success="Turno registrado",
             turnos=turnos,
-            pacientes_map=pac_map,
-            medicos_map=med_map,
-            especialidades_map=esp_map,
+            next_cursor=next_cursor,
             now_iso=now_iso,
         )
     except Exception as exc:
@@ -118,16 +112,14 @@ def crear():
 @bp.get("/_table")
 def table_partial():
     token = session.get("token")
-    pacientes, medicos, especialidades = _load_catalogs(token)
-    turnos = _load_turnos(token)
-    pac_map, med_map, esp_map = _maps(pacientes, medicos, especialidades)
+    cursor = request.args.get("cursor")
+    turnos, next_cursor = _load_turnos(token, cursor)
     now_iso = datetime.now().strftime("%Y-%m-%dT%H:%M")
     return render_template(
         "appointments/_table.html",
         turnos=turnos,
-        pacientes_map=pac_map,
-        medicos_map=med_map,
-        especialidades_map=esp_map,
+        next_cursor=next_cursor,
+        cursor=cursor,
         now_iso=now_iso,
     )
 
@@ -161,8 +153,7 @@ def editar(tid: int):
     try:
         payload = _build_payload(request.form)
         asyncio.run(api.put(f"/turnos/{tid}", payload, token=token))
-        turnos = _load_turnos(token)
-        pac_map, med_map, esp_map = _maps(pacientes, medicos, especialidades)
+        turnos, next_cursor = _load_turnos(token)
         now_iso = datetime.now().strftime("%Y-%m-%dT%H:%M")
         values = payload | {"id": tid}
         return render_template(
@@ -174,9 +165,7 @@ def editar(tid: int):
             success="Turno actualizado",
             close_modal=True,
             turnos=turnos,
-            pacientes_map=pac_map,
-            medicos_map=med_map,
-            especialidades_map=esp_map,
+            next_cursor=next_cursor,
             now_iso=now_iso,
         )
     except Exception as exc:
@@ -199,16 +188,12 @@ def cancelar(tid: int):
     token = session.get("token")
     try:
         asyncio.run(api.post(f"/turnos/{tid}/cancelar", {}, token=token))
-        turnos = _load_turnos(token)
-        pacientes, medicos, especialidades = _load_catalogs(token)
-        pac_map, med_map, esp_map = _maps(pacientes, medicos, especialidades)
+        turnos, next_cursor = _load_turnos(token)
         now_iso = datetime.now().strftime("%Y-%m-%dT%H:%M")
         return render_template(
             "appointments/_table.html",
             turnos=turnos,
-            pacientes_map=pac_map,
-            medicos_map=med_map,
-            especialidades_map=esp_map,
+            next_cursor=next_cursor,
             now_iso=now_iso,
         )
     except Exception as exc:
@@ -259,18 +244,14 @@ def registrar_consulta(tid: int):
         }
     try:
         asyncio.run(api.post(f"/turnos/{tid}/consulta", payload, token=token))
-        pacientes, medicos, especialidades = _load_catalogs(token)
-        turnos = _load_turnos(token)
-        pac_map, med_map, esp_map = _maps(pacientes, medicos, especialidades)
+        turnos, next_cursor = _load_turnos(token)
         now_iso = datetime.now().strftime("%Y-%m-%dT%H:%M")
         return render_template(
             "appointments/_consultation_form.html",
             close_modal=True,
             success="Consulta registrada",
             turnos=turnos,
-            pacientes_map=pac_map,
-            medicos_map=med_map,
-            especialidades_map=esp_map,
+            next_cursor=next_cursor,
             now_iso=now_iso,
         )
     except Exception as exc:
@@ -6,7 +6,9 @@ from services.api import api
 bp = Blueprint("patients", __name__)
 
 
-def _load_patients(token):
+def _load_patients(token, q: str | None = None):
+    if q:
+        return asyncio.run(api.get("/pacientes/buscar", params={"q": q}, token=token))
     return asyncio.run(api.get("/pacientes", token=token))
 
 
@@ -24,7 +26,7 @@ def index():
 @bp.get("/_table")
 def table_partial():
     token = session.get("token")
-    pacientes = _load_patients(token)
+    pacientes = _load_patients(token, request.args.get("q", "").strip())
     return render_template("patients/_table.html", pacientes=pacientes)
 
 
@@ -21,6 +21,13 @@ class ApiClient:
             r.raise_for_status()
             return r.json()
 
+    async def get_page(self, path: str, params: Optional[Dict[str, Any]] = None, token: Optional[str] = None) -> Tuple[Any, Optional[str]]:
+        """GET paginado: devuelve el cuerpo y el cursor de la página siguiente (header X-Next-Cursor)."""
+        async with httpx.AsyncClient(timeout=12.0) as client:
+            r = await client.get(f"{self.base_url}{path}", params=params or {}, headers=self._auth_headers(token))
+            r.raise_for_status()
+            return r.json(), r.headers.get("X-Next-Cursor")
+
     async def put(self, path: str, json: Dict[str, Any], token: Optional[str] = None):
         async with httpx.AsyncClient(timeout=12.0) as client:
             r = await client.put(f"{self.base_url}{path}", json=json, headers=self._auth_headers(token))